@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import dataclasses
+import typing as t
+from array import array
+from collections import abc
+from enum import Enum, auto
+
+from pylox import grammar
+from pylox.tokens import LITERAL_T, Token
+
+Node = t.Union[grammar.Expr, grammar.Stmt]
+
+NO_NODE = -1  # Child index of an optional child node that isn't present
+
+
+class _Encoding(Enum):
+    """How a node field is stored in the arena's columns."""
+
+    NODE = auto()  # Index of the child node, or NO_NODE
+    NODES = auto()  # Offset of a run of child node indices in `Arena.items`
+    TOKEN = auto()  # Index into `Arena.tokens`
+    TOKENS = auto()  # Offset of a run of token indices in `Arena.items`
+    CONSTANT = auto()  # Index into `Arena.constants`
+    INTEGER = auto()  # Stored directly, e.g. a resolved scope depth
+    BOOLEAN = auto()  # Stored directly, as 0 or 1
+    INTEGERS = auto()  # Offset of a run of integers in `Arena.items`
+    CACHED = auto()  # Not stored in a column, see `Arena.cached`
+
+
+def _field_encoding(field_type: str) -> _Encoding:
+    match field_type:
+        case "Token":
+            return _Encoding.TOKEN
+        case "list[Token]":
+            return _Encoding.TOKENS
+        case "LITERAL_T":
+            return _Encoding.CONSTANT
+        case "int":
+            return _Encoding.INTEGER
+        case "bool":
+            return _Encoding.BOOLEAN
+        case "tuple[int, ...]":
+            return _Encoding.INTEGERS
+        case "tuple[int, int]":
+            return _Encoding.CACHED
+        case _ if field_type.startswith("list["):
+            return _Encoding.NODES
+        case _:
+            return _Encoding.NODE
+
+
+# Each concrete grammar class is assigned a node kind, its index in this tuple
+NODE_CLASSES: tuple[type[t.Any], ...] = tuple(
+    obj
+    for obj in vars(grammar).values()
+    if isinstance(obj, type)
+    and dataclasses.is_dataclass(obj)
+    and issubclass(obj, (grammar.Expr, grammar.Stmt))
+)
+NODE_KINDS = {node_cls: kind for kind, node_cls in enumerate(NODE_CLASSES)}
+
+# Node kind -> (field name, encoding) of each of its fields, in column order
+NODE_FIELDS = tuple(
+    tuple((field.name, _field_encoding(str(field.type))) for field in dataclasses.fields(node_cls))
+    for node_cls in NODE_CLASSES
+)
+N_COLUMNS = max(len(fields) for fields in NODE_FIELDS)
+
+
+class Arena:
+    """
+    The pylox arena AST!
+
+    Rather than a separate object per node, the nodes of an arena are stored in struct-of-arrays
+    form. Each node is an index into a set of parallel, compactly packed columns: its node kind,
+    which indexes `NODE_CLASSES`, followed by one column per field of its `grammar` class (in field
+    order). Child nodes are stored as node indices, tokens as indices into `tokens`, & literal
+    values as indices into `constants`, & integers (e.g. resolved scope depths) directly. Lists of
+    child nodes, tokens, or integers are stored as a run in `items`, prefixed by the length of the
+    run.
+
+    The top-level statements of the arena are listed in `roots`.
+
+    Values cached on a node at runtime, e.g. the `(version, slot)` of a global variable access, are
+    stored by node index in `cached` rather than in a column, so a cached value is always replaced
+    as a whole. Cached values are local to the process & aren't pickled.
+
+    Nodes can be accessed as instances of their `grammar` class using `node`, which returns a
+    lightweight view of the node rather than copying it out of the arena. Views are created on
+    demand & compare equal (with matching hashes) to every other view of the same node, so e.g. the
+    `Resolver`, `Interpreter` & `AstPrinter` can all consume the arena's nodes directly. Each field
+    read through a view is decoded from the columns, so walking views is much slower than walking
+    `grammar` objects; source compiled with an arena is copied back out using `to_grammar` once
+    it's parsed, see `pylox.modules.compile_source`.
+
+    Fields may also be assigned through a view, e.g. by the `Optimizer`. Child nodes may either be
+    views of the same arena or new `grammar` trees, which are copied into the arena. The arena is
+    append-only, so any nodes, runs, or values that are no longer referenced are left in place.
+    """
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.columns = tuple(array("i") for _ in range(N_COLUMNS))
+        self.items = array("i")
+        self.tokens: list[Token] = []
+        self.constants: list[LITERAL_T] = []
+        self.roots = array("i")
+        self.cached: dict[int, t.Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __reduce__(self) -> tuple[t.Any, ...]:
+        state = (self.kinds, self.columns, self.items, self.tokens, self.constants, self.roots)
+        return (_rebuild_arena, state)
+
+    @property
+    def statements(self) -> list[grammar.Stmt]:
+        """Views of the arena's top-level statements."""
+        return [self.node(root) for root in self.roots]
+
+    def node(self, index: int) -> t.Any:
+        """Return a view of the node at the specified index, or `None` for `NO_NODE`."""
+        if index == NO_NODE:
+            return None
+
+        return VIEW_CLASSES[self.kinds[index]](self, index)
+
+    def _allocate(self, node: Node) -> int:
+        """Append a node to the columns, leaving its fields to be filled in by `add`."""
+        index = len(self.kinds)
+        self.kinds.append(NODE_KINDS[type(node)])
+        for column in self.columns:
+            column.append(NO_NODE)
+
+        return index
+
+    def add(self, node: Node) -> int:
+        """
+        Copy the provided tree into the arena, returning the index of its root node.
+
+        Nodes are copied using an explicit stack, & the nodes of the tree are allocated
+        contiguously, each after its parent.
+        """
+        allocate, columns, items, tokens = self._allocate, self.columns, self.items, self.tokens
+        root = allocate(node)
+        pending = [(node, root)]
+        while pending:
+            node, index = pending.pop()
+            for column_idx, (name, encoding) in enumerate(NODE_FIELDS[self.kinds[index]]):
+                column = columns[column_idx]
+                value = getattr(node, name)
+                if encoding is _Encoding.NODE:
+                    if value is not None:
+                        column[index] = child = allocate(value)
+                        pending.append((value, child))
+                elif encoding is _Encoding.TOKEN:
+                    column[index] = len(tokens)
+                    tokens.append(value)
+                elif encoding is _Encoding.NODES:
+                    column[index] = len(items)
+                    items.append(len(value))
+                    for child_node in value:
+                        if child_node is None:  # Left behind by a recovered parse error
+                            items.append(NO_NODE)
+                            continue
+
+                        items.append(child := allocate(child_node))
+                        pending.append((child_node, child))
+                elif encoding is _Encoding.TOKENS:
+                    column[index] = len(items)
+                    items.append(len(value))
+                    items.extend(range(len(tokens), len(tokens) + len(value)))
+                    tokens.extend(value)
+                elif encoding is _Encoding.INTEGER or encoding is _Encoding.BOOLEAN:
+                    column[index] = value
+                elif encoding is _Encoding.INTEGERS:
+                    column[index] = len(items)
+                    items.append(len(value))
+                    items.extend(value)
+                elif encoding is _Encoding.CACHED:
+                    continue
+                else:
+                    column[index] = len(self.constants)
+                    self.constants.append(value)
+
+        return root
+
+    def _node_index(self, node: t.Optional[Node]) -> int:
+        """Return the index of the provided node, copying it into the arena if it's not a view."""
+        if node is None:
+            return NO_NODE
+
+        if isinstance(node, ArenaNode) and node._arena is self:
+            return node._index
+
+        return self.add(node)
+
+    def add_root(self, stmt: grammar.Stmt) -> int:
+        """Copy the provided top-level statement into the arena, returning its node index."""
+        root = self.add(stmt)
+        self.roots.append(root)
+        return root
+
+    @classmethod
+    def from_grammar(cls, statements: abc.Iterable[grammar.Stmt]) -> Arena:
+        """Build an arena from the provided top-level statements."""
+        arena = cls()
+        for stmt in statements:
+            arena.add_root(stmt)
+
+        return arena
+
+    def to_grammar(self) -> list[grammar.Stmt]:
+        """
+        Copy the arena's top-level statements back out into instances of their `grammar` class.
+
+        Since each node is allocated after its parent, the nodes are built in reverse order so a
+        node's children are always built before it is.
+        """
+        # Built nodes by index, with a trailing `None` so a child of `NO_NODE` is built as `None`
+        built: list[t.Any] = [None] * (len(self.kinds) + 1)
+        builders = [self._node_builder(kind, built) for kind in range(len(NODE_CLASSES))]
+        kinds = self.kinds
+        for index in range(len(kinds) - 1, -1, -1):
+            built[index] = builders[kinds[index]](index)
+
+        return [built[root] for root in self.roots]
+
+    def _node_builder(self, kind: int, built: list[t.Any]) -> t.Callable[[int], Node]:
+        """Build a function copying a node of the specified kind out of the arena."""
+        node_cls = NODE_CLASSES[kind]
+        decoders = tuple(
+            self._field_decoder(column, encoding, built)
+            for column, (_, encoding) in zip(self.columns, NODE_FIELDS[kind], strict=False)
+        )
+
+        def build(index: int) -> Node:
+            return node_cls(*[decode(index) for decode in decoders])  # type: ignore[no-any-return]
+
+        return build
+
+    def _field_decoder(
+        self, column: array[int], encoding: _Encoding, built: list[t.Any]
+    ) -> t.Callable[[int], t.Any]:
+        """Build a function reading a node's field out of the provided column."""
+        tokens, run = self.tokens, self._run
+        match encoding:
+            case _Encoding.NODE:
+                return lambda index: built[column[index]]
+            case _Encoding.NODES:
+                return lambda index: [built[child] for child in run(column[index])]
+            case _Encoding.TOKEN:
+                return lambda index: tokens[column[index]]
+            case _Encoding.TOKENS:
+                return lambda index: [tokens[token] for token in run(column[index])]
+            case _Encoding.CONSTANT:
+                constants = self.constants
+                return lambda index: constants[column[index]]
+            case _Encoding.INTEGER:
+                return column.__getitem__
+            case _Encoding.BOOLEAN:
+                return lambda index: bool(column[index])
+            case _Encoding.INTEGERS:
+                return lambda index: tuple(run(column[index]))
+            case _Encoding.CACHED:
+                cached = self.cached
+                return lambda index: cached.get(index, grammar.UNCACHED)
+
+    def _run(self, offset: int) -> array[int]:
+        """Return the run of indices (or integers) stored at the specified offset of `items`."""
+        return self.items[offset + 1 : offset + 1 + self.items[offset]]
+
+
+def _rebuild_arena(
+    kinds: array[int],
+    columns: tuple[array[int], ...],
+    items: array[int],
+    tokens: list[Token],
+    constants: list[LITERAL_T],
+    roots: array[int],
+) -> Arena:
+    arena = Arena.__new__(Arena)
+    arena.kinds, arena.columns, arena.items = kinds, columns, items
+    arena.tokens, arena.constants, arena.roots = tokens, constants, roots
+    arena.cached = {}
+    return arena
+
+
+class ArenaNode:
+    """
+    Base class of arena node views.
+
+    A view subclasses its node's `grammar` class, with each of the grammar class's fields replaced
+    by a property that reads the field out of the arena.
+    """
+
+    __slots__ = ()
+
+    _arena: Arena
+    _index: int
+
+    def __init__(self, arena: Arena, index: int) -> None:
+        # The slots are declared by each view class, since a slotted base can't be combined with
+        # the slotted grammar classes
+        self._arena = arena  # type: ignore[misc]
+        self._index = index  # type: ignore[misc]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ArenaNode):
+            return NotImplemented
+
+        return self._index == other._index and self._arena is other._arena
+
+    def __hash__(self) -> int:
+        return hash(self._index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(index={self._index})"
+
+    def __reduce__(self) -> tuple[t.Any, ...]:
+        return (self._arena.node, (self._index,))
+
+
+def _field_property(column_idx: int, encoding: _Encoding) -> property:
+    """Build a property reading a node field from the specified arena column."""
+
+    def fget(view: t.Any) -> t.Any:
+        arena = view._arena
+        value = arena.columns[column_idx][view._index]
+        match encoding:
+            case _Encoding.NODE:
+                return arena.node(value)
+            case _Encoding.NODES:
+                return [arena.node(child) for child in arena._run(value)]
+            case _Encoding.TOKEN:
+                return arena.tokens[value]
+            case _Encoding.TOKENS:
+                return [arena.tokens[token] for token in arena._run(value)]
+            case _Encoding.CONSTANT:
+                return arena.constants[value]
+            case _Encoding.INTEGER:
+                return value
+            case _Encoding.BOOLEAN:
+                return bool(value)
+            case _Encoding.INTEGERS:
+                return tuple(arena._run(value))
+
+    def fset(view: t.Any, value: t.Any) -> None:
+        arena = view._arena
+        match encoding:
+            case _Encoding.NODE:
+                stored = arena._node_index(value)
+            case _Encoding.NODES:
+                # Copying in a new child may itself append to `items`, so do so before the run
+                children = [arena._node_index(child) for child in value]
+                stored = len(arena.items)
+                arena.items.append(len(children))
+                arena.items.extend(children)
+            case _Encoding.TOKEN:
+                stored = len(arena.tokens)
+                arena.tokens.append(value)
+            case _Encoding.TOKENS:
+                stored = len(arena.items)
+                arena.items.append(len(value))
+                arena.items.extend(range(len(arena.tokens), len(arena.tokens) + len(value)))
+                arena.tokens.extend(value)
+            case _Encoding.CONSTANT:
+                stored = len(arena.constants)
+                arena.constants.append(value)
+            case _Encoding.INTEGER | _Encoding.BOOLEAN:
+                stored = value
+            case _Encoding.INTEGERS:
+                stored = len(arena.items)
+                arena.items.append(len(value))
+                arena.items.extend(value)
+
+        arena.columns[column_idx][view._index] = stored
+
+    return property(fget, fset)
+
+
+def _cached_property() -> property:
+    """Build a property reading a node's cached value from `Arena.cached`."""
+
+    def fget(view: t.Any) -> t.Any:
+        return view._arena.cached.get(view._index, grammar.UNCACHED)
+
+    def fset(view: t.Any, value: t.Any) -> None:
+        view._arena.cached[view._index] = value
+
+    return property(fget, fset)
+
+
+def _view_class(node_cls: type[Node], fields: tuple[tuple[str, _Encoding], ...]) -> type:
+    namespace: dict[str, t.Any] = {"__slots__": ("_arena", "_index"), "__module__": __name__}
+    for column_idx, (name, encoding) in enumerate(fields):
+        if encoding is _Encoding.CACHED:
+            namespace[name] = _cached_property()
+        else:
+            namespace[name] = _field_property(column_idx, encoding)
+
+    return type(f"{node_cls.__name__}View", (ArenaNode, node_cls), namespace)
+
+
+# Node kind -> view class
+VIEW_CLASSES = tuple(
+    _view_class(node_cls, fields)
+    for node_cls, fields in zip(NODE_CLASSES, NODE_FIELDS, strict=True)
+)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import pickle
+import typing as t
+from importlib import metadata
+from pathlib import Path
+
+from pylox import grammar
+
+CACHE_DIRNAME = "__loxcache__"
+CACHE_MAGIC = b"LOXC"
+CACHE_FORMAT_VERSION = 10  # Bump when the structure of the cached payload changes
+
+try:
+    PYLOX_VERSION = metadata.version("sco1-pylox")
+except metadata.PackageNotFoundError:  # pragma: no cover
+    PYLOX_VERSION = "unknown"
+
+
+class CompiledSource(t.NamedTuple):  # noqa: D101
+    statements: list[grammar.Stmt]
+    locals: dict[grammar.Expr, tuple[int, int]]  # Resolved (depth, slot), see `Interpreter.resolve`
+
+
+def source_digest(
+    resolved_src: str, arena: bool = False, optimize: bool = False, intern: bool = False
+) -> bytes:
+    """
+    Hash the fully resolved source, along with the pylox version & options that are compiling it.
+
+    See `pylox.modules.compile_source` for a description of the compilation options.
+    """
+    hasher = hashlib.sha256(f"pylox {PYLOX_VERSION}\n".encode())
+    hasher.update(f"arena={arena} optimize={optimize} intern={intern}\n".encode())
+    hasher.update(resolved_src.encode("utf-8", "surrogatepass"))
+    return hasher.digest()
+
+
+class CompilationCache:
+    """
+    A persistent, on-disk cache of the compiled front-end output for a Lox source file.
+
+    Similar to Python's `__pycache__`, the cache file is written to a `__loxcache__` directory
+    alongside the source file. The cached payload stores the parsed statements along with the
+    resolver's local scope depths, so a cache hit can be handed directly to the interpreter.
+
+    The cache is keyed on a hash of the fully resolved source (i.e. after any `include`s have been
+    spliced in), the pylox version, & the compilation options, so changes to the script, any of its
+    included files, or the options it's compiled with automatically invalidate the cache. Any stale,
+    corrupt, or unreadable cache file is treated as a cache miss.
+
+    The cache file is laid out as follows:
+        * 4 byte magic number (`LOXC`)
+        * 2 byte, little endian, cache format version
+        * 32 byte SHA-256 digest of the resolved source, pylox version, & compilation options
+        * Pickled `CompiledSource` payload
+
+    NOTE: The cached payload is unpickled, so the cache directory should only be writable by users
+    trusted to execute code.
+    """
+
+    def __init__(self, src_filepath: Path) -> None:
+        tag = f"pylox-{PYLOX_VERSION}"
+        self.cache_file = src_filepath.parent / CACHE_DIRNAME / f"{src_filepath.stem}.{tag}.loxc"
+
+    def _header(self, resolved_src: str, arena: bool, optimize: bool, intern: bool) -> bytes:
+        digest = source_digest(resolved_src, arena, optimize, intern)
+        return CACHE_MAGIC + CACHE_FORMAT_VERSION.to_bytes(2, "little") + digest
+
+    def load(
+        self, resolved_src: str, arena: bool = False, optimize: bool = False, intern: bool = False
+    ) -> t.Optional[CompiledSource]:
+        """
+        Load the compiled source from the cache, or return `None` on a cache miss.
+
+        Source compiled with different options than the provided ones is a cache miss.
+        """
+        try:
+            cached = self.cache_file.read_bytes()
+        except OSError:
+            return None
+
+        header = self._header(resolved_src, arena, optimize, intern)
+        if not cached.startswith(header):
+            return None
+
+        try:
+            compiled = pickle.loads(cached[len(header) :])  # noqa: S301
+        except Exception:
+            return None
+
+        if not isinstance(compiled, CompiledSource):
+            return None
+
+        return compiled
+
+    def store(
+        self,
+        resolved_src: str,
+        compiled: CompiledSource,
+        arena: bool = False,
+        optimize: bool = False,
+        intern: bool = False,
+    ) -> None:
+        """
+        Write the source compiled with the provided options to the cache.
+
+        Failure to write the cache is not considered an error, the source will just be recompiled
+        on the next run.
+        """
+        try:
+            payload = pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # Very deeply nested trees can't be pickled, just skip caching
+            return
+
+        try:
+            self.cache_file.parent.mkdir(exist_ok=True)
+
+            # Write to a temporary file first so a concurrent reader never sees a partial write
+            tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_bytes(self._header(resolved_src, arena, optimize, intern) + payload)
+            tmp_file.replace(self.cache_file)
+        except OSError:
+            return
@@ -5,10 +5,10 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 
 from pylox import grammar
-from pylox.environment import Environment
+from pylox.environment import LocalEnvironment
 from pylox.error import LoxReturnError, LoxRuntimeError
 from pylox.protocols.interpreter import SourceInterpreterProtocol
-from pylox.tokens import Token, TokenType
+from pylox.tokens import Token
 
 
 class LoxCallable(ABC):  # pragma: no cover
@@ -28,34 +28,33 @@ SelfLoxFunction = t.TypeVar("SelfLoxFunction", bound="LoxFunction")
 @dataclass
 class LoxFunction(LoxCallable):
     declaration: grammar.Function
-    closure: Environment
+    closure: LocalEnvironment  # Upvalues captured by the function, see `pylox.resolver.Resolver`
     is_initializer: bool = False
 
     def bind(self, instance: LoxInstance) -> LoxFunction:
         """For class methods, define a nested closure with the instance pre-defined as `this`."""
-        env = Environment(self.closure)
-        env.define(Token(TokenType.THIS, "this", None, 0, 0), instance)
+        env = LocalEnvironment(self.closure, [instance])
         return LoxFunction(self.declaration, env, self.is_initializer)
 
     def call(self, interpreter: SourceInterpreterProtocol, arguments: list[t.Any]) -> t.Any:
         """Call the current function instance using the provided arguments."""
-        environment = Environment(self.closure)
-
-        for param, val in zip(self.declaration.params, arguments, strict=False):
-            environment.define(param, val)
+        # Parameters are the first variables declared in the function's scope, so the arguments
+        # (already checked against the function's arity) can be used as its frame directly
+        environment = LocalEnvironment(self.closure, arguments)
 
         try:
             interpreter._execute_block(self.declaration.body, environment)
         except LoxReturnError as func_return:
             # Return current instance if we short-circuit from the class init
             if self.is_initializer:
-                return self.closure.get_at(0, "this")
+                # `this` is the only variable of a bound method's closure
+                return self.closure.get_at(0, 0)
 
             return func_return.value
 
         # Class constructor will always return the current instance, even if called directly
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return self.closure.get_at(0, 0)
 
     @property
     def arity(self) -> int:
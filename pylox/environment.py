@@ -1,18 +1,40 @@
 from __future__ import annotations
 
+import itertools
 import typing as t
 from dataclasses import dataclass, field
 
 from pylox.error import LoxRuntimeError
 from pylox.tokens import Token
 
+# Source of each `Environment`'s version, unique within the process
+_VERSIONS = itertools.count()
+
 
 @dataclass(slots=True)
 class Environment:
-    """The pylox variable environment!"""
+    """
+    The pylox variable environment!
+
+    Variables are looked up by name, which is used for the global scope since globals are not
+    resolved ahead of time. Local scopes use the slot-indexed `LocalEnvironment`.
+
+    Each variable is assigned a slot the first time it's defined & its value is stored in `cells` by
+    slot, with `slots` mapping each variable's name to its slot. Slots are never moved or reused, so
+    the interpreter caches the slot of a global on each expression accessing it the first time it's
+    found & skips the lookup by name on every later access (see `grammar.Variable.global_slot`).
+
+    The same compiled source may be run by more than one interpreter (e.g. the shared stdlib
+    headers), each with its own globals, so cached slots are tagged with the `version` of the
+    environment they were found in & a cached slot is only used if the version matches. Since a
+    variable keeps its slot when it's redefined, e.g. at the top level of a script or REPL, each
+    environment keeps the same version for its whole life.
+    """
 
     enclosing: t.Optional[Environment] = None
-    values: dict[str, t.Any] = field(default_factory=dict)
+    slots: dict[str, int] = field(default_factory=dict)
+    cells: list[t.Any] = field(default_factory=list)
+    version: int = field(default_factory=lambda: next(_VERSIONS))
 
     def _ancestor(self, distance: int) -> Environment:
         """
@@ -34,7 +56,12 @@ class Environment:
         Raises if we are not in the global scope and a variable of the same name already exists in
         the current scope.
         """
-        self.values[name.lexeme] = value
+        slot = self.slots.get(name.lexeme)
+        if slot is None:
+            self.slots[name.lexeme] = len(self.cells)
+            self.cells.append(value)
+        else:
+            self.cells[slot] = value
 
     def assign(self, name: Token, value: t.Any) -> None:
         """
@@ -42,8 +69,9 @@ class Environment:
 
         Raises if the variable is not in the current scope or higher.
         """
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
+        slot = self.slots.get(name.lexeme)
+        if slot is not None:
+            self.cells[slot] = value
             return
 
         if self.enclosing is not None:
@@ -59,7 +87,18 @@ class Environment:
         This should always be getting called after the resolver is finished, so it's assumed that
         the variable is present in the scope at the specified distance.
         """
-        self._ancestor(distance).values[name.lexeme] = value
+        self._ancestor(distance).assign(name, value)
+
+    def find_slot(self, name: Token) -> int:
+        """
+        Find the slot of the provided variable token.
+
+        Raises if the variable is not in the current scope.
+        """
+        try:
+            return self.slots[name.lexeme]
+        except KeyError:
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.") from None
 
     def get(self, name: Token) -> t.Any:
         """
@@ -68,7 +107,7 @@ class Environment:
         Raises if the variable is not in the current scope or higher.
         """
         try:
-            return self.values[name.lexeme]
+            return self.cells[self.slots[name.lexeme]]
         except KeyError:
             # If we're in an enclosed scope, walk upwards to see if the variable is defined there
             if self.enclosing is not None:
@@ -88,4 +127,72 @@ class Environment:
         else:
             query = name
 
-        return self._ancestor(distance).values[query]
+        env = self._ancestor(distance)
+        return env.cells[env.slots[query]]
+
+
+@dataclass(slots=True)
+class LocalEnvironment:
+    """
+    The pylox local variable environment!
+
+    Rather than by name, local variables are stored in a list & accessed by the slot assigned to
+    them by the `Resolver`, which is the order they're declared in their scope. Since declarations
+    are always executed in the same order as they're resolved, defining a variable just appends it
+    to the frame.
+
+    A frame may be provided up front, e.g. a function call's arguments, which are the first
+    variables declared in the function's scope.
+    """
+
+    enclosing: t.Optional[Environment | LocalEnvironment] = None
+    values: list[t.Any] = field(default_factory=list)
+
+    def define(self, name: Token, value: t.Any) -> None:
+        """Define the next variable of the scope."""
+        self.values.append(value)
+
+    def assign_at(self, distance: int, slot: int, value: t.Any) -> None:
+        """Update the value of the variable in the specified slot of the scope at the distance."""
+        env = self
+        for _ in range(distance):
+            env = env.enclosing  # type: ignore[assignment]
+
+        env.values[slot] = value
+
+    def get_at(self, distance: int, slot: int) -> t.Any:
+        """
+        Retrieve the value of the variable in the specified slot of the scope at the distance.
+
+        This is on the hot path of every local variable access, so the enclosing scopes are walked
+        inline rather than calling out to a helper.
+        """
+        env = self
+        for _ in range(distance):
+            env = env.enclosing  # type: ignore[assignment]
+
+        return env.values[slot]
+
+    def capture_at(self, distance: int, slot: int) -> Upvalue:
+        """Capture the variable in the specified slot of the scope at the distance as an upvalue."""
+        env = self
+        for _ in range(distance):
+            env = env.enclosing  # type: ignore[assignment]
+
+        return Upvalue(env.values, slot)
+
+
+@dataclass(slots=True)
+class Upvalue:
+    """
+    The pylox upvalue!
+
+    Rather than its entire defining scope chain, a closure captures only the variables it actually
+    references from its enclosing functions, as a flat `LocalEnvironment` of upvalues (in the style
+    of clox). Each upvalue references the variable's slot in the frame of the scope declaring it, so
+    assignments are shared between the closure & the scope. Only the frames of captured variables
+    are kept alive by the closure, not the scopes enclosing them or any scope that isn't captured.
+    """
+
+    values: list[t.Any]
+    slot: int
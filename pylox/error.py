@@ -1,5 +1,6 @@
 import typing as t
 from dataclasses import dataclass
+from pathlib import Path
 
 from pylox.tokens import Token
 
@@ -11,6 +12,8 @@ class LoxException(BaseException):
     line: int
     col: int
     message: str
+    # Set if raised from source compiled separately from the script
+    filepath: t.Optional[Path] = None
 
     def __str__(self) -> str:
         return f"{type(self).__name__}: {self.message}"
@@ -27,6 +30,7 @@ class LoxParseError(LoxException):
         self.line = token.lineno
         self.col = token.col_offset
         self.message = message
+        self.filepath = token.filepath
 
 
 class LoxResolverError(LoxException):
@@ -34,6 +38,7 @@ class LoxResolverError(LoxException):
         self.line = token.lineno
         self.col = token.col_offset
         self.message = message
+        self.filepath = token.filepath
 
 
 class LoxRuntimeError(LoxException):
@@ -41,6 +46,7 @@ class LoxRuntimeError(LoxException):
         self.line = token.lineno
         self.col = token.col_offset
         self.message = message
+        self.filepath = token.filepath
 
 
 class LoxReturnError(LoxRuntimeError):
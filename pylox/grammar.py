@@ -8,6 +8,12 @@ from dataclasses import dataclass
 from pylox.protocols.visitor import VisitorProtocol
 from pylox.tokens import LITERAL_T, Token
 
+# Resolved scope depth of a variable that isn't resolved to a local scope, i.e. a global
+UNRESOLVED = -1
+
+# Cached (version, slot) of a global variable access that hasn't been cached yet
+UNCACHED = (UNRESOLVED, UNRESOLVED)
+
 
 class Expr(ABC):  # pragma: no cover
     pass
@@ -21,6 +27,10 @@ class Expr(ABC):  # pragma: no cover
 class Assign(Expr):
     name: Token
     value: Expr
+    depth: int = UNRESOLVED
+    slot: int = UNRESOLVED
+    upvalue: bool = False
+    global_slot: tuple[int, int] = UNCACHED
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Assign(self)
@@ -31,6 +41,7 @@ class Binary(Expr):
     expr_left: Expr
     token_operator: Token
     expr_right: Expr
+    specialized: bool = False
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Binary(self)
@@ -95,6 +106,9 @@ class Set(Expr):
 class Super(Expr):
     keyword: Token
     method: Token
+    depth: int = UNRESOLVED
+    slot: int = UNRESOLVED
+    upvalue: bool = False
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Super(self)
@@ -103,6 +117,9 @@ class Super(Expr):
 @dataclass(slots=True, eq=False)
 class This(Expr):
     keyword: Token
+    depth: int = UNRESOLVED
+    slot: int = UNRESOLVED
+    upvalue: bool = False
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_This(self)
@@ -120,6 +137,10 @@ class Unary(Expr):
 @dataclass(slots=True, eq=False)
 class Variable(Expr):
     name: Token
+    depth: int = UNRESOLVED
+    slot: int = UNRESOLVED
+    upvalue: bool = False
+    global_slot: tuple[int, int] = UNCACHED
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Variable(self)
@@ -136,6 +157,7 @@ class Stmt(ABC):  # pragma: no cover
 @dataclass(slots=True, eq=False)
 class Block(Stmt):
     statements: list[Stmt]
+    elided: bool = False
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Block(self)
@@ -164,6 +186,7 @@ class Function(Stmt):
     name: Token
     params: list[Token]
     body: list[Stmt]
+    upvalues: tuple[int, ...] = ()
 
     def accept(self, visitor: VisitorProtocol) -> t.Any:
         return visitor.visit_Function(self)
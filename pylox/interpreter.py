@@ -1,3 +1,4 @@
+import dataclasses
 import typing as t
 
 import rich
@@ -5,8 +6,10 @@ import rich
 from pylox import grammar
 from pylox.builtins.py_builtins import load_builtins
 from pylox.callable import LoxCallable, LoxClass, LoxFunction, LoxInstance
-from pylox.environment import Environment
+from pylox.environment import Environment, LocalEnvironment
 from pylox.error import LoxBreakError, LoxContinueError, LoxReturnError, LoxRuntimeError
+from pylox.grammar import UNRESOLVED
+from pylox.locations import LineIndex
 from pylox.protocols.interpreter import LoxInterpreterProtocol
 from pylox.protocols.typing import BoolEq
 from pylox.tokens import LITERAL_T, Token, TokenType
@@ -68,6 +71,136 @@ def _lox_eq(left: BoolEq, right: BoolEq) -> bool:
     return left == right
 
 
+def _first_token(node: t.Union[grammar.Expr, grammar.Stmt]) -> t.Optional[Token]:
+    """Find the first token in source order of the provided node, or of the nodes nested in it."""
+    first = None
+    pending: list[t.Any] = [node]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, Token):
+            if first is None or value.start < first.start:
+                first = value
+        elif isinstance(value, list):
+            pending.extend(value)
+        elif dataclasses.is_dataclass(value):
+            pending.extend(getattr(value, field.name) for field in dataclasses.fields(value))
+
+    return first
+
+
+def _check_numeric_operands(operator: Token, *operands: t.Any) -> None:
+    """Check that the provided operands are all numeric, generate a runtime error if not."""
+    # Need to write the explicit loop (vs `all(isinstance(...))`) since bool subclasses int
+    for operand in operands:
+        if isinstance(operand, (bool, str)):
+            break
+
+        if isinstance(operand, (float, int)):  # pragma: no branch
+            continue
+    else:
+        return
+
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def _unary_op(operator: Token, right: t.Any) -> t.Union[float, bool]:
+    """Apply the unary operator to its evaluated operand."""
+    match operator.token_type:
+        case TokenType.MINUS:
+            _check_numeric_operands(operator, right)
+            return -right
+        case TokenType.BANG:
+            return not is_truthy(right)
+        case _:  # pragma: no cover
+            raise LoxRuntimeError(
+                operator,
+                f"Unexpected Unary operator: '{operator.lexeme}'",
+            )
+
+
+def _binary_op(operator: Token, left: t.Any, right: t.Any) -> t.Union[float, str, None]:
+    """Apply the binary operator to its evaluated operands."""
+    # Unless otherwise stated, left/right expressions are supposed to end up as numbers
+    match operator.token_type:
+        case TokenType.MINUS:
+            _check_numeric_operands(operator, left, right)
+            return left - right
+        case TokenType.PLUS:
+            # Plus can support both the artithmetic operation as well as string concatenation
+            if isinstance(left, bool) or isinstance(right, bool):
+                # Explicitly skip bool since it's an int subclass
+                pass
+            elif isinstance(left, (float, int)) and isinstance(right, (float, int)):
+                return left + right
+            elif isinstance(left, str) and isinstance(right, str):
+                return f"{left}{right}"
+
+            raise LoxRuntimeError(
+                operator, "Operands must either be both numbers or both strings."
+            )
+        case TokenType.STAR:
+            _check_numeric_operands(operator, left, right)
+            return left * right
+        case TokenType.SLASH:
+            _check_numeric_operands(operator, left, right)
+            try:
+                return left / right
+            except ZeroDivisionError:
+                return float("nan")
+        case TokenType.BACK_SLASH:
+            _check_numeric_operands(operator, left, right)
+            try:
+                return left // right
+            except ZeroDivisionError:
+                return float("nan")
+        case TokenType.PERCENT:
+            _check_numeric_operands(operator, left, right)
+            return left % right
+        case TokenType.GREATER:
+            _check_numeric_operands(operator, left, right)
+            return left > right
+        case TokenType.GREATER_EQUAL:
+            _check_numeric_operands(operator, left, right)
+            return left >= right
+        case TokenType.LESS:
+            _check_numeric_operands(operator, left, right)
+            return left < right
+        case TokenType.LESS_EQUAL:
+            _check_numeric_operands(operator, left, right)
+            return left <= right
+        case TokenType.CARAT:
+            _check_numeric_operands(operator, left, right)
+            return left**right
+        case TokenType.BANG_EQUAL:
+            return not _lox_eq(left, right)
+        case TokenType.EQUAL_EQUAL:
+            return _lox_eq(left, right)
+        case _:  # pragma: no cover
+            raise LoxRuntimeError(
+                operator,
+                f"Unexpected Binary operator: '{operator.lexeme}'",
+            )
+
+
+def _specialized_op(operator: Token, left: t.Any, right: t.Any) -> t.Union[float, str, None]:
+    """
+    Apply the binary operator specialized for its known numeric right operand.
+
+    Only the left operand needs to be checked, & `\\` or `%` are only specialized for a non-zero
+    right operand, see `pylox.optimizer.Optimizer`.
+    """
+    _check_numeric_operands(operator, left)
+    match operator.token_type:
+        case TokenType.CARAT:
+            return left**right  # type: ignore[no-any-return]
+        case TokenType.BACK_SLASH:
+            return left // right  # type: ignore[no-any-return]
+        case TokenType.PERCENT:
+            return left % right  # type: ignore[no-any-return]
+        case _:  # pragma: no cover
+            return _binary_op(operator, left, right)
+
+
 class Interpreter:
     """The Pylox interpreter!"""
 
@@ -78,41 +211,46 @@ class Interpreter:
 
         # Environment changes as we change scopes, so we want to keep globals separate
         self.globals = load_builtins(Environment())
-        self._environment = self.globals
-        self._locals: dict[grammar.Expr, int] = {}
+        self._environment: Environment | LocalEnvironment = self.globals
+        # Resolved (scope depth, slot) of each local variable expression, see `Resolver`; these are
+        # also stored on the expressions themselves, which is what's used at runtime
+        self._locals: dict[grammar.Expr, tuple[int, int]] = {}
 
     def interpret(self, statements: t.Sequence[t.Union[grammar.Expr, grammar.Stmt]]) -> list[t.Any]:
+        """
+        Execute the provided statements, stopping at the first runtime error.
+
+        Statements & expressions are executed recursively, so code nested too deeply (or recursing
+        too deeply, e.g. unbounded recursion of a Lox function) exceeds Python's recursion limit.
+        This is reported as a runtime error, located at the first token of the top-level statement
+        being executed (or the start of the source, if the statement has none).
+        """
         retvals = []
+        statement = None
         try:
             for statement in statements:
                 retvals = self._evaluate(statement)
         except LoxRuntimeError as err:
             self._interp.report_runtime_error(err)
+        except RecursionError:
+            token = _first_token(statement) if statement is not None else None
+            if token is None:
+                token = Token(TokenType.EOF, "", start=0, line_index=LineIndex(""))
+
+            self._interp.report_runtime_error(
+                LoxRuntimeError(token, "Maximum recursion depth exceeded.")
+            )
 
         # Optionally return to help with testing
         return retvals
 
-    def resolve(self, expr: grammar.Expr, depth: int) -> None:
-        self._locals[expr] = depth
-
-    def _check_numeric_operands(self, operator: Token, *operands: t.Any) -> None:
-        """Check that the provided operands are all numeric, generate a runtime error if not."""
-        # Need to write the explicit loop (vs `all(isinstance(...))`) since bool subclasses int
-        for operand in operands:
-            if isinstance(operand, (bool, str)):
-                break
-
-            if isinstance(operand, (float, int)):  # pragma: no branch
-                continue
-        else:
-            return
-
-        raise LoxRuntimeError(operator, "Operands must be numbers.")
+    def resolve(self, expr: grammar.Expr, depth: int, slot: int) -> None:
+        self._locals[expr] = (depth, slot)
 
     def _evaluate(self, expr: t.Union[grammar.Expr, grammar.Stmt]) -> t.Any:
         return expr.accept(self)
 
-    def _execute_block(self, statements: list[grammar.Stmt], environment: Environment) -> None:
+    def _execute_block(self, statements: list[grammar.Stmt], environment: LocalEnvironment) -> None:
         env_cache = self._environment  # Cache this so we can restore when we're done
         try:
             self._environment = environment
@@ -121,16 +259,47 @@ class Interpreter:
         finally:
             self._environment = env_cache
 
-    def _lookup_var(self, name: Token, expr: grammar.Expr) -> t.Any:
-        distance = self._locals.get(expr, None)
-        if distance is not None:
-            return self._environment.get_at(distance, name)
-        else:
-            return self.globals.get(name)
+    def _lookup_local(self, expr: grammar.Variable | grammar.This) -> t.Any:
+        # Resolved variables are always local, so the current environment is a `LocalEnvironment`
+        value = self._environment.get_at(expr.depth, expr.slot)  # type: ignore[arg-type]
+        if expr.upvalue:
+            return value.values[value.slot]
+
+        return value
+
+    def _capture(self, function: grammar.Function) -> LocalEnvironment:
+        """Create the closure of the provided function, capturing its upvalues, see `Resolver`."""
+        upvalues = []
+        captures = function.upvalues
+        environment: t.Any = self._environment
+        for idx in range(0, len(captures), 3):
+            is_local, depth, slot = captures[idx : idx + 3]
+            if is_local:
+                upvalues.append(environment.capture_at(depth, slot))
+            else:
+                upvalues.append(environment.get_at(depth, slot))
+
+        return LocalEnvironment(None, upvalues)
 
     def visit_Block(self, stmt: grammar.Block) -> None:
-        # Environment scoping will be properly walked by the called method
-        self._execute_block(stmt.statements, Environment(self._environment))
+        if not stmt.elided:
+            # Environment scoping will be properly walked by the called method
+            self._execute_block(stmt.statements, LocalEnvironment(self._environment))
+            return
+
+        # Any variables of an elided block are stored in the slots following the enclosing scope's
+        # variables, see `Resolver`, which are released once the block is done, however it exits.
+        # Blocks at the top level are only elided if they don't declare any variables, so there's
+        # never anything to release from the globals
+        environment = self._environment
+        values = environment.values if isinstance(environment, LocalEnvironment) else []
+        n_values = len(values)
+        try:
+            for statement in stmt.statements:
+                self._evaluate(statement)
+        finally:
+            if len(values) != n_values:
+                del values[n_values:]
 
     def visit_Class(self, stmt: grammar.Class) -> None:
         superclass = None
@@ -139,41 +308,38 @@ class Interpreter:
             if not isinstance(superclass, LoxClass):
                 raise LoxRuntimeError(stmt.superclass.name, "Superclass must be a class.")
 
-        self._environment.define(stmt.name, None)
-
-        # Store a reference to the superclass so the methods capture the correct environment as
-        # their closure
-        if stmt.superclass is not None:
-            self._environment = Environment(self._environment)
-            self._environment.define(Token(TokenType.SUPER, "super", None, 0, 0), superclass)
-
-        methods = {
-            method.name.lexeme: LoxFunction(
-                method, self._environment, is_initializer=(method.name.lexeme == "init")
-            )
-            for method in stmt.methods
-        }
-        new_class = LoxClass(stmt.name.lexeme, superclass, methods)
+        methods = {}
+        for method in stmt.methods:
+            # Store a reference to the superclass so the methods capture the correct environment as
+            # their closure
+            closure = self._capture(method)
+            if stmt.superclass is not None:
+                closure = LocalEnvironment(closure, [superclass])
 
-        if superclass is not None:
-            # Pop the environment so we get back to the current class definition
-            self._environment = self._environment.enclosing
+            is_initializer = method.name.lexeme == "init"
+            methods[method.name.lexeme] = LoxFunction(method, closure, is_initializer)
 
-        self._environment.assign(stmt.name, new_class)
+        self._environment.define(stmt.name, LoxClass(stmt.name.lexeme, superclass, methods))
 
     def visit_Expression(self, stmt: grammar.Expression) -> None:
         self._evaluate(stmt.expr_expression)
 
     def visit_Function(self, stmt: grammar.Function) -> None:
-        function = LoxFunction(stmt, self._environment)
+        function = LoxFunction(stmt, self._capture(stmt))
         self._environment.define(stmt.name, function)
 
     def visit_If(self, stmt: grammar.If) -> None:
-        if is_truthy(self._evaluate(stmt.condition)):
-            self._evaluate(stmt.then_branch)
-        else:
-            if stmt.else_branch is not None:
-                self._evaluate(stmt.else_branch)
+        # Evaluate each condition of the `else if` chain in turn, up to the first truthy one
+        branch: t.Optional[grammar.Stmt] = stmt
+        while isinstance(branch, grammar.If):
+            if is_truthy(self._evaluate(branch.condition)):
+                self._evaluate(branch.then_branch)
+                return
+
+            branch = branch.else_branch
+
+        if branch is not None:
+            self._evaluate(branch)
 
     def visit_Var(self, stmt: grammar.Var) -> None:
         if stmt.initializer:
@@ -213,112 +379,87 @@ class Interpreter:
         return expr.object_value
 
     def visit_Logical(self, expr: grammar.Logical) -> grammar.Expr:
-        left = self._evaluate(expr.expr_left)
-        if expr.token_operator.token_type == TokenType.OR:
+        # Logical operators are left associative, so long chains (e.g. `a and b and c`) nest down
+        # their left operand; walk down the chain iteratively rather than recursing for each one
+        chain = [expr]
+        while isinstance(chain[-1].expr_left, grammar.Logical):
+            chain.append(chain[-1].expr_left)
+
+        value = self._evaluate(chain[-1].expr_left)
+        for link in reversed(chain):
             # Attempt to short circuit
-            if is_truthy(left):
-                return left
-        else:
-            if not is_truthy(left):
-                return left
+            if link.token_operator.token_type == TokenType.OR:
+                if is_truthy(value):
+                    continue
+            else:
+                if not is_truthy(value):
+                    continue
 
-        return self._evaluate(expr.expr_right)
+            value = self._evaluate(link.expr_right)
+
+        return value
 
     def visit_Grouping(self, expr: grammar.Grouping) -> t.Any:
-        return self._evaluate(expr.expr_expression)
+        # Unwrap nested parentheses iteratively, rather than recursing into each nested `Grouping`
+        inner = expr.expr_expression
+        while isinstance(inner, grammar.Grouping):
+            inner = inner.expr_expression
+
+        return self._evaluate(inner)
 
     def visit_Unary(self, expr: grammar.Unary) -> t.Union[float, bool]:
-        right = self._evaluate(expr.expr_right)
-        match expr.token_operator.token_type:
-            case TokenType.MINUS:
-                self._check_numeric_operands(expr.token_operator, right)
-                return -right
-            case TokenType.BANG:
-                return not is_truthy(right)
-            case _:  # pragma: no cover
-                raise LoxRuntimeError(
-                    expr.token_operator,
-                    f"Unexpected Unary operator: '{expr.token_operator.lexeme}'",
-                )
+        return _unary_op(expr.token_operator, self._evaluate(expr.expr_right))
 
     def visit_Variable(self, expr: grammar.Variable) -> t.Any:
-        return self._lookup_var(expr.name, expr)
+        if expr.depth != UNRESOLVED:
+            return self._lookup_local(expr)
+
+        # Unresolved variables are global, whose slot is cached on the expression once it's found
+        globals_ = self.globals
+        version, slot = expr.global_slot
+        if version != globals_.version:
+            slot = globals_.find_slot(expr.name)
+            expr.global_slot = (globals_.version, slot)
+
+        return globals_.cells[slot]
 
     def visit_Assign(self, expr: grammar.Assign) -> t.Any:
         value = self._evaluate(expr.value)
 
-        distance = self._locals.get(expr, None)
-        if distance is not None:
-            self._environment.assign_at(distance, expr.name, value)
+        if expr.depth == UNRESOLVED:
+            globals_ = self.globals
+            version, slot = expr.global_slot
+            if version != globals_.version:
+                slot = globals_.find_slot(expr.name)
+                expr.global_slot = (globals_.version, slot)
+
+            globals_.cells[slot] = value
+        elif expr.upvalue:
+            upvalue = self._environment.get_at(expr.depth, expr.slot)  # type: ignore[arg-type]
+            upvalue.values[upvalue.slot] = value
         else:
-            self.globals.assign(expr.name, value)
+            self._environment.assign_at(expr.depth, expr.slot, value)  # type: ignore[arg-type]
 
         return value
 
     def visit_Binary(self, expr: grammar.Binary) -> t.Union[float, str, None]:
-        # Unless otherwise stated, left/right expressions are supposed to end up as numbers
-        left = self._evaluate(expr.expr_left)
-        right = self._evaluate(expr.expr_right)
-
-        match expr.token_operator.token_type:
-            case TokenType.MINUS:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left - right
-            case TokenType.PLUS:
-                # Plus can support both the artithmetic operation as well as string concatenation
-                if isinstance(left, bool) or isinstance(right, bool):
-                    # Explicitly skip bool since it's an int subclass
-                    pass
-                elif isinstance(left, (float, int)) and isinstance(right, (float, int)):
-                    return left + right
-                elif isinstance(left, str) and isinstance(right, str):
-                    return f"{left}{right}"
-
-                raise LoxRuntimeError(
-                    expr.token_operator, "Operands must either be both numbers or both strings."
-                )
-            case TokenType.STAR:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left * right
-            case TokenType.SLASH:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                try:
-                    return left / right
-                except ZeroDivisionError:
-                    return float("nan")
-            case TokenType.BACK_SLASH:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                try:
-                    return left // right
-                except ZeroDivisionError:
-                    return float("nan")
-            case TokenType.PERCENT:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left % right
-            case TokenType.GREATER:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left > right
-            case TokenType.GREATER_EQUAL:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left >= right
-            case TokenType.LESS:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left < right
-            case TokenType.LESS_EQUAL:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left <= right
-            case TokenType.CARAT:
-                self._check_numeric_operands(expr.token_operator, left, right)
-                return left**right
-            case TokenType.BANG_EQUAL:
-                return not _lox_eq(left, right)
-            case TokenType.EQUAL_EQUAL:
-                return _lox_eq(left, right)
-            case _:  # pragma: no cover
-                raise LoxRuntimeError(
-                    expr.token_operator,
-                    f"Unexpected Binary operator: '{expr.token_operator.lexeme}'",
-                )
+        if not isinstance(expr.expr_left, grammar.Binary):
+            left = self._evaluate(expr.expr_left)
+            op = _specialized_op if expr.specialized else _binary_op
+            return op(expr.token_operator, left, self._evaluate(expr.expr_right))
+
+        # Binary operators are left associative, so long chains (e.g. `a + b + c + ...`) nest down
+        # their left operand; walk down the chain iteratively rather than recursing for each one
+        chain = [expr]
+        while isinstance(chain[-1].expr_left, grammar.Binary):
+            chain.append(chain[-1].expr_left)
+
+        value: t.Union[float, str, None] = self._evaluate(chain[-1].expr_left)
+        for link in reversed(chain):
+            op = _specialized_op if link.specialized else _binary_op
+            value = op(link.token_operator, value, self._evaluate(link.expr_right))
+
+        return value
 
     def visit_Call(self, expr: grammar.Call) -> t.Any:
         function = self._evaluate(expr.callee)
@@ -355,12 +496,20 @@ class Interpreter:
         return value
 
     def visit_Super(self, expr: grammar.Super) -> LoxFunction:
-        distance = self._locals[expr]
-        superclass: LoxClass = self._environment.get_at(distance, "super")
-
-        # The environment where "this" is bound is always going to be right inside the environment
-        # where "super" is bound
-        object_: LoxInstance = self._environment.get_at(distance - 1, "this")
+        environment: t.Any = self._environment
+        superclass: LoxClass
+        object_: LoxInstance
+        if expr.upvalue:
+            # The upvalue of "this" is always captured just before "super", see `Resolver._capture`
+            upvalue = environment.get_at(expr.depth, expr.slot)
+            superclass = upvalue.values[upvalue.slot]
+            upvalue = environment.get_at(expr.depth, expr.slot - 1)
+            object_ = upvalue.values[upvalue.slot]
+        else:
+            # The environment where "this" is bound is always going to be right inside the
+            # environment where "super" is bound, as the only variable of its scope
+            superclass = environment.get_at(expr.depth, expr.slot)
+            object_ = environment.get_at(expr.depth - 1, 0)
         method = superclass.find_method(expr.method.lexeme)
 
         if method is None:
@@ -369,4 +518,4 @@ class Interpreter:
         return method.bind(object_)
 
     def visit_This(self, expr: grammar.This) -> t.Any:
-        return self._lookup_var(expr.keyword, expr)
+        return self._lookup_local(expr)
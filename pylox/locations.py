@@ -0,0 +1,44 @@
+import re
+import typing as t
+from bisect import bisect_right
+from pathlib import Path
+
+NEWLINE = re.compile("\n")
+
+
+class SourceLocation(t.NamedTuple):  # noqa: D101
+    filepath: t.Optional[Path]  # None if located in the main script
+    lineno: int  # Zero-indexed
+    col_offset: int  # Zero-indexed
+
+
+class LineIndex:
+    """
+    Map absolute offsets into a source string to zero-indexed line & column locations.
+
+    The offsets of the start of each line are computed once, up front, so locations can be lazily
+    resolved with a binary search rather than tracking line information while scanning.
+
+    If the source was loaded from a file other than the main script (e.g. a stdlib header), its
+    path may be provided so locations can be attributed back to it.
+    """
+
+    def __init__(self, src: str, filepath: t.Optional[Path] = None) -> None:
+        self.filepath = filepath
+        self.line_starts = [0, *(newline.end() for newline in NEWLINE.finditer(src))]
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def lineno(self, offset: int) -> int:
+        """Return the zero-indexed line number containing the specified source offset."""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def location(self, offset: int) -> tuple[int, int]:
+        """Return the zero-indexed `(lineno, col_offset)` of the specified source offset."""
+        lineno = bisect_right(self.line_starts, offset) - 1
+        return lineno, offset - self.line_starts[lineno]
+
+    def source_location(self, offset: int) -> SourceLocation:
+        """Return the source file & zero-indexed line & column of the specified source offset."""
+        return SourceLocation(self.filepath, *self.location(offset))
@@ -6,12 +6,16 @@ import typer
 from rich import print
 from rich.prompt import Prompt
 
+from pylox import grammar
+from pylox.cache import CompilationCache
 from pylox.error import LoxException, LoxRuntimeError
 from pylox.interpreter import Interpreter
-from pylox.parser import Parser
+from pylox.modules import Module, ModuleLoader, compile_source
 from pylox.preprocessor import PreProcessor
-from pylox.resolver import Resolver
-from pylox.scanner import Scanner
+from pylox.scanner import ScannerEngine
+from pylox.session import Session
+from pylox.tree_shaker import find_references
+from pylox.tree_shaker import tree_shake as tree_shake_modules
 
 pylox_cli = typer.Typer()
 Prompt.prompt_suffix = ""  # Get rid of the default colon suffix
@@ -22,17 +26,46 @@ class Lox:
 
     preprocessor: PreProcessor | None
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        scanner_engine: ScannerEngine = ScannerEngine.CLASSIC,
+        tree_shake: bool = False,
+        arena: bool = False,
+        optimize: bool = False,
+        intern: bool = False,
+    ) -> None:
         self.interpreter = Interpreter(self)
         self.preprocessor = None
+        self.scanner_engine = scanner_engine
+        self.tree_shake = tree_shake
+        self.arena = arena  # Compile sources into a flat arena AST, see `pylox.arena.Arena`
+        self.optimize = optimize  # Simplify compiled sources, see `pylox.optimizer.Optimizer`
+        self.intern = intern  # Share identical subexpressions, see `pylox.optimizer.Interner`
+
+        self.modules = ModuleLoader(
+            self, scanner_engine, arena=arena, optimize=optimize, intern=intern
+        )
+        # Incrementally compiles the inputs of `run_cell`, e.g. from the REPL
+        self.session = Session(self, arena=arena, optimize=optimize, intern=intern)
+        # Module statements are shared, so track which have already been run by the interpreter
+        self._defined_statements: set[grammar.Stmt] = set()
 
         self.had_error = False
         self.had_runtime_error = False
 
-    def run_file(self, src_filepath: Path) -> None:
-        """Execute the specified source file in the pylox interpreter."""
+    def run_file(self, src_filepath: Path, use_cache: bool = False) -> None:
+        """
+        Execute the specified source file in the pylox interpreter.
+
+        If `use_cache` is `True`, the compiled front-end output is cached to disk alongside the
+        source file & reused on subsequent runs, see `pylox.cache.CompilationCache`.
+
+        If the interpreter was created with `tree_shake=True`, unused declarations of any included
+        modules are not defined, see `pylox.tree_shaker.tree_shake`.
+        """
         src = src_filepath.read_text()
-        self.run(src)
+        cache = CompilationCache(src_filepath) if use_cache else None
+        self.run(src, cache=cache, tree_shake=self.tree_shake)
 
         if self.had_error:
             sys.exit(65)
@@ -41,64 +74,133 @@ class Lox:
             sys.exit(70)
 
     def run_prompt(self) -> None:
-        """Enter into a pylox REPL."""
+        """
+        Enter into a pylox REPL.
+
+        NOTE: Included modules are never tree shaken in the REPL, since any of their declarations
+        may be referenced by a later line.
+        """
         while True:
             line = Prompt.ask(">>> ")
-            self.run(line)
+            self.run_cell(line)
 
             # Reset these so we can stay in the REPL unhindered
             self.had_error = False
             self.had_runtime_error = False
 
-    def run(self, src: str) -> None:
-        """Run the specified source."""
-        self.preprocessor = PreProcessor(src)
+    def run_cell(self, src: str) -> None:
+        """
+        Run the specified input as the next cell of an interactive session (e.g. a REPL).
 
-        scanner = Scanner(self.preprocessor.resolved_src, self)
-        tokens = scanner.scan_tokens()
+        Unlike `run`, top-level declarations that were already compiled by a previous cell are
+        reused rather than recompiled, see `pylox.session.Session`. Globals defined by previous
+        cells remain defined.
 
-        parser = Parser(tokens, self)
-        statements = parser.parse()
+        The error flags are reset before the cell is run, so they only reflect errors encountered
+        while running this cell.
+        """
+        self.had_error = False
+        self.had_runtime_error = False
+        self.run(src, incremental=True)
+
+    def run(
+        self,
+        src: str,
+        cache: t.Optional[CompilationCache] = None,
+        tree_shake: bool = False,
+        incremental: bool = False,
+    ) -> None:
+        """
+        Run the specified source.
+
+        If a compilation cache is provided, the compiled source is loaded from the cache if
+        available, otherwise the cache is populated once the source is successfully compiled. Any
+        included modules are also cached alongside their own source files. If `incremental` is
+        `True`, the source is instead compiled by the interpreter's `Session`.
 
-        # Don't run the resolver if we've had a scanning or parsing error, or if we didn't get any
-        # statements
-        if self.had_error or not statements:
+        Included files are compiled separately as modules, see `pylox.modules.ModuleLoader`. Each
+        module is only run once per interpreter, regardless of how many times it is included. If
+        `tree_shake` is `True`, top-level function & class declarations of the modules are only
+        defined if they're (transitively) referenced by the source.
+        """
+        self.preprocessor = PreProcessor(src, splice_includes=False)
+        resolved_src = self.preprocessor.resolved_src
+
+        modules = self.modules.load(self.preprocessor.includes, use_cache=cache is not None)
+
+        if incremental:
+            compiled = self.session.compile(resolved_src)
+            if compiled is None:
+                return
+        else:
+            # Source compiled with different options is a cache miss
+            options = (self.arena, self.optimize, self.intern)
+            compiled = cache.load(resolved_src, *options) if cache is not None else None
+            if compiled is None:
+                compiled = compile_source(
+                    resolved_src,
+                    self,
+                    self.scanner_engine,
+                    arena=self.arena,
+                    optimize=self.optimize,
+                    intern=self.intern,
+                )
+                if compiled is None:
+                    return
+
+                if cache is not None:
+                    cache.store(resolved_src, compiled, *options)
+
+        # Don't run the interpreter if any modules failed to compile
+        if modules is None:
             return
 
-        resolver = Resolver(self.interpreter)
-        resolver.resolve(statements)
+        if tree_shake:
+            included = tree_shake_modules(modules, find_references(compiled.statements))
+        else:
+            included = [module.compiled.statements for module in modules]
 
-        # Don't run the resolver if we've had a scanning, parsing, or resolving error
-        if self.had_error:
+        self._define_modules(modules, included)
+        if self.had_runtime_error:
             return
 
-        self.interpreter.interpret(statements)
+        self.interpreter._locals.update(compiled.locals)
+        self.interpreter.interpret(compiled.statements)
+
+    def _define_modules(
+        self, modules: t.Iterable[Module], included: t.Iterable[list[grammar.Stmt]]
+    ) -> None:
+        """Run the included statements of each module that haven't already been run."""
+        for module, statements in zip(modules, included, strict=True):
+            statements = [stmt for stmt in statements if stmt not in self._defined_statements]
+            if not statements:
+                continue
+
+            self.interpreter._locals.update(module.compiled.locals)
+            self.interpreter.interpret(statements)
+            if self.had_runtime_error:
+                return
+
+            self._defined_statements.update(statements)
 
     def _build_error_string(self, err: LoxException | LoxRuntimeError) -> str:
         """
         Adjust error location for any imports & make a colorful error.
 
-        If an error occurs on a line of source that has been included, repoint the error to the
-        `include` statement in the source on disk and update the error string.
+        If an error occurs in an included module, repoint the error to the `include` statement in
+        the source on disk and update the error string.
         """
         pre = ""  # Error string helper prefix to update if we're erroring inside included source
         line, col = err.line, err.col
 
-        # Adjust the lineno to account for any inserted source code from include directive(s)
-        if self.preprocessor and self.preprocessor.has_includes:
-            if line <= self.preprocessor.n_included_lines:
-                pre = f"[bold magenta](Error in included source)[/bold magenta] {line+1}:{col+1}: "
-                # Find which include statement we came from
-                for include in self.preprocessor.import_metadata:
-                    if line in include.line_range:
-                        line = include.include_line
-                        col = 0
-                        break
+        # Errors raised from a separately compiled module carry their own location
+        if err.filepath is not None:
+            pre = f"[bold magenta](Error in included source)[/bold magenta] {line+1}:{col+1}: "
+            if self.preprocessor and err.filepath in self.preprocessor.includes:
+                line, col = self.preprocessor.includes[err.filepath], 0
             else:
-                # Catch-all for errors that span outside of included source (e.g. expecting block
-                # closing)
-                # Not the best error message in some cases, but is workable for now
-                line -= self.preprocessor.n_included_lines
+                # Module was included by another module, or by a previous run (e.g. the REPL)
+                pre = f"[bold magenta](Error in {err.filepath.name})[/bold magenta] "
 
         return f"{line+1}:{col+1}: {pre}[bold red]{err}[/bold red]"
 
@@ -115,18 +217,32 @@ class Lox:
 
 
 @pylox_cli.command()
-def main(lox_script: t.Optional[Path] = typer.Argument(default=None)) -> None:
+def main(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    scanner: ScannerEngine = typer.Option(ScannerEngine.CLASSIC, help="Scanner implementation."),
+    cache: bool = typer.Option(False, help="Cache the compiled script to disk."),
+    tree_shake: bool = typer.Option(False, help="Skip unused declarations of included modules."),
+    arena: bool = typer.Option(False, help="Compile the script into a flat arena AST."),
+    optimize: bool = typer.Option(False, help="Fold constants & prune dead branches."),
+    intern: bool = typer.Option(False, help="Share identical side-effect free subexpressions."),
+) -> None:
     """
     Welcome to the pylox Lox interpreter!
 
     If a path to a Lox file is not provided, a pylox REPL will be opened.
     """
-    lox = Lox()
+    lox = Lox(
+        scanner_engine=scanner,
+        tree_shake=tree_shake,
+        arena=arena,
+        optimize=optimize,
+        intern=intern,
+    )
     if not lox_script:
         # REPL
         lox.run_prompt()
     else:
-        lox.run_file(lox_script)
+        lox.run_file(lox_script, use_cache=cache)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,362 @@
+import typing as t
+from collections import abc
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+
+from pylox.cache import CompilationCache, CompiledSource
+from pylox.error import LoxException, LoxPreProcessorError, LoxRuntimeError
+from pylox.locations import LineIndex, SourceLocation
+from pylox.optimizer import Interner, Optimizer
+from pylox.parser import Parser
+from pylox.preprocessor import (
+    BUILTINS_PATH,
+    PreProcessor,
+    load_if_exists,
+    source_not_found,
+)
+from pylox.protocols.interpreter import LoxInterpreterProtocol
+from pylox.resolver import Resolver, ResolveTable
+from pylox.scanner import ScannerEngine, tokenize
+from pylox.tokens import Token
+from pylox.tree_shaker import find_references
+
+STDLIB_PATH = BUILTINS_PATH.resolve()
+
+
+class _ErrorTracker:
+    """Forward errors to the wrapped interpreter, keeping track of whether any were reported."""
+
+    def __init__(self, interp: LoxInterpreterProtocol) -> None:
+        self._interp = interp
+        self.had_error = False
+
+    def report_error(self, err: LoxException) -> None:
+        self.had_error = True
+        self._interp.report_error(err)
+
+    def report_runtime_error(self, err: LoxRuntimeError) -> None:  # pragma: no cover
+        self.had_error = True
+        self._interp.report_runtime_error(err)
+
+
+class _HeaderErrorReporter:
+    """Stdlib headers are assumed to be valid code, so any error encountered is raised."""
+
+    def report_error(self, err: LoxException) -> None:
+        raise err
+
+    def report_runtime_error(self, err: LoxRuntimeError) -> None:  # pragma: no cover
+        raise err
+
+
+def compile_source(
+    src: str,
+    interp: LoxInterpreterProtocol,
+    engine: ScannerEngine = ScannerEngine.CLASSIC,
+    filepath: t.Optional[Path] = None,
+    arena: bool = False,
+    optimize: bool = False,
+    intern: bool = False,
+) -> t.Optional[CompiledSource]:
+    """
+    Run the provided source through the front-end (scanner, parser, & resolver).
+
+    Any errors encountered are reported to the provided interpreter & `None` is returned. If the
+    source was loaded from a file other than the main script, its path may be provided so error
+    locations can be attributed back to it.
+
+    If `arena` is `True`, the source is parsed into a flat `pylox.arena.Arena`, which is copied back
+    out into `grammar` objects once parsing is done; reading fields through arena views is far
+    slower than attribute access, so the rest of the front-end & the interpreter never walk them.
+    If `optimize` is `True`, the resolved statements are then simplified by the
+    `pylox.optimizer.Optimizer`. If `intern` is `True`, identical subexpressions are then shared by
+    the `pylox.optimizer.Interner`.
+    """
+    reporter = _ErrorTracker(interp)
+    tokens = tokenize(src, reporter, engine, filepath)
+    return compile_tokens(tokens, reporter, arena, optimize, intern)
+
+
+def compile_tokens(
+    tokens: abc.Iterable[Token],
+    interp: LoxInterpreterProtocol,
+    arena: bool = False,
+    optimize: bool = False,
+    intern: bool = False,
+) -> t.Optional[CompiledSource]:
+    """
+    Run the provided, already scanned, tokens through the rest of the front-end.
+
+    See `compile_source` for a description of the compilation options.
+    """
+    # Scanning errors may have already been tracked, e.g. by `compile_source`
+    reporter = interp if isinstance(interp, _ErrorTracker) else _ErrorTracker(interp)
+    parser = Parser(tokens, reporter)
+    statements = parser.parse_arena().to_grammar() if arena else parser.parse()
+
+    # Don't run the resolver if we've had a scanning or parsing error
+    if reporter.had_error or statements is None:
+        return None
+
+    # Source is compiled in isolation, so only a table is needed to collect the scope depths
+    resolved = ResolveTable(reporter)
+    Resolver(resolved).resolve(statements)
+    if reporter.had_error:
+        return None
+
+    if optimize:
+        statements = Optimizer().optimize(statements)  # type: ignore[arg-type]
+
+    if intern:
+        Interner(resolved.locals).intern(statements)  # type: ignore[arg-type]
+
+    return CompiledSource(statements, resolved.locals)  # type: ignore[arg-type]
+
+
+# Compilation options (arena, optimize, intern), see `compile_source`
+_CompileOptions = tuple[bool, bool, bool]
+
+
+def load_header(
+    header_filepath: Path, arena: bool = False, optimize: bool = False, intern: bool = False
+) -> CompiledSource:
+    """
+    Compile the specified stdlib header with the provided options, once per process.
+
+    Headers are compiled in isolation from any script that includes them, so the resulting
+    statements & resolved scope depths can be shared by every `Lox` instance in the process that
+    compiles with the same options. See `compile_source` for a description of the options.
+
+    NOTE: The returned statements are shared & should be treated as immutable.
+    """
+    return _load_header(header_filepath, (arena, optimize, intern))
+
+
+@cache
+def _load_header(header_filepath: Path, options: _CompileOptions) -> CompiledSource:
+    compiled = compile_source(
+        load_if_exists(header_filepath),
+        _HeaderErrorReporter(),
+        ScannerEngine.REGEX,
+        header_filepath,
+        *options,
+    )
+    assert compiled is not None  # Any errors are raised by the reporter
+    return compiled
+
+
+class Module(t.NamedTuple):  # noqa: D101
+    filepath: Path
+    compiled: CompiledSource
+    includes: dict[Path, int]  # Module path -> zero-indexed include line
+    references: tuple[frozenset[str], ...]  # Names referenced by each top-level statement
+    line_index: LineIndex  # Line starts of the module's compiled source, see `location`
+
+    def location(self, offset: int) -> SourceLocation:
+        """
+        Return the file & zero-indexed line & column of the specified module source offset.
+
+        Offsets are into the module's compiled source, e.g. `Token.start`, where the module's
+        `include` statements have been blanked out so lines match the module's source file.
+        """
+        return self.line_index.source_location(offset)
+
+
+def _build_module(
+    filepath: Path, src: str, compiled: CompiledSource, includes: dict[Path, int]
+) -> Module:
+    references = tuple(find_references((stmt,)) for stmt in compiled.statements)
+    return Module(filepath, compiled, includes, references, LineIndex(src, filepath))
+
+
+@cache
+def _header_module(header_filepath: Path, options: _CompileOptions) -> Module:
+    return _build_module(
+        header_filepath,
+        load_if_exists(header_filepath),
+        _load_header(header_filepath, options),
+        {},
+    )
+
+
+# Compiled modules are shared by the entire process, keyed by path & the options they're compiled
+# with. Each module is stored alongside the (mtime, size) of its source file when it was compiled
+_MODULES: dict[tuple[Path, _CompileOptions], tuple[tuple[int, int], Module]] = {}
+
+
+def clear_module_cache() -> None:
+    """Discard all compiled modules, forcing them to be recompiled the next time they're loaded."""
+    _MODULES.clear()
+
+
+# Source file (mtime, size), source (None if the compiled module in the cache is up to date)
+_ModuleSource = tuple[tuple[int, int], t.Optional[str]]
+
+
+def _read_module_source(filepath: Path, options: _CompileOptions) -> _ModuleSource:
+    """Stat the module's source file, only reading the source if the module needs compiling."""
+    try:
+        stat = filepath.stat()
+    except FileNotFoundError:
+        raise source_not_found(filepath) from None
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if (cached := _MODULES.get((filepath, options))) is not None and cached[0] == signature:
+        return signature, None
+
+    return signature, filepath.read_text()
+
+
+@dataclass(slots=True)
+class _LoadContext:
+    """State shared while walking a module include graph."""
+
+    reporter: _ErrorTracker
+    use_cache: bool
+    options: _CompileOptions
+    executor: ThreadPoolExecutor
+    loaded: dict[Path, Module] = field(default_factory=dict)
+    include_stack: list[Path] = field(default_factory=list)
+    prefetched: dict[Path, Future[_ModuleSource]] = field(default_factory=dict)
+
+    def prefetch(self, filepaths: abc.Iterable[Path]) -> None:
+        """Start reading the source of the provided modules in the background."""
+        for filepath in filepaths:
+            if filepath in self.prefetched or filepath.parent == STDLIB_PATH:
+                continue
+
+            self.prefetched[filepath] = self.executor.submit(
+                _read_module_source, filepath, self.options
+            )
+
+
+class ModuleLoader:
+    """
+    The pylox module loader!
+
+    Each included file is compiled once, in isolation from the source that includes it, into a
+    `Module`. Unlike the spliced includes of the `PreProcessor`, modules may themselves include
+    other modules. The resulting include graph is walked depth-first so each module is loaded
+    once, no matter how many modules include it, & is ordered before any module that includes it.
+
+    Compiled modules are cached for the life of the process & are only recompiled if their source
+    file changes on disk, so the cost of loading a large set of modules scales with the number of
+    changed files rather than the total amount of source. Stdlib headers are never recompiled, see
+    `load_header`. Modules are compiled with the loader's compilation options, see
+    `compile_source`, & modules compiled with different options are cached separately.
+
+    As soon as a module's includes are known, their source files are read concurrently by a pool of
+    up to `max_workers` threads, which hides the latency of slow (e.g. network) filesystems.
+
+    Every module loaded is tracked in `modules`, so tooling (e.g. profilers or coverage) can map an
+    offset into a module's compiled source back to its file, line, & column, see `location`.
+
+    NOTE: Modules are separately compiled, but their top-level declarations are all defined in the
+    including interpreter's global namespace.
+    """
+
+    def __init__(
+        self,
+        interp: LoxInterpreterProtocol,
+        scanner_engine: ScannerEngine = ScannerEngine.CLASSIC,
+        max_workers: int = 8,
+        arena: bool = False,
+        optimize: bool = False,
+        intern: bool = False,
+    ) -> None:
+        self._interp = interp
+        self.scanner_engine = scanner_engine
+        self.max_workers = max_workers
+        self.options = (arena, optimize, intern)
+        self.modules: dict[Path, Module] = {}
+
+    def line_index(self, filepath: Path) -> LineIndex:
+        """Return the line index of the specified loaded module's source."""
+        return self.modules[filepath].line_index
+
+    def location(self, filepath: Path, offset: int) -> SourceLocation:
+        """Return the file & zero-indexed line & column of an offset into a loaded module."""
+        return self.modules[filepath].location(offset)
+
+    def load(
+        self, includes: abc.Iterable[Path], use_cache: bool = False
+    ) -> t.Optional[list[Module]]:
+        """
+        Load the specified modules, along with all of the modules they include.
+
+        Modules are returned in dependency order. If any module fails to load then the errors are
+        reported to the interpreter & `None` is returned.
+
+        If `use_cache` is `True`, compiled modules are also persisted to disk & reused across
+        processes, see `pylox.cache.CompilationCache`.
+        """
+        reporter = _ErrorTracker(self._interp)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            ctx = _LoadContext(reporter, use_cache, self.options, executor)
+
+            includes = list(includes)
+            ctx.prefetch(includes)
+            for filepath in includes:
+                self._visit(filepath, ctx)
+
+        if reporter.had_error:
+            return None
+
+        self.modules.update(ctx.loaded)
+        return list(ctx.loaded.values())
+
+    def _visit(self, filepath: Path, ctx: _LoadContext) -> None:
+        """Load the specified module after recursively loading everything that it includes."""
+        if filepath in ctx.loaded:
+            return
+
+        module = self._load_module(filepath, ctx)
+        if module is None:
+            return
+
+        ctx.prefetch(module.includes)
+        ctx.include_stack.append(filepath)
+        for include, include_line in module.includes.items():
+            if include in ctx.include_stack:
+                ctx.reporter.report_error(
+                    LoxPreProcessorError(
+                        include_line, 0, f"Circular include of '{include.name}'.", filepath
+                    )
+                )
+                continue
+
+            self._visit(include, ctx)
+        ctx.include_stack.pop()
+
+        ctx.loaded[filepath] = module
+
+    def _load_module(self, filepath: Path, ctx: _LoadContext) -> t.Optional[Module]:
+        """Load the compiled module from the process-wide cache, compiling it if necessary."""
+        if filepath.parent == STDLIB_PATH:
+            return _header_module(filepath, ctx.options)
+
+        signature, src = ctx.prefetched[filepath].result()
+        if src is None:
+            return _MODULES[(filepath, ctx.options)][1]
+
+        # Includes of a module are relative to the module, rather than the including script
+        preprocessor = PreProcessor(src, splice_includes=False, include_dir=filepath.parent)
+        resolved_src = preprocessor.resolved_src
+
+        disk_cache = CompilationCache(filepath) if ctx.use_cache else None
+        compiled = disk_cache.load(resolved_src, *ctx.options) if disk_cache is not None else None
+        if compiled is None:
+            compiled = compile_source(
+                resolved_src, ctx.reporter, self.scanner_engine, filepath, *ctx.options
+            )
+            if compiled is None:
+                return None
+
+            if disk_cache is not None:
+                disk_cache.store(resolved_src, compiled, *ctx.options)
+
+        module = _build_module(filepath, resolved_src, compiled, preprocessor.includes)
+        _MODULES[(filepath, ctx.options)] = (signature, module)
+        return module
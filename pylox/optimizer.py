@@ -0,0 +1,543 @@
+import typing as t
+from collections import abc
+from functools import partial
+
+from pylox import grammar
+from pylox.error import LoxRuntimeError
+from pylox.interpreter import _binary_op, _unary_op, is_truthy
+from pylox.tokens import LITERAL_T, TokenType
+
+# Constant integer powers are only folded if their result is known to fit in this many bits, so
+# compiling e.g. `2 ^ 1000000000` or `((2 ^ 256) ^ 256) ^ 256` doesn't hang on building a huge
+# integer that the program may never actually need
+MAX_FOLDED_BITS = 65536
+
+# Operators specialized for division by a known non-zero number, see `Optimizer._reduce_strength`
+NONZERO_DIVISOR_OPERATORS = frozenset((TokenType.BACK_SLASH, TokenType.PERCENT))
+
+
+def _power_too_large(base: t.Any, exponent: t.Any) -> bool:
+    """Check if raising the integer base to the integer exponent could exceed `MAX_FOLDED_BITS`."""
+    if type(base) is not int or type(exponent) is not int or exponent <= 0:
+        # Anything else is either a float or raises a runtime error
+        return False
+
+    # The result needs at most `exponent` times as many bits as the base
+    return abs(base).bit_length() * exponent > MAX_FOLDED_BITS
+
+
+def _children(expr: grammar.Expr) -> tuple[grammar.Expr, ...]:
+    """Return the subexpressions of the provided expression, in evaluation order."""
+    match expr:
+        case grammar.Binary() | grammar.Logical():
+            return (expr.expr_left, expr.expr_right)
+        case grammar.Unary():
+            return (expr.expr_right,)
+        case grammar.Grouping():
+            return (expr.expr_expression,)
+        case grammar.Call():
+            return (expr.callee, *expr.arguments)
+        case grammar.Get():
+            return (expr.object_,)
+        case grammar.Set():
+            return (expr.object_, expr.value)
+        case grammar.Assign():
+            return (expr.value,)
+        case _:
+            return ()
+
+
+def _attach(expr: grammar.Expr, children: list[grammar.Expr]) -> None:
+    """
+    Replace the subexpressions of the provided expression, in the same order as `_children`.
+
+    Fields are only assigned if their subexpression was actually replaced, since assigning a field
+    of an arena view copies the new value into the arena.
+    """
+    match expr:
+        case grammar.Binary() | grammar.Logical():
+            left, right = children
+            if left != expr.expr_left:
+                expr.expr_left = left
+            if right != expr.expr_right:
+                expr.expr_right = right
+        case grammar.Unary():
+            if children[0] != expr.expr_right:
+                expr.expr_right = children[0]
+        case grammar.Grouping():
+            if children[0] != expr.expr_expression:
+                expr.expr_expression = children[0]
+        case grammar.Call():
+            callee, *arguments = children
+            if callee != expr.callee:
+                expr.callee = callee
+            if arguments != expr.arguments:
+                expr.arguments = arguments
+        case grammar.Get():
+            if children[0] != expr.object_:
+                expr.object_ = children[0]
+        case grammar.Set():
+            object_, value = children
+            if object_ != expr.object_:
+                expr.object_ = object_
+            if value != expr.value:
+                expr.value = value
+        case grammar.Assign():
+            if children[0] != expr.value:
+                expr.value = children[0]
+        case _:
+            pass
+
+
+# Returned by the visitor of a compound statement, the callback finishing the statement & the
+# statements nested in it, see `Optimizer.optimize`
+_Nested = tuple[abc.Callable[[list[t.Optional[grammar.Stmt]]], t.Optional[grammar.Stmt]], t.Any]
+
+
+class Optimizer:
+    """
+    The pylox optimizer!
+
+    This runs at compile time, once the source has been resolved, & simplifies the tree in place:
+        * Constant subexpressions (e.g. `60 * 60 * 24`, `-1`, `"a" + "b"`, or `!true`) are folded
+          into a single literal
+        * `Grouping` nodes are replaced by the expression they wrap
+        * Logical expressions with a constant left operand are short circuited
+        * `if` branches with a constant condition are pruned, as are `while` loops whose condition
+          is constantly falsey
+        * Operators whose right operand is a constant number (e.g. `x ^ 2` or `i % 3`) are
+          specialized, see `_reduce_strength`
+
+    Constants are folded using the interpreter's own operators, so folding is exact. Any constant
+    subexpression that would raise an error (e.g. `-"a"` or `1 + true`) is left as is, so the error
+    is still raised if (and only if) the subexpression is evaluated at runtime.
+
+    The optimizer only ever replaces a node with a new `Literal` or with one of its own
+    descendants, so any scope depths already resolved for the nodes of the tree remain valid.
+    """
+
+    def optimize(self, statements: t.Sequence[grammar.Stmt]) -> list[grammar.Stmt]:
+        """
+        Optimize the provided statements, returning the statements that remain.
+
+        The tree is walked in post-order using an explicit stack. The visitor
+        of a compound statement returns the statements nested in it along with a callback, which is
+        called to finish the statement with the optimized nested statements once they have been.
+        Optimized statements are collected in `optimized`, or `None` if they were removed.
+        """
+        # Each pending entry is a statement to optimize & -1, or the callback finishing a compound
+        # statement & its number of nested statements
+        pending: list[tuple[t.Any, int]] = [(stmt, -1) for stmt in reversed(statements)]
+        optimized: list[t.Optional[grammar.Stmt]] = []
+        while pending:
+            stmt, n_nested = pending.pop()
+            if n_nested < 0:
+                result = stmt.accept(self)
+                if type(result) is not tuple:
+                    optimized.append(result)
+                    continue
+
+                finish, nested = result
+                pending.append((finish, len(nested)))
+                pending.extend((nested_stmt, -1) for nested_stmt in reversed(nested))
+                continue
+
+            nested = optimized[len(optimized) - n_nested :]
+            del optimized[len(optimized) - n_nested :]
+            optimized.append(stmt(nested))
+
+        return [stmt for stmt in optimized if stmt is not None]
+
+    def _branch(self, stmt: t.Optional[grammar.Stmt]) -> grammar.Stmt:
+        """Keep a statement that can't be removed entirely, e.g. the body of a loop."""
+        if stmt is None:
+            return grammar.Block([])
+
+        return stmt
+
+    def _optimize_expression(self, expr: grammar.Expr) -> grammar.Expr:
+        """
+        Optimize the provided expression, returning the expression to replace it with.
+
+        The tree is walked in post-order using an explicit stack. Each expression is folded once all
+        of its subexpressions have been, with the optimized subexpressions collected in `folded`.
+        """
+        # Each pending entry is an expression & its number of subexpressions, or -1 if they've yet
+        # to be pushed
+        pending: list[tuple[grammar.Expr, int]] = [(expr, -1)]
+        folded: list[grammar.Expr] = []
+        while pending:
+            expr, n_children = pending.pop()
+            if n_children < 0:
+                subexpressions = _children(expr)
+                pending.append((expr, len(subexpressions)))
+                pending.extend((child, -1) for child in reversed(subexpressions))
+                continue
+
+            children = folded[len(folded) - n_children :]
+            del folded[len(folded) - n_children :]
+            _attach(expr, children)
+            folded.append(expr.accept(self))
+
+        return folded[0]
+
+    def visit_Assign(self, expr: grammar.Assign) -> grammar.Expr:
+        return expr
+
+    def visit_Binary(self, expr: grammar.Binary) -> grammar.Expr:
+        left, right = expr.expr_left, expr.expr_right
+        if not isinstance(right, grammar.Literal):
+            return expr
+
+        if not isinstance(left, grammar.Literal):
+            return self._reduce_strength(expr, right.object_value)
+
+        operator = expr.token_operator
+        if operator.token_type == TokenType.CARAT and _power_too_large(
+            left.object_value, right.object_value
+        ):
+            return expr
+
+        try:
+            value = _binary_op(operator, left.object_value, right.object_value)
+        except (LoxRuntimeError, ArithmeticError, TypeError):
+            return expr
+
+        return grammar.Literal(value)
+
+    def _reduce_strength(self, expr: grammar.Binary, constant: t.Any) -> grammar.Expr:
+        """
+        Mark the binary expression as specialized for its constant right operand, if possible.
+
+        Specialized operators only check the type of their left operand, since the right operand is
+        already known to be a number; `\\` & `%` by a non-zero number also can't divide by zero.
+        See `pylox.interpreter._specialized_op`.
+        """
+        operator = expr.token_operator.token_type
+        if type(constant) is int and operator == TokenType.CARAT:
+            expr.specialized = True
+        elif type(constant) in (int, float) and constant != 0:
+            if operator in NONZERO_DIVISOR_OPERATORS:
+                expr.specialized = True
+
+        return expr
+
+    def visit_Call(self, expr: grammar.Call) -> grammar.Expr:
+        return expr
+
+    def visit_Get(self, expr: grammar.Get) -> grammar.Expr:
+        return expr
+
+    def visit_Grouping(self, expr: grammar.Grouping) -> grammar.Expr:
+        return expr.expr_expression
+
+    def visit_Literal(self, expr: grammar.Literal) -> grammar.Expr:
+        return expr
+
+    def visit_Logical(self, expr: grammar.Logical) -> grammar.Expr:
+        left = expr.expr_left
+        if not isinstance(left, grammar.Literal):
+            return expr
+
+        # Logical operators evaluate to one of their operands, so the expression collapses into
+        # whichever operand it would evaluate to
+        if expr.token_operator.token_type == TokenType.OR:
+            return left if is_truthy(left.object_value) else expr.expr_right
+        else:
+            return expr.expr_right if is_truthy(left.object_value) else left
+
+    def visit_Set(self, expr: grammar.Set) -> grammar.Expr:
+        return expr
+
+    def visit_Super(self, expr: grammar.Super) -> grammar.Expr:
+        return expr
+
+    def visit_This(self, expr: grammar.This) -> grammar.Expr:
+        return expr
+
+    def visit_Unary(self, expr: grammar.Unary) -> grammar.Expr:
+        right = expr.expr_right
+        if not isinstance(right, grammar.Literal):
+            return expr
+
+        try:
+            value = _unary_op(expr.token_operator, right.object_value)
+        except (LoxRuntimeError, TypeError):
+            return expr
+
+        return grammar.Literal(value)
+
+    def visit_Variable(self, expr: grammar.Variable) -> grammar.Expr:
+        return expr
+
+    def visit_Block(self, stmt: grammar.Block) -> _Nested:
+        return (partial(self._finish_block, stmt), stmt.statements)
+
+    def _finish_block(
+        self, stmt: grammar.Block, statements: list[t.Optional[grammar.Stmt]]
+    ) -> grammar.Block:
+        remaining = [nested for nested in statements if nested is not None]
+        if remaining != stmt.statements:
+            stmt.statements = remaining
+
+        return stmt
+
+    def visit_Class(self, stmt: grammar.Class) -> _Nested:
+        # Methods are never removed, so there's nothing left to do once they've been optimized
+        return (lambda _: stmt, stmt.methods)
+
+    def visit_Expression(self, stmt: grammar.Expression) -> grammar.Expression:
+        expr = self._optimize_expression(stmt.expr_expression)
+        if expr != stmt.expr_expression:
+            stmt.expr_expression = expr
+
+        return stmt
+
+    def visit_Function(self, stmt: grammar.Function) -> _Nested:
+        return (partial(self._finish_function, stmt), stmt.body)
+
+    def _finish_function(
+        self, stmt: grammar.Function, body: list[t.Optional[grammar.Stmt]]
+    ) -> grammar.Function:
+        remaining = [nested for nested in body if nested is not None]
+        if remaining != stmt.body:
+            stmt.body = remaining
+
+        return stmt
+
+    def visit_If(self, stmt: grammar.If) -> t.Optional[_Nested]:
+        # Flatten the `else if` chain; branches with a constant condition are either dropped or
+        # become the final `else` of the chain
+        live_branches = []
+        branch: t.Optional[grammar.Stmt] = stmt
+        while isinstance(branch, grammar.If):
+            condition = self._optimize_expression(branch.condition)
+            if isinstance(condition, grammar.Literal):
+                if is_truthy(condition.object_value):
+                    branch = branch.then_branch
+                    break
+
+                branch = branch.else_branch
+                continue
+
+            if condition != branch.condition:
+                branch.condition = condition
+
+            live_branches.append(branch)
+            branch = branch.else_branch
+
+        nested = [live_branch.then_branch for live_branch in live_branches]
+        if branch is not None:
+            nested.append(branch)
+        elif not live_branches:
+            return None
+
+        return (partial(self._finish_if, live_branches, branch is not None), nested)
+
+    def _finish_if(
+        self,
+        live_branches: list[grammar.If],
+        has_tail: bool,
+        nested: list[t.Optional[grammar.Stmt]],
+    ) -> t.Optional[grammar.Stmt]:
+        tail = nested.pop() if has_tail else None
+        if not live_branches:
+            return tail
+
+        for live_branch, then_branch in zip(live_branches, nested, strict=True):
+            then_branch = self._branch(then_branch)
+            if then_branch != live_branch.then_branch:
+                live_branch.then_branch = then_branch
+
+        for live_branch, else_branch in zip(live_branches, [*live_branches[1:], tail], strict=True):
+            if else_branch != live_branch.else_branch:
+                live_branch.else_branch = else_branch
+
+        return live_branches[0]
+
+    def visit_Var(self, stmt: grammar.Var) -> grammar.Var:
+        if stmt.initializer is not None:
+            initializer = self._optimize_expression(stmt.initializer)
+            if initializer != stmt.initializer:
+                stmt.initializer = initializer
+
+        return stmt
+
+    def visit_Return(self, stmt: grammar.Return) -> grammar.Return:
+        if stmt.value is not None:
+            value = self._optimize_expression(stmt.value)
+            if value != stmt.value:
+                stmt.value = value
+
+        return stmt
+
+    def visit_Print(self, stmt: grammar.Print) -> grammar.Print:
+        expr = self._optimize_expression(stmt.expr_expression)
+        if expr != stmt.expr_expression:
+            stmt.expr_expression = expr
+
+        return stmt
+
+    def visit_While(self, stmt: grammar.While) -> t.Optional[_Nested]:
+        condition = self._optimize_expression(stmt.condition)
+        if isinstance(condition, grammar.Literal) and not is_truthy(condition.object_value):
+            return None
+
+        if condition != stmt.condition:
+            stmt.condition = condition
+
+        return (partial(self._finish_while, stmt), (stmt.body,))
+
+    def _finish_while(
+        self, stmt: grammar.While, nested: list[t.Optional[grammar.Stmt]]
+    ) -> grammar.While:
+        body = self._branch(nested[0])
+        if body != stmt.body:
+            stmt.body = body
+
+        return stmt
+
+    def visit_Break(self, stmt: grammar.Break) -> grammar.Break:
+        return stmt
+
+    def visit_Continue(self, stmt: grammar.Continue) -> grammar.Continue:
+        return stmt
+
+
+# Operators that can never raise a runtime error themselves, see `Interner`
+NON_RAISING_OPERATORS = frozenset(
+    (TokenType.AND, TokenType.OR, TokenType.BANG, TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL)
+)
+
+
+def _literal_key(value: LITERAL_T) -> tuple[t.Any, ...]:
+    """Build an interning key that distinguishes every literal value that prints differently."""
+    # Python considers e.g. `1 == 1.0 == True` & `0.0 == -0.0`, so key on type & exact float value
+    if isinstance(value, float):
+        return (grammar.Literal, float, value.hex())
+
+    return (grammar.Literal, type(value), value)
+
+
+class Interner:
+    """
+    The pylox interner!
+
+    This runs at compile time, once the source has been resolved (& optionally optimized), &
+    hash-conses the tree in place: structurally identical subexpressions are replaced by a single
+    shared instance, & any resolved locals of the discarded duplicates are dropped.
+
+    Only subexpressions that can neither have a side effect nor raise a runtime error are shared, so
+    sharing is never observable; e.g. every runtime error is still located using the tokens of the
+    expression that raised it. These are literals, local variables & `this`, & any logical
+    expressions, negations (`!`), & equality comparisons of them. Local variables are only shared
+    with variables resolved to the same scope depth & slot (or upvalue), so sharing never changes
+    which variable is read. Global variables aren't shared, since reading an undefined global raises
+    an error.
+    """
+
+    def __init__(self, locals_: dict[grammar.Expr, tuple[int, int]]) -> None:
+        self._locals = locals_
+
+        # Interning key -> shared instance; the shared instances are kept alive by the table, so
+        # their ids can be used in the keys of their parents
+        self._interned: dict[tuple[t.Any, ...], grammar.Expr] = {}
+
+    def intern(self, statements: abc.Iterable[grammar.Stmt]) -> None:
+        """Intern the subexpressions of the provided statements."""
+        pending = list(statements)
+        while pending:
+            match stmt := pending.pop():
+                case grammar.Expression() | grammar.Print():
+                    stmt.expr_expression = self._intern_expression(stmt.expr_expression)
+                case grammar.Var():
+                    if stmt.initializer is not None:
+                        stmt.initializer = self._intern_expression(stmt.initializer)
+                case grammar.Return():
+                    if stmt.value is not None:
+                        stmt.value = self._intern_expression(stmt.value)
+                case grammar.If():
+                    stmt.condition = self._intern_expression(stmt.condition)
+                    pending.append(stmt.then_branch)
+                    if stmt.else_branch is not None:
+                        pending.append(stmt.else_branch)
+                case grammar.While():
+                    stmt.condition = self._intern_expression(stmt.condition)
+                    pending.append(stmt.body)
+                case grammar.Block():
+                    pending.extend(stmt.statements)
+                case grammar.Function():
+                    pending.extend(stmt.body)
+                case grammar.Class():
+                    pending.extend(stmt.methods)
+                case _:
+                    pass
+
+    def _intern_expression(self, expr: grammar.Expr) -> grammar.Expr:
+        """
+        Intern the provided expression, returning the (possibly shared) expression to replace it.
+
+        As with `Optimizer._optimize_expression`, the tree is walked in post-order using an
+        explicit stack. Each interned subexpression is collected in `interned` along with its
+        interning key, or `None` if it can't be shared.
+        """
+        pending: list[tuple[grammar.Expr, int]] = [(expr, -1)]
+        interned: list[tuple[grammar.Expr, t.Optional[tuple[t.Any, ...]]]] = []
+        while pending:
+            expr, n_children = pending.pop()
+            if n_children < 0:
+                subexpressions = _children(expr)
+                pending.append((expr, len(subexpressions)))
+                pending.extend((child, -1) for child in reversed(subexpressions))
+                continue
+
+            children = interned[len(interned) - n_children :]
+            del interned[len(interned) - n_children :]
+            _attach(expr, [child for child, _ in children])
+
+            key = self._key(expr, children)
+            if key is None:
+                interned.append((expr, None))
+                continue
+
+            shared = self._interned.setdefault(key, expr)
+            if shared is not expr:
+                self._locals.pop(expr, None)
+
+            interned.append((shared, key))
+
+        return interned[0][0]
+
+    def _key(
+        self,
+        expr: grammar.Expr,
+        children: list[tuple[grammar.Expr, t.Optional[tuple[t.Any, ...]]]],
+    ) -> t.Optional[tuple[t.Any, ...]]:
+        """Build the interning key of the expression, or return `None` if it can't be shared."""
+        if any(key is None for _, key in children):
+            return None
+
+        child_ids = tuple(id(child) for child, _ in children)
+        match expr:
+            case grammar.Literal():
+                return _literal_key(expr.object_value)
+            case grammar.Variable():
+                if expr not in self._locals:
+                    return None
+
+                return (grammar.Variable, expr.name.lexeme, self._locals[expr], expr.upvalue)
+            case grammar.This():
+                if expr not in self._locals:
+                    return None
+
+                return (grammar.This, self._locals[expr], expr.upvalue)
+            case grammar.Grouping():
+                return (grammar.Grouping, *child_ids)
+            case grammar.Logical() | grammar.Unary() | grammar.Binary():
+                operator = expr.token_operator.token_type
+                if operator not in NON_RAISING_OPERATORS:
+                    return None
+
+                return (type(expr), operator, *child_ids)
+            case _:
+                return None
@@ -1,7 +1,10 @@
 import typing as t
 from collections import abc
+from enum import IntEnum, auto
+from functools import partial
 
 from pylox import grammar
+from pylox.arena import Arena
 from pylox.error import LoxParseError
 from pylox.protocols.interpreter import LoxInterpreterProtocol
 from pylox.tokens import Token, TokenType
@@ -9,22 +12,110 @@ from pylox.tokens import Token, TokenType
 MAX_ARGS = 255
 
 
+class Precedence(IntEnum):
+    """Binding power of the binary operators, from loosest to tightest."""
+
+    NONE = 0
+    OR = auto()
+    AND = auto()
+    EQUALITY = auto()
+    COMPARISON = auto()
+    TERM = auto()
+    FACTOR = auto()
+    POWER = auto()
+
+
+BINARY_PRECEDENCE = {
+    TokenType.OR: Precedence.OR,
+    TokenType.AND: Precedence.AND,
+    TokenType.BANG_EQUAL: Precedence.EQUALITY,
+    TokenType.EQUAL_EQUAL: Precedence.EQUALITY,
+    TokenType.GREATER: Precedence.COMPARISON,
+    TokenType.GREATER_EQUAL: Precedence.COMPARISON,
+    TokenType.LESS: Precedence.COMPARISON,
+    TokenType.LESS_EQUAL: Precedence.COMPARISON,
+    TokenType.MINUS: Precedence.TERM,
+    TokenType.PLUS: Precedence.TERM,
+    TokenType.STAR: Precedence.FACTOR,
+    TokenType.SLASH: Precedence.FACTOR,
+    TokenType.BACK_SLASH: Precedence.FACTOR,
+    TokenType.PERCENT: Precedence.FACTOR,
+    TokenType.CARAT: Precedence.POWER,
+}
+UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+KEYWORD_LITERALS = {TokenType.TRUE: True, TokenType.FALSE: False, TokenType.NIL: None}
+
+# Tokens that are likely to start a new statement, used to resynchronize after a parsing error
+SYNCHRONIZATION_TOKENS = frozenset(
+    (
+        TokenType.CLASS,
+        TokenType.FOR,
+        TokenType.FUN,
+        TokenType.IF,
+        TokenType.PRINT,
+        TokenType.RETURN,
+        TokenType.VAR,
+        TokenType.WHILE,
+    )
+)
+
+
 class ParseException(BaseException):  # noqa: D101
     ...
 
 
+class _Pending(IntEnum):
+    """Kinds of partially parsed expression, waiting on an operand to complete them."""
+
+    UNARY = auto()  # (UNARY, operator)
+    BINARY = auto()  # (BINARY, left, operator, precedence)
+    ASSIGN = auto()  # (ASSIGN, target, equals)
+    GROUPING = auto()  # (GROUPING, left_paren)
+    ARGUMENTS = auto()  # (ARGUMENTS, callee, arguments)
+
+
+_PendingExpr = tuple[t.Any, ...]
+
+
+class _PendingStatement(IntEnum):
+    """Kinds of partially parsed statement, waiting on a nested statement to complete them."""
+
+    BODY = auto()  # (BODY, statements, build), for blocks & function bodies
+    CLASS = auto()  # (CLASS, name, superclass, methods)
+    FOR = auto()  # (FOR, initializer, condition, increment)
+    WHILE = auto()  # (WHILE, condition)
+    IF = auto()  # (IF, branches, condition)
+    ELSE = auto()  # (ELSE, branches)
+
+
+_PendingStmt = tuple[t.Any, ...]
+
+
 class Parser:
     """
-    The Pylox Recursive Descent Parser!
+    The Pylox Parser!
 
     See `grammar.md` in the project root for the formal grammar definition.
+
+    Though the grammar is recursive, the parser isn't a recursive descent parser: statements &
+    expressions may be nested arbitrarily deeply, so rather than recursing through a method per
+    grammar rule, they're parsed iteratively with an explicit stack of the pending statements or
+    expressions, & their nesting depth isn't bounded by Python's recursion limit. The passes over
+    the resulting tree (resolving, optimizing, tree shaking, & copying it into an arena) walk it
+    with explicit stacks likewise.
     """
 
-    def __init__(self, tokens: list[Token], interpreter: LoxInterpreterProtocol) -> None:
+    def __init__(self, tokens: abc.Iterable[Token], interpreter: LoxInterpreterProtocol) -> None:
         self.tokens = tokens
         self._interpreter = interpreter
 
-        self._current = 0
+        # Tokens are pulled from the source on demand, so the source may be a lazy token generator
+        # (e.g. a streaming scanner) rather than a fully materialized list. Since the grammar only
+        # ever needs one token of lookahead, the buffer only needs to hold the current & most
+        # recently consumed tokens.
+        self._token_source = iter(tokens)
+        self._current_token = next(self._token_source)
+        self._previous_token = self._current_token
 
     def parse(self) -> t.Optional[list[t.Union[grammar.Expr, grammar.Stmt]]]:
         """
@@ -38,20 +129,41 @@ class Parser:
 
         return statements
 
+    def parse_arena(self) -> Arena:
+        """
+        Attempt to parse the loaded tokens into a flat `Arena` of statements.
+
+        Each top-level declaration is copied into the arena as soon as it's parsed, so only the
+        node objects of a single top-level declaration are alive at once, rather than a separate
+        object for every node of the source.
+
+        As with `parse`, all encountered errors will be reported to the interpreter; any
+        declaration that failed to parse is omitted from the arena.
+        """
+        arena = Arena()
+        while not self._is_eof():
+            declaration = self._declaration()
+            if declaration is not None:
+                arena.add_root(declaration)
+
+        return arena
+
     def _is_eof(self) -> bool:
         """Check if we're at the end of the file & run out of tokens to parse."""
-        return self._peek().token_type == TokenType.EOF
+        return self._current_token.token_type == TokenType.EOF
 
     def _advance(self) -> Token:
         """Return the next token to be consumed by the parser & advance the pointer location."""
-        if not self._is_eof():
-            self._current += 1
+        if self._current_token.token_type != TokenType.EOF:
+            self._previous_token = self._current_token
+            self._current_token = next(self._token_source)
 
-        return self._previous()
+        return self._previous_token
 
     def _match(self, *query_token_types: TokenType) -> bool:
         """Check if the current token matches any of the query token type(s)."""
-        if any((self._check(query_token) for query_token in query_token_types)):
+        token_type = self._current_token.token_type
+        if token_type in query_token_types and token_type != TokenType.EOF:
             self._advance()
             return True
 
@@ -59,18 +171,16 @@ class Parser:
 
     def _check(self, query_token_type: TokenType) -> bool:
         """Check if the current token matches the query token type."""
-        if self._is_eof():
-            return False
-
-        return self._peek().token_type == query_token_type
+        token_type = self._current_token.token_type
+        return token_type == query_token_type and token_type != TokenType.EOF
 
     def _peek(self) -> Token:
         """Return the current token we have yet to consume."""
-        return self.tokens[self._current]
+        return self._current_token
 
     def _previous(self) -> Token:
         """Return the most recently consumed token."""
-        return self.tokens[self._current - 1]
+        return self._previous_token
 
     def _consume(self, query_token_type: TokenType, msg: str) -> Token:
         """
@@ -85,8 +195,8 @@ class Parser:
 
         return self._advance()
 
-    def _report_error(self, err: LoxParseError) -> ParseException:
-        """Report the provided error to the invoking interpreter & return an exception for sync."""
+    def _report_error(self, err: LoxParseError) -> t.NoReturn:
+        """Report the provided error to the invoking interpreter & raise an exception for sync."""
         self._interpreter.report_error(err)
 
         raise ParseException
@@ -103,41 +213,166 @@ class Parser:
             if self._previous().token_type == TokenType.SEMICOLON:
                 return
 
-            match self._peek().token_type:
-                case (
-                    TokenType.CLASS
-                    | TokenType.FOR
-                    | TokenType.FUN
-                    | TokenType.IF
-                    | TokenType.PRINT
-                    | TokenType.RETURN
-                    | TokenType.VAR
-                    | TokenType.WHILE
-                ):
-                    return
+            if self._peek().token_type in SYNCHRONIZATION_TOKENS:
+                return
 
             self._advance()
 
     def _declaration(self) -> t.Any:
         """
-        Parse the declaration grammar.
+        Parse the declaration grammar, along with every statement nested inside of it.
 
         `declaration: classDecl | funDecl | varDecl | statement`
+
+        The head of each statement is parsed by its parselet (see `_statement_head`); compound
+        statements return a pending statement that's pushed to the stack, & each complete statement
+        is folded into the pending statements for as long as they are complete too.
+
+        If a parsing error is encountered, the pending statements are discarded up to the
+        innermost enclosing block, which resumes parsing its declarations once the parser has been
+        synchronized; the failed declaration is parsed as `None`.
         """
-        try:
-            if self._match(TokenType.CLASS):
-                return self._class_declaration()
-            if self._match(TokenType.FUN):
-                return self._function("function")
-            if self._match(TokenType.VAR):
-                return self._variable_declaration()
+        pending: list[_PendingStmt] = []
+        resume = False
+        while True:
+            try:
+                if resume:
+                    resume = False
+                    stmt = self._resume(pending)
+                else:
+                    stmt = self._statement_head(pending)
+
+                while stmt is not None:
+                    if not pending:
+                        return stmt
+
+                    stmt = self._fold_statement(stmt, pending)
+            except ParseException:
+                while pending and pending[-1][0] is not _PendingStatement.BODY:
+                    pending.pop()
+
+                self._synchronize()
+                if not pending:
+                    return None
 
-            return self._statement()
-        except ParseException:
-            self._synchronize()
-            return
+                pending[-1][1].append(None)
+                resume = True
 
-    def _class_declaration(self) -> grammar.Class:
+    def _statement_head(self, pending: list[_PendingStmt]) -> t.Optional[grammar.Stmt]:
+        """
+        Parse the next statement, or the head of a compound statement.
+
+        ```
+        statement:
+            | exprStmt
+            | forStmt
+            | ifStmt
+            | printStmt
+            | returnStmt
+            | whileStmt
+            | breakStmt
+            | continueStmt
+            | block
+        ```
+
+        The parsing method for each declaration & keyword statement is looked up from the type of
+        its leading token in `DECLARATION_PARSELETS` for the declarations of a block or the top
+        level, otherwise in `STATEMENT_PARSELETS`. Anything else is an expression statement.
+
+        A compound statement is pushed to the `pending` stack, & `None` is returned if it's waiting
+        on a nested statement, see `_resume`.
+        """
+        if not pending or pending[-1][0] is _PendingStatement.BODY:
+            parselet = DECLARATION_PARSELETS.get(self._current_token.token_type)
+        else:
+            parselet = STATEMENT_PARSELETS.get(self._current_token.token_type)
+
+        if parselet is None:
+            return self._expression_statement()
+
+        self._advance()
+        stmt = parselet(self)
+        if not isinstance(stmt, tuple):
+            return stmt
+
+        pending.append(stmt)
+        return self._resume(pending)
+
+    def _resume(self, pending: list[_PendingStmt]) -> t.Optional[grammar.Stmt]:
+        """
+        Resume the innermost pending statement, completing it if it isn't waiting on a statement.
+
+        Blocks & class bodies are complete at their closing brace, otherwise a block waits on its
+        next declaration & a class body parses the head of its next method. Any other pending
+        statement is waiting on its body.
+        """
+        while True:
+            kind = pending[-1][0]
+            if kind is _PendingStatement.BODY:
+                token_type = self._current_token.token_type
+                if token_type != TokenType.RIGHT_BRACE and token_type != TokenType.EOF:
+                    return None
+
+                # The block is popped first, so a missing brace is reported by the enclosing block
+                _, statements, build = pending.pop()
+                self._consume(TokenType.RIGHT_BRACE, "Expected '}' after block.")
+                return build(statements)  # type: ignore[no-any-return]
+
+            if kind is _PendingStatement.CLASS:
+                if not self._check(TokenType.RIGHT_BRACE) and not self._is_eof():
+                    pending.append(self._function("method"))
+                    continue
+
+                _, name, superclass, methods = pending.pop()
+                self._consume(TokenType.RIGHT_BRACE, "Expected '}' after class body.")
+                return grammar.Class(name, superclass, methods)
+
+            return None
+
+    def _fold_statement(
+        self, stmt: grammar.Stmt, pending: list[_PendingStmt]
+    ) -> t.Optional[grammar.Stmt]:
+        """
+        Fold the provided statement into the innermost pending statement.
+
+        `None` is returned if the pending statement needs another nested statement.
+        """
+        top = pending[-1]
+        if top[0] is _PendingStatement.BODY:
+            # By far the most common case, so it's checked before matching the others
+            top[1].append(stmt)
+            return self._resume(pending)
+
+        match top:
+            case (_PendingStatement.FOR, initializer, condition, increment):
+                pending.pop()
+                return self._desugar_for(initializer, condition, increment, stmt)
+            case (_PendingStatement.WHILE, condition):
+                pending.pop()
+                return grammar.While(condition, stmt)
+            case (_PendingStatement.IF, branches, condition):
+                pending.pop()
+                branches.append((condition, stmt))
+                if not self._match(TokenType.ELSE):
+                    return self._chain_if(branches, None)
+
+                # Chains of `else if` are collected in a single pending statement
+                if self._match(TokenType.IF):
+                    pending.append((_PendingStatement.IF, branches, self._if_condition()))
+                else:
+                    pending.append((_PendingStatement.ELSE, branches))
+
+                return None
+            case (_PendingStatement.ELSE, branches):
+                pending.pop()
+                return self._chain_if(branches, stmt)
+            case (_PendingStatement.CLASS, _, _, methods):
+                methods.append(stmt)
+                return self._resume(pending)
+            case unexpected:  # pragma: no cover
+                raise ValueError(f"Unexpected pending statement: {unexpected}")
+
+    def _class_declaration(self) -> _PendingStmt:
         """
         Parse the class declaration grammar.
 
@@ -152,17 +387,19 @@ class Parser:
 
         self._consume(TokenType.LEFT_BRACE, "Expected '{' before class body.")
 
-        methods = []
-        while not self._check(TokenType.RIGHT_BRACE) and not self._is_eof():
-            methods.append(self._function("method"))
+        return (_PendingStatement.CLASS, name, superclass, [])
 
-        self._consume(TokenType.RIGHT_BRACE, "Expected '}' after class body.")
+    def _function_declaration(self) -> _PendingStmt:
+        """
+        Parse the function declaration grammar.
 
-        return grammar.Class(name, superclass, methods)
+        `funDecl: "fun" function`
+        """
+        return self._function("function")
 
-    def _function(self, kind: str) -> grammar.Function:
+    def _function(self, kind: str) -> _PendingStmt:
         """
-        Parse the function declaration grammar.
+        Parse the function declaration grammar, up to the start of its body.
 
         Use `kind` to specify the function type for more specific error messages.
 
@@ -184,9 +421,8 @@ class Parser:
 
         self._consume(TokenType.RIGHT_PAREN, "Expected ')' after parameters.")
         self._consume(TokenType.LEFT_BRACE, f"Expected '{{' before {kind} body.")
-        body = self._block()
 
-        return grammar.Function(name, parameters, body)
+        return (_PendingStatement.BODY, [], partial(grammar.Function, name, parameters))
 
     def _variable_declaration(self) -> t.Any:
         """
@@ -204,57 +440,11 @@ class Parser:
         self._consume(TokenType.SEMICOLON, "Expected ';' after value.")
         return grammar.Var(name, initializer)
 
-    def _statement(self) -> grammar.Stmt:
-        """
-        Parse the statement grammar.
-
-        ```
-        statement:
-            | exprStmt
-            | forStmt
-            | ifStmt
-            | printStmt
-            | returnStmt
-            | whileStmt
-            | breakStmt
-            | continueStmt
-            | block
-        ```
-        """
-        if self._match(TokenType.FOR):
-            return self._for_statement()
-
-        if self._match(TokenType.IF):
-            return self._if_statement()
-
-        if self._match(TokenType.PRINT):
-            return self._print_statement()
-
-        if self._match(TokenType.RETURN):
-            return self._return_statement()
-
-        if self._match(TokenType.WHILE):
-            return self._while_statement()
-
-        if self._match(TokenType.BREAK):
-            return self._break_statement()
-
-        if self._match(TokenType.CONTINUE):
-            return self._continue_statement()
-
-        if self._match(TokenType.LEFT_BRACE):
-            return grammar.Block(self._block())
-
-        return self._expression_statement()
-
-    def _for_statement(self) -> grammar.Stmt:
+    def _for_statement(self) -> _PendingStmt:
         """
         Parse the for grammar.
 
         `forStmt: "for" "(" ( varDecl | exprStamt | ";" ) expression? ";" expression? ")" statement`
-
-        Rather than define a new grammar construct, the `for` statement is treated as syntatic sugar
-        for `while`, and its body used to generate the equivalent `while` loop.
         """
         self._consume(TokenType.LEFT_PAREN, "Expected '(' after 'for'.")
 
@@ -275,8 +465,21 @@ class Parser:
             increment = self._expression()
         self._consume(TokenType.RIGHT_PAREN, "Expected ')' after for clauses.")
 
-        # Build the corresponding while loop block
-        body = self._statement()
+        return (_PendingStatement.FOR, initializer, condition, increment)
+
+    def _desugar_for(
+        self,
+        initializer: t.Optional[grammar.Stmt],
+        condition: t.Optional[grammar.Expr],
+        increment: t.Optional[grammar.Expr],
+        body: grammar.Stmt,
+    ) -> grammar.Stmt:
+        """
+        Build the `while` loop equivalent to a `for` loop with the provided clauses & body.
+
+        Rather than define a new grammar construct, the `for` statement is treated as syntatic sugar
+        for `while`, and its body used to generate the equivalent `while` loop.
+        """
         if increment is not None:
             body = grammar.Block([body, grammar.Expression(increment)])
 
@@ -290,7 +493,7 @@ class Parser:
 
         return body
 
-    def _if_statement(self) -> grammar.If:
+    def _if_statement(self) -> _PendingStmt:
         """
         Parse the if grammar.
 
@@ -299,17 +502,28 @@ class Parser:
         The dangling else problem is avoided by binding the `else` statement to the nearest `if`
         statement that precedes it.
         """
+        return (_PendingStatement.IF, [], self._if_condition())
+
+    def _if_condition(self) -> grammar.Expr:
+        """Parse the parenthesized condition of an `if` statement."""
         self._consume(TokenType.LEFT_PAREN, "Expected '(' after 'if'.")
         condition = self._expression()
         self._consume(TokenType.RIGHT_PAREN, "Expected ')' after if condition.")
 
-        then_branch = self._statement()
-        if self._match(TokenType.ELSE):
-            else_branch = self._statement()
-        else:
-            else_branch = None
+        return condition
 
-        return grammar.If(condition, then_branch, else_branch)
+    def _chain_if(
+        self,
+        branches: list[tuple[grammar.Expr, grammar.Stmt]],
+        else_branch: t.Optional[grammar.Stmt],
+    ) -> grammar.If:
+        """Build the nested `if` statements of an `else if` chain, from its innermost branch."""
+        condition, then_branch = branches.pop()
+        if_statement = grammar.If(condition, then_branch, else_branch)
+        for condition, then_branch in reversed(branches):
+            if_statement = grammar.If(condition, then_branch, if_statement)
+
+        return if_statement
 
     def _print_statement(self) -> grammar.Print:
         """
@@ -336,7 +550,7 @@ class Parser:
         self._consume(TokenType.SEMICOLON, "Expected ';' after return value.")
         return grammar.Return(keyword, value)
 
-    def _while_statement(self) -> grammar.While:
+    def _while_statement(self) -> _PendingStmt:
         """
         Parse the while grammar.
 
@@ -345,9 +559,8 @@ class Parser:
         self._consume(TokenType.LEFT_PAREN, "Expected '(' after 'while'.")
         condition = self._expression()
         self._consume(TokenType.RIGHT_PAREN, "Expected ')' after condition.")
-        body = self._statement()
 
-        return grammar.While(condition, body)
+        return (_PendingStatement.WHILE, condition)
 
     def _break_statement(self) -> grammar.Break:
         """
@@ -380,251 +593,214 @@ class Parser:
 
         return grammar.Expression(expr)
 
-    def _block(self) -> list[grammar.Stmt]:
+    def _block_statement(self) -> _PendingStmt:
         """
-        Parse the block grammar.
+        Parse the block grammar, up to its first declaration.
 
         `block: "{" declaration* "}"`
         """
-        statements = []
-        while not self._check(TokenType.RIGHT_BRACE) and not self._is_eof():
-            statements.append(self._declaration())
-
-        self._consume(TokenType.RIGHT_BRACE, "Expected '}' after block.")
-        return statements
+        return (_PendingStatement.BODY, [], grammar.Block)
 
     def _expression(self) -> grammar.Expr:
         """
         Parse the expression grammar.
 
-        `expression: assignment`
-        """
-        return self._assignment()
-
-    def _assignment(self) -> grammar.Expr:
-        """
-        Parse the assignment grammar.
-
-        `assignment: ( call "." )? IDENTIFIER "=" assignment | equality`
-        """
-        expr = self._or()
-        if self._match(TokenType.EQUAL):
-            equals = self._previous()
-            value = self._assignment()
-            if isinstance(expr, grammar.Variable):
-                name = expr.name
-                return grammar.Assign(name, value)
-            elif isinstance(expr, grammar.Get):
-                return grammar.Set(expr.object_, expr.name, value)
-
-            self._report_error(LoxParseError(equals, "Invalid assignment target."))
-
-        return expr
-
-    def _or(self) -> grammar.Expr:
-        """
-        Parse the logic_or grammar.
-
-        `logic_or: logic_and ( "or" logic_and )*`
-        """
-        expr = self._and()
-        while self._match(TokenType.OR):
-            operator = self._previous()
-            right = self._and()
-            expr = grammar.Logical(expr, operator, right)
-
-        return expr
-
-    def _and(self) -> grammar.Expr:
-        """
-        Parse the logic_and grammar.
-
-        `logic_and: equality ( "and" equality )*`
-        """
-        expr = self._equality()
-        while self._match(TokenType.AND):
-            operator = self._previous()
-            right = self._equality()
-            expr = grammar.Logical(expr, operator, right)
-
-        return expr
-
-    def _match_binary(
-        self, expr_method: abc.Callable[..., grammar.Expr], *tokens: TokenType
-    ) -> grammar.Binary:
-        """
-        Helper loop for Binary expression parsing.
-
-        Expressions are assumed to be of the form:
-            `<expr_method> ( ( <tokens> ) <expr_method> )*`
-        """
-        expr = expr_method()
-        while self._match(*tokens):
-            operator = self._previous()
-            right = expr_method()
-
-            expr = grammar.Binary(expr, operator, right)
-
-        return expr
-
-    def _equality(self) -> grammar.Expr:
-        """
-        Parse the equality grammar.
-
-        `equality: comparison ( ( "!=" | "==" ) comparison )*`
-        """
-        return self._match_binary(
-            self._comparison,
-            TokenType.BANG_EQUAL,
-            TokenType.EQUAL_EQUAL,
-        )
-
-    def _comparison(self) -> grammar.Expr:
-        """
-        Parse the comparison grammar.
-
-        `comparison: term ( ( ">" | ">=" | "<" | "<=" ) term )*`
-        """
-        return self._match_binary(
-            self._term,
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        )
-
-    def _term(self) -> grammar.Expr:
-        """
-        Parse the term grammar.
-
-        `term: factor ( ( "-" | "+" ) factor )*`
-        """
-        return self._match_binary(
-            self._factor,
-            TokenType.MINUS,
-            TokenType.PLUS,
-        )
-
-    def _factor(self) -> grammar.Expr:
-        """
-        Parse the factor grammar.
-
-        `factor: power ( ( "*" | "/" | "\\" | "%") power )*`
-        """
-        return self._match_binary(
-            self._power,
-            TokenType.STAR,
-            TokenType.SLASH,
-            TokenType.BACK_SLASH,
-            TokenType.PERCENT,
-        )
-
-    def _power(self) -> grammar.Expr:
-        """
-        Parse the power grammar.
-
-        `power: unary ( ( "^" ) unary )*`
-        """
-        return self._match_binary(
-            self._unary,
-            TokenType.CARAT,
-        )
+        ```
+        expression: assignment
+        assignment: ( call "." )? IDENTIFIER "=" assignment | logic_or
+        logic_or: logic_and ( "or" logic_and )*
+        logic_and: equality ( "and" equality )*
+        equality: comparison ( ( "!=" | "==" ) comparison )*
+        comparison: term ( ( ">" | ">=" | "<" | "<=" ) term )*
+        term: factor ( ( "-" | "+" ) factor )*
+        factor: power ( ( "*" | "/" | "\\" | "%") power )*
+        power: unary ( ( "^" ) unary )*
+        unary: ( "!" | "-" ) unary | call
+        call: primary ( "(" arguments? ")" | "." IDENTIFIER )*
+        arguments: expression ( "," expression )*
+        ```
 
-    def _unary(self) -> grammar.Expr:
-        """
-        Parse the unary grammar.
+        Operands are parsed one at a time, while the operators & enclosing expressions that are
+        still waiting on an operand are held on a stack. Once an operand is complete, it's folded
+        into the pending expressions for as long as they are complete too.
 
-        `unary: ( "!" | "-" ) unary | call`
+        Binary operators are folded using precedence climbing: the precedence of each operator is
+        looked up in `BINARY_PRECEDENCE`, and a pending binary operator only takes the operand that
+        follows it if the next operator doesn't bind more tightly. All binary operators are left
+        associative.
         """
-        if self._match(TokenType.BANG, TokenType.MINUS):
-            operator = self._previous()
-            right = self._unary()
-
-            return grammar.Unary(operator, right)
-
-        return self._call()
+        pending: list[_PendingExpr] = []
+        while True:
+            expr = self._operand(pending)
+            while expr is not None:
+                kind = pending[-1][0] if pending else None
+                if kind is _Pending.UNARY:
+                    expr = grammar.Unary(pending.pop()[1], expr)
+                    continue
+
+                operator = self._current_token
+                precedence = BINARY_PRECEDENCE.get(operator.token_type, Precedence.NONE)
+                if kind is _Pending.BINARY:
+                    if precedence > pending[-1][3]:
+                        self._advance()
+                        pending.append((_Pending.BINARY, expr, operator, precedence))
+                        break
+
+                    _, left, operator, precedence = pending.pop()
+                    if precedence <= Precedence.AND:
+                        expr = grammar.Logical(left, operator, expr)
+                    else:
+                        expr = grammar.Binary(left, operator, expr)
+                    continue
+
+                if precedence:
+                    self._advance()
+                    pending.append((_Pending.BINARY, expr, operator, precedence))
+                    break
+
+                # Nothing binds more loosely than assignment, so it can only target a complete
+                # logical or expression
+                if operator.token_type == TokenType.EQUAL:
+                    pending.append((_Pending.ASSIGN, expr, self._advance()))
+                    break
+
+                if kind is None:
+                    return expr
+
+                expr = self._fold_enclosing(expr, pending)
+
+    def _operand(self, pending: list[_PendingExpr]) -> t.Optional[grammar.Expr]:
+        """
+        Parse the next operand, along with any calls or property accesses that follow it.
+
+        Any preceding unary operators or opening parentheses are pushed to the `pending` stack.
+
+        `None` is returned if the operand opens the argument list of a call, since the arguments
+        need to be parsed before the operand is complete.
+        """
+        token = self._current_token
+        parselet = PRIMARY_PARSELETS.get(token.token_type)
+        while parselet is None:
+            if token.token_type in UNARY_OPERATORS:
+                pending.append((_Pending.UNARY, self._advance()))
+            elif token.token_type == TokenType.LEFT_PAREN:
+                pending.append((_Pending.GROUPING, self._advance()))
+            else:
+                self._report_error(LoxParseError(token, "Expected expression."))
 
-    def _finish_call(self, callee: grammar.Expr) -> grammar.Call:
-        """Helper function to parse the input arguments & generate the `Call` expression."""
-        arguments = []
-        if not self._check(TokenType.RIGHT_PAREN):
-            # If we're in here we have at least one argument
-            arguments.append(self._expression())
-            while self._match(TokenType.COMMA):
-                if len(arguments) >= MAX_ARGS:
-                    self._report_error(
-                        LoxParseError(self._peek(), f"Cannot have more than {MAX_ARGS} arguments.")
-                    )
-                arguments.append(self._expression())
+            token = self._current_token
+            parselet = PRIMARY_PARSELETS.get(token.token_type)
 
-        closing_paren = self._consume(TokenType.RIGHT_PAREN, "Expected ')' after arguments.")
-        return grammar.Call(callee, closing_paren, arguments)
+        return self._call(parselet(self, self._advance()), pending)
 
-    def _call(self) -> grammar.Expr:
+    def _call(self, expr: grammar.Expr, pending: list[_PendingExpr]) -> t.Optional[grammar.Expr]:
         """
-        Parse the call grammar.
+        Parse any calls or property accesses following the provided expression.
 
-        `call: primary ( "(" arguments? ")" | "." IDENTIFIER )*`
+        If a call with arguments is encountered, it's pushed to the `pending` stack & `None` is
+        returned, see `_operand`.
         """
-        expr = self._primary()
-
         while True:
-            if self._match(TokenType.LEFT_PAREN):
-                # Once we get to the closing parentheses, defer to a helper to parse the arguments
-                expr = self._finish_call(expr)
-            elif self._match(TokenType.DOT):
+            token_type = self._current_token.token_type
+            if token_type == TokenType.LEFT_PAREN:
+                self._advance()
+                if self._current_token.token_type != TokenType.RIGHT_PAREN:
+                    pending.append((_Pending.ARGUMENTS, expr, []))
+                    return None
+
+                expr = grammar.Call(expr, self._advance(), [])
+            elif token_type == TokenType.DOT:
                 # Property access
+                self._advance()
                 name = self._consume(TokenType.IDENTIFIER, "Expected property name after '.'.")
                 expr = grammar.Get(expr, name)
             else:
-                break
-
-        return expr
-
-    def _primary(self) -> grammar.Expr:
-        """
-        Parse the primary grammar.
-
-        ```
-        primary:
-            | "true"
-            | "false"
-            | "nil"
-            | "this"
-            | NUMBER
-            | STRING
-            | IDENTIFIER
-            | "(" expression ")"
-            | "super" "." IDENTIFIER
-        ```
-        """
-        if self._match(TokenType.TRUE):
-            return grammar.Literal(True)
-
-        if self._match(TokenType.FALSE):
-            return grammar.Literal(False)
-
-        if self._match(TokenType.NIL):
-            return grammar.Literal(None)
-
-        if self._match(TokenType.SUPER):
-            keyword = self._previous()
-            self._consume(TokenType.DOT, "Expected '.' after 'super'.")
-            method = self._consume(TokenType.IDENTIFIER, "Expected superclass method name.")
-            return grammar.Super(keyword, method)
-
-        if self._match(TokenType.THIS):
-            return grammar.This(self._previous())
-
-        if self._match(TokenType.NUMBER, TokenType.STRING):
-            return grammar.Literal(self._previous().literal)
-
-        if self._match(TokenType.LEFT_PAREN):
-            expr = self._expression()
-            self._consume(TokenType.RIGHT_PAREN, "Expected ')' after expression.")
-            return grammar.Grouping(expr)
-
-        if self._match(TokenType.IDENTIFIER):
-            return grammar.Variable(self._previous())
-
-        self._report_error(LoxParseError(self._peek(), "Expected expression."))
+                return expr
+
+    def _fold_enclosing(
+        self, expr: grammar.Expr, pending: list[_PendingExpr]
+    ) -> t.Optional[grammar.Expr]:
+        """
+        Fold the provided expression into the enclosing assignment, grouping, or call arguments.
+
+        `None` is returned if the enclosing expression needs another operand.
+        """
+        match pending.pop():
+            case (_Pending.ASSIGN, target, equals):
+                if isinstance(target, grammar.Variable):
+                    return grammar.Assign(target.name, expr)
+                elif isinstance(target, grammar.Get):
+                    return grammar.Set(target.object_, target.name, expr)
+
+                self._report_error(LoxParseError(equals, "Invalid assignment target."))
+            case (_Pending.GROUPING, _):
+                self._consume(TokenType.RIGHT_PAREN, "Expected ')' after expression.")
+                return self._call(grammar.Grouping(expr), pending)
+            case (_Pending.ARGUMENTS, callee, arguments) as call:
+                arguments.append(expr)
+                if self._match(TokenType.COMMA):
+                    if len(arguments) >= MAX_ARGS:
+                        self._report_error(
+                            LoxParseError(
+                                self._peek(), f"Cannot have more than {MAX_ARGS} arguments."
+                            )
+                        )
+
+                    pending.append(call)
+                    return None
+
+                closing_paren = self._consume(
+                    TokenType.RIGHT_PAREN, "Expected ')' after arguments."
+                )
+                return self._call(grammar.Call(callee, closing_paren, arguments), pending)
+            case unexpected:  # pragma: no cover
+                raise ValueError(f"Unexpected pending expression: {unexpected}")
+
+    def _keyword_literal(self, keyword: Token) -> grammar.Literal:
+        return grammar.Literal(KEYWORD_LITERALS[keyword.token_type])
+
+    def _literal(self, token: Token) -> grammar.Literal:
+        return grammar.Literal(token.literal)
+
+    def _super(self, keyword: Token) -> grammar.Super:
+        self._consume(TokenType.DOT, "Expected '.' after 'super'.")
+        method = self._consume(TokenType.IDENTIFIER, "Expected superclass method name.")
+        return grammar.Super(keyword, method)
+
+    def _this(self, keyword: Token) -> grammar.This:
+        return grammar.This(keyword)
+
+    def _variable(self, name: Token) -> grammar.Variable:
+        return grammar.Variable(name)
+
+
+PRIMARY_PARSELETS: dict[TokenType, abc.Callable[[Parser, Token], grammar.Expr]] = {
+    TokenType.TRUE: Parser._keyword_literal,
+    TokenType.FALSE: Parser._keyword_literal,
+    TokenType.NIL: Parser._keyword_literal,
+    TokenType.SUPER: Parser._super,
+    TokenType.THIS: Parser._this,
+    TokenType.NUMBER: Parser._literal,
+    TokenType.STRING: Parser._literal,
+    TokenType.IDENTIFIER: Parser._variable,
+}
+
+# Compound statement parselets return the pending statement waiting on their nested statements
+_StatementParselet = abc.Callable[[Parser], t.Union[grammar.Stmt, _PendingStmt]]
+
+STATEMENT_PARSELETS: dict[TokenType, _StatementParselet] = {
+    TokenType.FOR: Parser._for_statement,
+    TokenType.IF: Parser._if_statement,
+    TokenType.PRINT: Parser._print_statement,
+    TokenType.RETURN: Parser._return_statement,
+    TokenType.WHILE: Parser._while_statement,
+    TokenType.BREAK: Parser._break_statement,
+    TokenType.CONTINUE: Parser._continue_statement,
+    TokenType.LEFT_BRACE: Parser._block_statement,
+}
+DECLARATION_PARSELETS: dict[TokenType, _StatementParselet] = {
+    TokenType.CLASS: Parser._class_declaration,
+    TokenType.FUN: Parser._function_declaration,
+    TokenType.VAR: Parser._variable_declaration,
+    **STATEMENT_PARSELETS,
+}
@@ -18,12 +18,37 @@ class IncludedHeader(t.NamedTuple):  # noqa: D101
     line_range: range  # range(start_lineno, end_lineno + 1)
 
 
+def source_not_found(filepath: Path) -> ValueError:
+    """Build the error raised when an included source file does not exist."""
+    return ValueError(f"Could not locate source file: '{filepath}'")
+
+
 def load_if_exists(filepath: Path) -> str:
     """If a file exists, return its contents, otherwise raise an error."""
-    if not filepath.exists():
-        raise ValueError(f"Could not locate source file: '{filepath}'")
+    try:
+        return filepath.read_text()
+    except FileNotFoundError:
+        raise source_not_found(filepath) from None
+
+
+def _resolve_include_path(include: str, include_dir: t.Optional[Path] = None) -> Path:
+    """
+    Resolve the path of the file referenced by an `include` statement's target.
 
-    return filepath.read_text()
+    Relative paths are resolved relative to `include_dir` if provided, otherwise the current
+    directory.
+    """
+    match include[0]:
+        case "<":
+            # Pylox builtin
+            module_name = include.strip("<>")
+            return (BUILTINS_PATH / f"{module_name}.lox").resolve()
+        case "'" | '"':
+            # Path to source file
+            module_name = include.strip("'\"")
+            return (include_dir or Path()).joinpath(module_name).resolve()
+        case _:  # pragma: no cover
+            raise ValueError(f"Unknown include prefix: '{include[0]}'")
 
 
 class PreProcessor:
@@ -31,13 +56,28 @@ class PreProcessor:
     The Pylox preprocessor!
 
     Currently this only handles `include` statments.
+
+    If `splice_includes` is `False`, included source is not copied into the resolved source.
+    Instead, the include line is blanked out & the included file's path is recorded in `includes`
+    so it can be compiled separately as a module, see `pylox.modules`.
+
+    Relative include paths are resolved relative to `include_dir`, e.g. the directory of the module
+    being preprocessed, or the current directory if not specified.
     """
 
     resolved_src: str
     import_metadata: dict[IncludedHeader, None]
-
-    def __init__(self, src: str) -> None:
+    includes: dict[Path, int]
+
+    def __init__(
+        self,
+        src: str,
+        splice_includes: bool = True,
+        include_dir: t.Optional[Path] = None,
+    ) -> None:
         self.in_src = src
+        self.splice_includes = splice_includes
+        self.include_dir = include_dir
 
         self.has_includes = False
         self.n_included_lines = 0
@@ -50,68 +90,71 @@ class PreProcessor:
         `include` statements are currently constrained as follows:
             * Statements may be specified in one of the following ways:
                 * `include "path/to/src"`
-                    * Attempts to copy from a source file at the given absolute or relative path
+                    * Attempts to copy from a source file at the given absolute or relative path,
+                    see `include_dir`
                 * `include <lox_builtin>`
                     * Attempts to copy from a "stdlib" source file with name `<lox_builtin>.lox` in
                     the `./pylox/builtins/` directory
             * `include` statements are only found at the beginning of the source file, and may be
             separated by whitespace
             * One path per `include` line
-            * Referenced source files do not themselves have any imports
+            * Spliced source files do not themselves have any imports; modules may have their own
+            `include` statements
         """
         # Track where included source comes from so we can track resolve error locations
         # Don't care about the values, just the keys
         self.import_metadata: dict[IncludedHeader, None] = {}
+        self.includes: dict[Path, int] = {}  # Module path -> zero-indexed include line
         seen_imports: set[Path] = set()  # Track fully resolved import paths
         out_src = self.in_src.splitlines(keepends=True)
+
         for idx, line in enumerate(out_src):
-            if line.strip():  # Ignore empty lines
-                if include := INCLUDE_DIRECTIVE.search(line):
-                    match include.group(1)[0]:
-                        case "<":
-                            # Pylox builtin
-                            module_name = include.group(1).strip("<>")
-                            module_path = (BUILTINS_PATH / f"{module_name}.lox").resolve()
-                        case "'" | '"':
-                            # Path to source file
-                            module_name = include.group(1).strip("'\"")
-                            module_path = Path(module_name).resolve()
-                        case _:  # pragma: no cover
-                            raise ValueError(f"Unknown include prefix: '{include.group(1)[0]}'")
-
-                    incoming_src = load_if_exists(module_path)
-                    out_src[idx] = incoming_src
-
-                    start_lineno = idx + self.n_included_lines
-                    # Subtract 1 line since we're replacing the line with the include directive
-                    self.n_included_lines += incoming_src.count("\n") - 1
-                    end_lineno = idx + self.n_included_lines
-
-                    metadata = IncludedHeader(
-                        filepath=module_path,
-                        include_line=idx,
-                        start_lineno=start_lineno,
-                        end_lineno=end_lineno,
-                        line_range=range(start_lineno, end_lineno + 1),  # +1 to include end_lineno
-                    )
-                    self.import_metadata[metadata] = None
-
-                    if module_path in seen_imports:
-                        warnings.warn(
-                            UserWarning(
-                                f"Duplicate include founds: '{include.group(1)}'",
-                                ImportWarning,
-                            ),
-                            stacklevel=2,
-                        )
-                    seen_imports.add(module_path)
-
-                else:
-                    # End of include block reached
-                    break
+            if not line.strip():  # Ignore empty lines
+                continue
+
+            if not (include := INCLUDE_DIRECTIVE.search(line)):
+                # End of include block reached
+                break
+
+            include_target = include.group(1)
+            module_path = _resolve_include_path(include_target, self.include_dir)
+            if module_path in seen_imports:
+                warnings.warn(
+                    UserWarning(
+                        f"Duplicate include founds: '{include_target}'",
+                        ImportWarning,
+                    ),
+                    stacklevel=2,
+                )
+            seen_imports.add(module_path)
+
+            if not self.splice_includes:
+                # Modules are left to be read (once) by the `pylox.modules.ModuleLoader`
+                # Keep the line ending so the line numbers of the source are unchanged
+                out_src[idx] = line[len(line.rstrip("\r\n")) :]
+                self.includes.setdefault(module_path, idx)
+                continue
+
+            incoming_src = load_if_exists(module_path)
+            out_src[idx] = incoming_src
+
+            start_lineno = idx + self.n_included_lines
+            # Subtract 1 line since we're replacing the line with the include directive
+            self.n_included_lines += incoming_src.count("\n") - 1
+            end_lineno = idx + self.n_included_lines
+
+            metadata = IncludedHeader(
+                filepath=module_path,
+                include_line=idx,
+                start_lineno=start_lineno,
+                end_lineno=end_lineno,
+                line_range=range(start_lineno, end_lineno + 1),  # +1 to include end_lineno
+            )
+            self.import_metadata[metadata] = None
 
         # Check once rather than every time we matched an include directive
-        if seen_imports:
+        # Only spliced includes shift the line numbers of the resolved source
+        if self.import_metadata:
             self.has_includes = True
 
         self.resolved_src = "".join(out_src)
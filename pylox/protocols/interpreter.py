@@ -3,7 +3,7 @@ from __future__ import annotations
 import typing as t
 
 from pylox import grammar
-from pylox.environment import Environment
+from pylox.environment import Environment, LocalEnvironment
 from pylox.error import LoxException, LoxRuntimeError
 
 
@@ -17,6 +17,14 @@ class SourceInterpreterProtocol(t.Protocol):  # pragma: no cover
     globals: Environment
     _interp: LoxInterpreterProtocol
 
-    def _execute_block(self, statements: list[grammar.Stmt], environment: Environment) -> None: ...
+    def _execute_block(
+        self, statements: list[grammar.Stmt], environment: LocalEnvironment
+    ) -> None: ...
 
-    def resolve(self, expr: grammar.Expr, depth: int) -> None: ...
+    def resolve(self, expr: grammar.Expr, depth: int, slot: int) -> None: ...
+
+
+class ResolveTableProtocol(t.Protocol):  # pragma: no cover
+    _interp: LoxInterpreterProtocol
+
+    def resolve(self, expr: grammar.Expr, depth: int, slot: int) -> None: ...
@@ -1,9 +1,11 @@
 import typing as t
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from functools import partial
 
 from pylox import grammar
 from pylox.error import LoxResolverError
-from pylox.protocols.interpreter import SourceInterpreterProtocol
+from pylox.protocols.interpreter import LoxInterpreterProtocol, ResolveTableProtocol
 from pylox.tokens import Token
 
 
@@ -25,6 +27,82 @@ class LoopType(Enum):
     WHILE = auto()  # for loops are just while loops
 
 
+# Expressions accessing a variable, which are annotated with where the variable was resolved to
+ResolvedExpr = t.Union[grammar.Assign, grammar.Super, grammar.This, grammar.Variable]
+
+# Statements declaring a variable in the scope they're executed in
+DECLARATION_TYPES = (grammar.Var, grammar.Function, grammar.Class)
+
+
+def _declares_variables(statements: list[grammar.Stmt]) -> bool:
+    """Check whether any of the provided statements declare a variable in their scope."""
+    return any(isinstance(stmt, DECLARATION_TYPES) for stmt in statements)
+
+
+# Items of the statement stack other than statements are accepted by the resolver like statements,
+# see `Resolver.resolve`
+class _Cleanup(partial):
+    """Callback run once the items pushed after it are resolved, or skipped after an error."""
+
+    def accept(self, visitor: "Resolver") -> None:
+        self()
+
+
+class _Method(t.NamedTuple):
+    """Method of a class, started once the method before it has been resolved."""
+
+    function: grammar.Function
+    function_type: "FunctionType"
+    base: int
+
+    def accept(self, visitor: "Resolver") -> None:
+        visitor._resolve_function(*self)
+
+
+class _Body:
+    """Marks the start of a list of statements, whose remaining items are skipped on an error."""
+
+    def accept(self, visitor: "Resolver") -> None:
+        return
+
+
+_BODY = _Body()
+
+# Captured variable of a closure, (is_local, depth, slot), see `_FunctionScopes`
+_Capture = tuple[int, int, int]
+
+
+@dataclass(slots=True)
+class _FunctionScopes:
+    """
+    The scopes of a function being resolved, along with the variables captured by its closure.
+
+    Each captured variable is either local to the enclosing function, in which case it's located
+    relative to the scope the function is defined in, or is itself an upvalue of the enclosing
+    function's closure, in which case it's located by that upvalue's index.
+    """
+
+    base: int  # Index of the function's outermost scope in the scope stack
+    captures: list[int] = field(default_factory=list)  # Flattened (is_local, depth, slot) captures
+    upvalues: dict[_Capture, int] = field(default_factory=dict)  # Capture -> upvalue index
+
+
+class ResolveTable:
+    """
+    Record the resolved scope depth & slot of each local variable expression.
+
+    A minimal stand-in for the interpreter when resolving source that's compiled in isolation;
+    resolver errors are forwarded to the provided interpreter.
+    """
+
+    def __init__(self, interp: LoxInterpreterProtocol) -> None:
+        self._interp = interp
+        self.locals: dict[grammar.Expr, tuple[int, int]] = {}
+
+    def resolve(self, expr: grammar.Expr, depth: int, slot: int) -> None:
+        self.locals[expr] = (depth, slot)
+
+
 class Resolver:
     """
     The Pylox resolver!
@@ -32,14 +110,48 @@ class Resolver:
     This runs at compile time & maps how many scopes are between the current scope and the scope
     where the variable is defined, allowing for more efficient lookups and providing the capability
     to perform some (limited) sentiment analysis.
+
+    Each local variable is also assigned a slot, the order it was declared in its scope, so the
+    interpreter can store the variables of a local scope in a list rather than by name, see
+    `pylox.environment.LocalEnvironment`.
+
+    The resolved scope depth & slot are stored on the expression itself, so the interpreter can
+    access a variable without looking the expression up. Expressions resolving to a global are left
+    at `grammar.UNRESOLVED`. Resolved locals are also passed to the interpreter's `resolve` (or that
+    of a `ResolveTable`), for any tooling that needs a table of them.
+
+    Blocks that don't declare any variables don't need a scope of their own at runtime, & neither do
+    blocks whose variables can never be captured by a closure; the variables of these are instead
+    assigned slots in the enclosing scope's frame, which are released when the block ends. Such
+    blocks are marked as elided, & scope depths count only the scopes that have a frame of their
+    own. As functions & classes can only be declared by statements, a block's variables can only be
+    captured if it (or any statement nested in it) declares one.
+
+    Functions only capture the variables they reference from enclosing functions, rather than the
+    entire scope chain they're defined in. Each function is annotated with its captured variables,
+    which the interpreter captures as the function's upvalues when the closure is created (see
+    `pylox.environment.Upvalue`), & accesses of a captured variable inside the function are resolved
+    to the upvalue's slot in the closure, just past the function's own scopes.
+
+    The visitors push the statements & expressions nested in them to explicit stacks (see
+    `pylox.parser.Parser`), which are resolved in the same (depth first, in source order) order as a
+    recursive walk. Anything that must happen once a statement's nested statements have been
+    resolved, e.g. ending a scope, is pushed to the statement stack ahead of them as a cleanup.
     """
 
-    def __init__(self, interpreter: SourceInterpreterProtocol) -> None:
+    def __init__(self, interpreter: ResolveTableProtocol) -> None:
         self._interpreter = interpreter
 
         # Scope stack is LIFO
         # Each scope is a variable name, bool k,v pairs
         self._scopes: list[dict[str, bool]] = []
+        # Slots of the variables declared in each scope, in parallel with the scope stack
+        self._slots: list[dict[str, int]] = []
+        # Index of the frame of each scope, in parallel with the scope stack; the variables of an
+        # elided block are stored in the frame of its enclosing scope
+        self._frames: list[int] = []
+        # Number of slots of each frame that are currently in use, in order of frame index
+        self._frame_sizes: list[int] = []
 
         # Track whether or not we're inside a function or not; helps with things like not allowing
         # returns outside of a function
@@ -53,46 +165,232 @@ class Resolver:
         # break or continue outside of these blocks
         self._current_loop = LoopType.NONE
 
-    def _begin_scope(self) -> None:
+        # Stack of subexpressions waiting to be resolved, see `_resolve_one`
+        self._pending: list[grammar.Expr] = []
+
+        # Stack of statements waiting to be resolved, along with the cleanups & deferred methods of
+        # the statements enclosing them, see `resolve`
+        self._statements: list[t.Any] = []
+
+        # Stack of the functions being resolved, starting with the top-level code, which may itself
+        # declare local variables in blocks
+        self._functions: list[_FunctionScopes] = [_FunctionScopes(0)]
+
+        # Whether each block walked by `_contains_closure` declares a function or class
+        self._closures: dict[grammar.Block, bool] = {}
+
+    def _begin_scope(self, elided: bool = False) -> None:
         self._scopes.append({})
+        self._slots.append({})
+        if not elided:
+            self._frame_sizes.append(0)
+
+        self._frames.append(len(self._frame_sizes) - 1)
 
-    def _end_scope(self) -> None:
+    def _end_scope(self, elided: bool = False) -> None:
         self._scopes.pop()
+        slots = self._slots.pop()
+        self._frames.pop()
+        if elided:
+            # Release the slots of the elided block, so they can be reused by later declarations
+            if slots:
+                self._frame_sizes[-1] -= len(slots)
+        else:
+            self._frame_sizes.pop()
 
     def _resolve_one(self, stmt: t.Union[grammar.Stmt, grammar.Expr]) -> None:
+        """
+        Resolve the provided statement or expression.
+
+        The expression visitors push their subexpressions to the stack of pending expressions, which
+        is drained here. Resolving an expression never modifies the scopes, so there's nothing left
+        to do for an expression once its subexpressions have been pushed.
+
+        Statement visitors instead push their nested statements to the statement stack, which is
+        drained by `resolve`.
+        """
         stmt.accept(self)
 
+        pending = self._pending
+        while pending:
+            pending.pop().accept(self)
+
     def resolve(self, stmt: t.Sequence[t.Union[grammar.Expr, grammar.Stmt]]) -> None:
-        try:
-            for statement in stmt:
-                self._resolve_one(statement)
-        except LoxResolverError as err:
-            self._interpreter._interp.report_error(err)
+        """
+        Resolve the provided statements, along with every statement nested inside of them.
+
+        Items are popped from the statement stack & accepted until it's back to where it started:
+        statements (or expressions) are resolved, cleanups are called, & deferred methods are
+        started, see `_resolve_function`.
 
-    def _resolve_local(self, expr: grammar.Expr, name: Token) -> None:
+        Each list of statements is resolved until its first error; once reported, the rest of the
+        innermost list of statements is skipped, along with everything nested in it, but the
+        cleanups of the statements being skipped are still called.
+        """
+        statements = self._statements
+        pending = self._pending
+        bottom = len(statements)
+        self._push_body(stmt)
+        while len(statements) > bottom:
+            try:
+                # Inlined `_resolve_one`
+                statements.pop().accept(self)
+                while pending:
+                    pending.pop().accept(self)
+            except LoxResolverError as err:
+                pending.clear()
+                self._interpreter._interp.report_error(err)
+
+                while (item := statements.pop()) is not _BODY:
+                    if type(item) is _Cleanup:
+                        item()
+
+    def _push_body(self, stmt: t.Sequence[t.Union[grammar.Expr, grammar.Stmt]]) -> None:
+        """Push a list of statements to the statement stack, to be resolved in order."""
+        self._statements.append(_BODY)
+        self._statements.extend(reversed(stmt))
+
+    def _resolve_local(self, expr: ResolvedExpr, name: Token) -> None:
         """
         Attempt to locate & resolve the nearest scope containing the variable `name`.
 
         Starting with the innermost scope & working outwards, each scope is checked for the
-        specified variable and, if found, passed to the interpreter to resolve. If not found in any
-        scope, it's left unresolved and assumed to be global.
+        specified variable and, if found, its depth & slot are passed to the interpreter to resolve.
+        If not found in any scope, it's left unresolved and assumed to be global.
+
+        Variables declared outside of the current function are captured by its closure, & resolved
+        to their upvalue instead.
+        """
+        frames = self._frames
+        for scope in range(len(self._slots) - 1, -1, -1):
+            slot = self._slots[scope].get(name.lexeme)
+            if slot is None:
+                continue
+
+            function = self._functions[-1]
+            if scope < function.base:
+                depth = frames[-1] - frames[function.base] + 1
+                slot = self._capture(
+                    len(self._functions) - 1, scope, slot, isinstance(expr, grammar.Super)
+                )
+                expr.upvalue = True
+            else:
+                depth = frames[-1] - frames[scope]
+
+            expr.depth, expr.slot = depth, slot
+            self._interpreter.resolve(expr, depth, slot)
+            return
+
+    def _capture(self, function_idx: int, scope: int, slot: int, with_this: bool = False) -> int:
+        """
+        Capture the variable in the specified slot of the scope, returning its upvalue index.
+
+        The variable is captured by each function between it & the specified function, so that it
+        can be passed down from closure to closure.
+
+        When resolving `super` the bound instance, `this`, is also required, so the scope just
+        inside the scope of `super` is also captured, as the upvalue just before `super`'s.
         """
-        for depth, scope in enumerate(reversed(self._scopes)):
-            if name.lexeme in scope:
-                self._interpreter.resolve(expr, depth)
-                return
+        frames = self._frames
+        function = self._functions[function_idx]
+        enclosing = self._functions[function_idx - 1]
+        if scope >= enclosing.base:
+            capture = (1, frames[function.base - 1] - frames[scope], slot)
+            this_capture = (1, capture[1] - 1, 0)
+        else:
+            index = self._capture(function_idx - 1, scope, slot, with_this)
+            capture = (0, frames[function.base - 1] - frames[enclosing.base] + 1, index)
+            this_capture = (0, capture[1], index - 1)
+
+        upvalue = function.upvalues.get(capture)
+        if upvalue is None:
+            if with_this:
+                function.captures.extend(this_capture)
+
+            upvalue = function.upvalues[capture] = len(function.captures) // 3
+            function.captures.extend(capture)
+
+        return upvalue
+
+    def _contains_closure(self, block: grammar.Block) -> bool:
+        """
+        Check whether the provided block declares a function or class, however deeply nested.
 
-    def _resolve_function(self, function: grammar.Function, function_type: FunctionType) -> None:
+        The closure of any function or class declared in a block could capture its variables.
+        Functions & classes can only be declared by statements, so expressions aren't inspected.
+        The result for every nested block is cached along the way, so each statement is only walked
+        once no matter how deeply its blocks are nested.
+        """
+        contains = self._closures.get(block)
+        if contains is not None:
+            return contains
+
+        # Nested blocks are walked in the order they're found, after the block enclosing them, so
+        # each block's result can then be propagated to its enclosing block in reverse order
+        blocks = [block]
+        enclosing = [-1]
+        found = [False]
+        for idx, walked in enumerate(blocks):
+            pending = list(walked.statements)
+            while pending:
+                match pending.pop():
+                    case grammar.Function() | grammar.Class():
+                        found[idx] = True
+                    case grammar.Block() as nested:
+                        contains = self._closures.get(nested)
+                        if contains is None:
+                            blocks.append(nested)
+                            enclosing.append(idx)
+                            found.append(False)
+                        elif contains:
+                            found[idx] = True
+                    case grammar.If(then_branch=then_branch, else_branch=else_branch):
+                        pending.append(then_branch)
+                        if else_branch is not None:
+                            pending.append(else_branch)
+                    case grammar.While(body=body):
+                        pending.append(body)
+                    case _:
+                        pass
+
+        for idx in range(len(blocks) - 1, 0, -1):
+            if found[idx]:
+                found[enclosing[idx]] = True
+            self._closures[blocks[idx]] = found[idx]
+
+        self._closures[block] = found[0]
+        return found[0]
+
+    def _resolve_function(
+        self,
+        function: grammar.Function,
+        function_type: FunctionType,
+        base: t.Optional[int] = None,
+    ) -> None:
+        """
+        Start resolving the provided function, pushing its body to the statement stack.
+
+        The function's scopes start with its own scope, unless an outer scope is specified, e.g.
+        the scopes of a class that a method's `this` & `super` are declared in.
+        """
         enclosing_function_type = self._current_func  # Cache to restore after resolving
         self._current_func = function_type
 
+        self._functions.append(_FunctionScopes(len(self._scopes) if base is None else base))
         self._begin_scope()
+        self._statements.append(_Cleanup(self._end_function, function, enclosing_function_type))
         for param in function.params:
             self._declare(param)
             self._define(param)
 
-        self.resolve(function.body)
+        self._push_body(function.body)
+
+    def _end_function(
+        self, function: grammar.Function, enclosing_function_type: FunctionType
+    ) -> None:
+        """Finish resolving the provided function, once its body has been resolved."""
         self._end_scope()
+        function.upvalues = tuple(self._functions.pop().captures)
 
         self._current_func = enclosing_function_type
 
@@ -108,6 +406,8 @@ class Resolver:
             )
 
         self._scopes[-1][name.lexeme] = False
+        self._slots[-1][name.lexeme] = self._frame_sizes[-1]
+        self._frame_sizes[-1] += 1
 
     def _define(self, name: Token) -> None:
         """Mark the variable `name` as "available" to the innermost scope."""
@@ -116,42 +416,62 @@ class Resolver:
 
         self._scopes[-1][name.lexeme] = True
 
+    def _declare_implicit(self, name: str) -> None:
+        """Declare & define a variable bound by the interpreter, e.g. `this`, in the scope."""
+        self._scopes[-1][name] = True
+        self._slots[-1][name] = self._frame_sizes[-1]
+        self._frame_sizes[-1] += 1
+
     def visit_Block(self, stmt: grammar.Block) -> None:
-        self._begin_scope()
-        self.resolve(stmt.statements)
-        self._end_scope()
+        # A block's variables can only be stored in the enclosing scope's frame if there is one,
+        # rather than the globals
+        stmt.elided = not _declares_variables(stmt.statements) or (
+            bool(self._frame_sizes) and not self._contains_closure(stmt)
+        )
 
-    def visit_Class(self, stmt: grammar.Class) -> None:
-        enclosing_class = self._current_class  # Cache to restore after resolving
-        self._current_class = ClassType.CLASS
+        self._begin_scope(stmt.elided)
+        self._statements.append(_Cleanup(self._end_scope, stmt.elided))
+        self._push_body(stmt.statements)
 
+    def visit_Class(self, stmt: grammar.Class) -> None:
         self._declare(stmt.name)
         self._define(stmt.name)
 
+        enclosing_class = self._current_class  # Cache to restore after resolving
+        self._current_class = ClassType.CLASS
+
+        # Methods are defined in the class's own scopes, which are created along with their closures
+        base = len(self._scopes)
         if stmt.superclass is not None:
-            self._current_class = ClassType.SUBCLASS
             if stmt.name.lexeme == stmt.superclass.name.lexeme:
+                self._current_class = enclosing_class
                 raise LoxResolverError(stmt.superclass.name, "Class cannot inherit from itself.")
 
+            self._current_class = ClassType.SUBCLASS
             self._resolve_one(stmt.superclass)
 
             # Define super as the superclass at the time the class definitioni is executed, so any
             # subclasses that call this method receive the correct superclass, instead of an
             # instance of this class
             self._begin_scope()
-            self._scopes[-1]["super"] = True
+            self._declare_implicit("super")
 
         # Declare a scope for methods that contains the class instance pre-defined as "this"
         self._begin_scope()
-        self._scopes[-1]["this"] = True
-        for method in stmt.methods:
+        self._declare_implicit("this")
+        self._statements.append(_Cleanup(self._end_class, stmt, enclosing_class))
+
+        # Each method is started once the method before it has been resolved
+        for method in reversed(stmt.methods):
             if method.name.lexeme == "init":
                 declaration_type = FunctionType.INITIALIZER
             else:
                 declaration_type = FunctionType.METHOD
-            self._resolve_function(method, declaration_type)
-        self._end_scope()
+            self._statements.append(_Method(method, declaration_type, base))
 
+    def _end_class(self, stmt: grammar.Class, enclosing_class: ClassType) -> None:
+        """Finish resolving the provided class, once its methods have been resolved."""
+        self._end_scope()
         if stmt.superclass is not None:
             self._end_scope()
 
@@ -177,8 +497,8 @@ class Resolver:
         self._resolve_local(expr, expr.name)
 
     def visit_Assign(self, expr: grammar.Assign) -> None:
-        self._resolve_one(expr.value)
         self._resolve_local(expr, expr.name)
+        self._pending.append(expr.value)
 
     def visit_Function(self, stmt: grammar.Function) -> None:
         self._declare(stmt.name)
@@ -189,10 +509,17 @@ class Resolver:
         self._resolve_one(stmt.expr_expression)
 
     def visit_If(self, stmt: grammar.If) -> None:
-        self._resolve_one(stmt.condition)
-        self._resolve_one(stmt.then_branch)
-        if stmt.else_branch:
-            self._resolve_one(stmt.else_branch)
+        # Flatten the `else if` chain into its conditions & branches
+        branches: list[t.Union[grammar.Expr, grammar.Stmt]] = []
+        branch: t.Optional[grammar.Stmt] = stmt
+        while isinstance(branch, grammar.If):
+            branches.extend((branch.condition, branch.then_branch))
+            branch = branch.else_branch
+
+        if branch is not None:
+            branches.append(branch)
+
+        self._statements.extend(reversed(branches))
 
     def visit_Print(self, stmt: grammar.Print) -> None:
         self._resolve_one(stmt.expr_expression)
@@ -212,10 +539,12 @@ class Resolver:
         current_loop = self._current_loop  # Cache to restore after resolving
         self._current_loop = LoopType.WHILE
 
+        self._statements.extend((_Cleanup(self._end_loop, current_loop), stmt.body))
         self._resolve_one(stmt.condition)
-        self._resolve_one(stmt.body)
 
-        self._current_loop = current_loop
+    def _end_loop(self, enclosing_loop: LoopType) -> None:
+        """Finish resolving a loop, once its body has been resolved."""
+        self._current_loop = enclosing_loop
 
     def visit_Break(self, stmt: grammar.Break) -> None:
         if self._current_loop != LoopType.WHILE:
@@ -232,20 +561,17 @@ class Resolver:
         return
 
     def visit_Binary(self, expr: grammar.Binary) -> None:
-        self._resolve_one(expr.expr_left)
-        self._resolve_one(expr.expr_right)
+        self._pending.extend((expr.expr_right, expr.expr_left))
 
     def visit_Call(self, expr: grammar.Call) -> None:
-        self._resolve_one(expr.callee)
-        for argument in expr.arguments:
-            self._resolve_one(argument)
+        self._pending.extend(reversed(expr.arguments))
+        self._pending.append(expr.callee)
 
     def visit_Get(self, expr: grammar.Get) -> None:
-        self._resolve_one(expr.object_)
+        self._pending.append(expr.object_)
 
     def visit_Set(self, expr: grammar.Set) -> None:
-        self._resolve_one(expr.object_)
-        self._resolve_one(expr.value)
+        self._pending.extend((expr.value, expr.object_))
 
     def visit_Super(self, expr: grammar.Super) -> None:
         if self._current_class == ClassType.NONE:
@@ -264,14 +590,13 @@ class Resolver:
         self._resolve_local(expr, expr.keyword)
 
     def visit_Grouping(self, expr: grammar.Grouping) -> None:
-        self._resolve_one(expr.expr_expression)
+        self._pending.append(expr.expr_expression)
 
     def visit_Literal(self, expr: grammar.Literal) -> None:
         return
 
     def visit_Logical(self, expr: grammar.Logical) -> None:
-        self._resolve_one(expr.expr_left)
-        self._resolve_one(expr.expr_right)
+        self._pending.extend((expr.expr_right, expr.expr_left))
 
     def visit_Unary(self, expr: grammar.Unary) -> None:
-        self._resolve_one(expr.expr_right)
+        self._pending.append(expr.expr_right)
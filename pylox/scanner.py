@@ -1,9 +1,22 @@
 import ast
-from collections import namedtuple
+import re
+import typing as t
+import unicodedata
+from collections import abc
+from enum import Enum
+from pathlib import Path
 
 from pylox.error import LoxSyntaxError
+from pylox.locations import LineIndex
 from pylox.protocols.interpreter import LoxInterpreterProtocol
-from pylox.tokens import LITERAL_T, Token, TokenType
+from pylox.tokens import (
+    LITERAL_T,
+    RawToken,
+    Token,
+    TokenStream,
+    TokenType,
+    build_token,
+)
 
 RESERVED = {
     "and": TokenType.AND,
@@ -27,7 +40,67 @@ RESERVED = {
     "while": TokenType.WHILE,
 }
 
-OffsetTuple = namedtuple("OffsetTuple", ["lineno", "end_lineno", "col_offset", "end_col_offset"])
+OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.STAR,
+    "^": TokenType.CARAT,
+    "%": TokenType.PERCENT,
+    "\\": TokenType.BACK_SLASH,
+    "!": TokenType.BANG,
+    "=": TokenType.EQUAL,
+    "<": TokenType.LESS,
+    ">": TokenType.GREATER,
+    "/": TokenType.SLASH,
+    "!=": TokenType.BANG_EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    "<=": TokenType.LESS_EQUAL,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# Master pattern for the regex scanning engine, one named group per token class
+# Group order matters: comments must be tried before the bare slash operator, and the catch-all
+# UNSUPPORTED group guarantees that every position in the source produces a match
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<WHITESPACE>[ \t\r\n]+)
+    |(?P<LINE_COMMENT>//[^\n]*)
+    |(?P<BLOCK_COMMENT>/\*)
+    |(?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+    |(?P<WORD>[A-Za-z_][A-Za-z_0-9]*)
+    |(?P<STRING>"[^"]*"|'[^']*')
+    |(?P<UNTERMINATED_STRING>["'])
+    |(?P<OPERATOR>[!=<>]=?|[(){},.\-+;*^%\\/])
+    |(?P<UNSUPPORTED>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+BLOCK_COMMENT_TAGS = re.compile(r"/\*|\*/")
+
+# String literal escape sequences follow Python's string literal semantics
+ESCAPE_SEQUENCE = re.compile(
+    r"\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-7]{1,3}|[\s\S]?)"
+)
+SIMPLE_ESCAPES = {
+    "\n": "",  # Line continuation
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
 
 
 def is_alpha(char: str) -> bool:
@@ -41,20 +114,82 @@ def is_alpha(char: str) -> bool:
     )
 
 
+def is_digit(char: str) -> bool:
+    """
+    Create a custom "is digit" checker, as `str.isdigit` accepts non-ASCII digits (e.g. `'²'`).
+
+    This must agree with the digit class of `TOKEN_PATTERN` so both scanner engines produce the same
+    tokens.
+    """
+    return "0" <= char <= "9"
+
+
 def is_alnum(char: str) -> bool:
     """Create a custom "is alphanumeric" checker, as `str.alnum` doesn't include underscores."""
     return any(
         (
             is_alpha(char),
-            char.isdigit(),
+            is_digit(char),
         )
     )
 
 
+def _decode_escape(escape: re.Match[str]) -> str:
+    """
+    Decode a single escape sequence matched by `ESCAPE_SEQUENCE`.
+
+    Unrecognized escape sequences are left as-is. A `ValueError` is raised for malformed escape
+    sequences.
+    """
+    sequence = escape.group(1)
+    if sequence in SIMPLE_ESCAPES:
+        return SIMPLE_ESCAPES[sequence]
+
+    match sequence[:1]:
+        case "x" | "u" | "U" if len(sequence) > 1:
+            return chr(int(sequence[1:], 16))
+        case "N" if len(sequence) > 1:
+            try:
+                return unicodedata.lookup(sequence[2:-1])
+            except KeyError:
+                raise ValueError(f"Unknown unicode character name: '{sequence}'") from None
+        case "" | "x" | "u" | "U" | "N":
+            raise ValueError(f"Malformed escape sequence: '{escape.group()}'")
+        case "0" | "1" | "2" | "3" | "4" | "5" | "6" | "7":
+            return chr(int(sequence, 8))
+        case _:
+            return escape.group()
+
+
+def decode_string_literal(body: str) -> str:
+    """
+    Decode the body of a string literal, i.e. the lexeme without its enclosing quotes.
+
+    Escape sequences & newlines are decoded following Python's string literal semantics, with the
+    escape decoder only invoked if the body contains a backslash.
+
+    NOTE: If the body contains a malformed escape sequence, decoding is deferred to Python's own
+    literal parsing in order to raise the same error.
+    """
+    # Python normalizes all newlines in source code to "\n"
+    if "\r" in body:
+        body = body.replace("\r\n", "\n").replace("\r", "\n")
+
+    if "\\" not in body:
+        return body
+
+    try:
+        return ESCAPE_SEQUENCE.sub(_decode_escape, body)
+    except ValueError:
+        return ast.literal_eval(f'"""{body}"""')  # type: ignore[no-any-return]
+
+
 class Scanner:
     """The pylox tokenizer."""
 
-    def __init__(self, src: str, interpreter: LoxInterpreterProtocol) -> None:
+    def __init__(
+        self, src: str, interpreter: LoxInterpreterProtocol, filepath: t.Optional[Path] = None
+    ) -> None:
         self.src = src
         self._interpreter = interpreter
         self.tokens: list[Token] = []
@@ -63,21 +198,18 @@ class Scanner:
         # Source is not split by newlines, so indices are relative to the full source string
         self._start = 0  # Index of first character in lexeme
         self._current = 0  # Index of current character being considered
-        self._lineno = 0
-        self._line_start = 0  # Index of the start of the current line in the full source string
 
-        # For parsing of multi-line strings, keep track of the starting column on the starting line
-        self._last_str_start_col = 0
+        # Line & column locations are only resolved from source indices when they're needed
+        self.line_index = LineIndex(src, filepath)
 
-    @property
-    def _col_offset(self) -> int:
-        """Return the column offset relative to the beginning of the current line."""
-        return self._start - self._line_start
+    def _report_error(self, err: LoxSyntaxError) -> None:
+        """Report a scanning error, attributed to the scanned source file, to the interpreter."""
+        err.filepath = self.line_index.filepath
+        self._interpreter.report_error(err)
 
-    def _bump_line(self) -> None:
-        """Bump the current line index & update the offset for the start of the current line."""
-        self._lineno += 1
-        self._line_start = self._current
+    def _location(self, offset: int) -> tuple[int, int]:
+        """Return the zero-indexed `(lineno, col_offset)` of the specified source index."""
+        return self.line_index.location(offset)
 
     def _is_eof(self) -> bool:
         """Check if the scanner has reached the end of the source."""
@@ -95,7 +227,7 @@ class Scanner:
         An integer `offset` may be specified to look further ahead in the source; this offset is
         0-indexed, where the default value of `0` will return the next character.
         """
-        if self._is_eof():
+        if self._current + offset >= len(self.src):
             return "\0"
 
         return self.src[self._current + offset]
@@ -118,30 +250,19 @@ class Scanner:
 
         The `close` kwarg specifies the type of closing quotation to expect (`"` or `'`).
         """
-        # Multiline strings have an off by 1 end column idx, I haven't figured out why yet
-        is_multiline_string = False
         # Consume characters until we get to the corresponding closing quote
         # If we get to the end of the file before the quote is closed, raise an error
-        self._last_str_start_col = self._col_offset
         while not any((self._peek() == close, self._is_eof())):
-            if self._peek() == "\n":
-                is_multiline_string = True
-                self._bump_line()
-
             self._advance()
 
         if self._is_eof():
-            raise LoxSyntaxError(self._lineno, 0, "Unterminated string.")
+            raise LoxSyntaxError(self.line_index.lineno(self._current), 0, "Unterminated string.")
 
         self._advance()  # Consume the closing quote
 
-        # Since we want our literal to be, well, literal, we need to eval it
-        # In order to handle multi-line strings, we can wrap our lexeme in triple quotes and then
-        # pass to a safe eval
-        # Thanks @asottile for the nudge :)
-        literal = ast.literal_eval(f'"""{self.src[self._start + 1 : self._current - 1]}"""')
+        literal = decode_string_literal(self.src[self._start + 1 : self._current - 1])
 
-        self._add_token(TokenType.STRING, literal, is_multiline_string)
+        self._add_token(TokenType.STRING, literal)
 
     def _number(self) -> None:
         """
@@ -153,17 +274,17 @@ class Scanner:
         NOTE: Leading & trailing decimals are not supported (e.g. `.123` and `123.`)
         """
         # Consume digits until we get to a non-digit
-        while self._peek().isdigit():
+        while is_digit(self._peek()):
             self._advance()
 
         # Check for fractional component
         # Use peek offset to check the character after the period
         is_float = False
-        if self._peek() == "." and self._peek(offset=1).isdigit():
+        if self._peek() == "." and is_digit(self._peek(offset=1)):
             is_float = True
             self._advance()  # Consume the period
 
-            while self._peek().isdigit():
+            while is_digit(self._peek()):
                 self._advance()
 
         val = self.src[self._start : self._current]
@@ -185,46 +306,17 @@ class Scanner:
 
         # All includes should be resolved before we reach the scanner.
         if token_type == TokenType.INCLUDE:
-            raise LoxSyntaxError(self._lineno, self._col_offset, "Unresolved include statement.")
+            raise LoxSyntaxError(*self._location(self._start), "Unresolved include statement.")
 
-    def _calculate_offsets(self, token_type: TokenType, is_multiline_string: bool) -> OffsetTuple:
-        lexeme = self.src[self._start : self._current]
-        if token_type == TokenType.STRING:
-            # Currently, only string tokens should be able to span multiple lines
-            return OffsetTuple(
-                # self._lineno will be the line where the string terminates, so we need to "rewind"
-                self._lineno - lexeme.count("\n"),
-                self._lineno,
-                self._last_str_start_col,
-                # self._current should be the character immediately after the closing quote
-                # Correct for multiline strings' end column idx being off by 1, can't figure out why
-                self._current - self._line_start - is_multiline_string,
-            )
-        else:
-            return OffsetTuple(
-                self._lineno, self._lineno, self._col_offset, self._col_offset + len(lexeme)
-            )
-
-    def _add_token(
-        self, token_type: TokenType, literal: LITERAL_T = None, is_multiline_string: bool = False
-    ) -> None:
+    def _add_token(self, token_type: TokenType, literal: LITERAL_T = None) -> None:
         """
         Add a token of the specified type to the internal list of tokens.
 
         A `literal` value may be optionally provided for tokens that use it (e.g. `STRING`,
         `NUMERIC`)
         """
-        offsets = self._calculate_offsets(token_type, is_multiline_string)
         self.tokens.append(
-            Token(
-                token_type=token_type,
-                lexeme=self.src[self._start : self._current],
-                literal=literal,
-                lineno=offsets.lineno,
-                end_lineno=offsets.end_lineno,
-                col_offset=offsets.col_offset,
-                end_col_offset=offsets.end_col_offset,
-            )
+            build_token(self.src, self.line_index, token_type, self._start, self._current, literal)
         )
 
     def _handle_block_comment(self) -> None:
@@ -238,30 +330,20 @@ class Scanner:
         while nest_level > 0:
             if self._is_eof():
                 # Unterminated block comment
-                raise LoxSyntaxError(
-                    self._lineno,
-                    # Manually calc EOF column location since we're not advancing tokens
-                    (self._current - self._line_start - 1),
-                    "Unterminated block comment.",
-                )
-
-            # Bump line numbers while we discard them since they won't hit the token scanner
-            if self._peek() == "\n":
-                self._bump_line()
-
-            # Opening a new level of block comment
+                raise LoxSyntaxError(*self._location(self._current), "Unterminated block comment.")
+
             if self._peek() == "/" and self._peek(1) == "*":
+                # Opening a new level of block comment
                 nest_level += 1
                 self._advance()
                 self._advance()
-
-            # Closing one level of block comments
-            if self._peek() == "*" and self._peek(1) == "/":
+            elif self._peek() == "*" and self._peek(1) == "/":
+                # Closing one level of block comments
                 nest_level -= 1
                 self._advance()
                 self._advance()
-
-            self._advance()
+            else:
+                self._advance()
 
     def _scan_token(self) -> None:
         """Consume the next source character(s) & dispatch the appropriate token generation."""
@@ -326,11 +408,9 @@ class Scanner:
                     self._handle_block_comment()
                 else:
                     self._add_token(TokenType.SLASH)
-            case " " | "\r" | "\t":
+            case " " | "\r" | "\t" | "\n":
                 # Ignore whitespace
                 pass
-            case "\n":
-                self._bump_line()
             case '"' | "'":
                 # String literals; can be defined by either `''` or `""`; may be multiline
                 if char == '"':
@@ -341,14 +421,13 @@ class Scanner:
                 self._string(close)
             case _:
                 # Catch numeric literals
-                if char.isdigit():
+                if is_digit(char):
                     self._number()
                 elif is_alpha(char):
                     self._identifier()
                 else:
                     raise LoxSyntaxError(
-                        self._lineno,
-                        self._col_offset,
+                        *self._location(self._start),
                         f"Unsupported character encountered: '{char}'",
                     )
 
@@ -366,18 +445,183 @@ class Scanner:
             try:
                 self._scan_token()
             except LoxSyntaxError as err:
-                self._interpreter.report_error(err)
+                self._report_error(err)
 
-        self.tokens.append(
-            Token(
-                token_type=TokenType.EOF,
-                lexeme="",
-                literal=None,
-                lineno=self._lineno,
-                end_lineno=self._lineno,
-                col_offset=0,
-                end_col_offset=0,
-            )
-        )
+        self.tokens.append(self._eof_token())
 
         return self.tokens
+
+    def _eof_token(self) -> Token:
+        """Build the `EOF` token located at the end of the source."""
+        return build_token(self.src, self.line_index, TokenType.EOF, len(self.src), len(self.src))
+
+
+class RegexScanner(Scanner):
+    """
+    The pylox tokenizer, master regex edition.
+
+    Rather than consuming the source one character at a time, each step matches a complete lexeme
+    (or an entire run of whitespace/comments) against a single compiled alternation pattern and
+    dispatches on the name of the matching group.
+
+    The generated tokens, their line/column offsets, and any reported errors are identical to those
+    generated by `Scanner`.
+    """
+
+    def _skip_block_comment(self, start: int) -> int:
+        """
+        Return the source index immediately following the block comment opening at `start`.
+
+        Nested block comments are tracked so we exit at the end of the topmost block comment. If
+        EOF is reached before the comment is closed, an error is reported & the length of the
+        source is returned.
+        """
+        nest_level = 1
+        for tag in BLOCK_COMMENT_TAGS.finditer(self.src, start + 2):
+            if tag.group() == "/*":
+                nest_level += 1
+            else:
+                nest_level -= 1
+
+            if nest_level == 0:
+                return tag.end()
+
+        # Unterminated block comment
+        end = len(self.src)
+        self._report_error(LoxSyntaxError(*self._location(end), "Unterminated block comment."))
+        return end
+
+    def _lex(self) -> abc.Iterator[RawToken]:
+        """
+        Lazily scan through the loaded source code, yielding each token as it is generated.
+
+        Tokens are yielded in their raw form, see `pylox.tokens.RawToken`. The trailing `EOF` token
+        is not generated.
+        """
+        src = self.src
+        match_token = TOKEN_PATTERN.match
+        src_len = len(src)
+
+        pos = 0
+        while pos < src_len:
+            match_obj = match_token(src, pos)
+            assert match_obj is not None  # The UNSUPPORTED catch-all group always matches
+            start, pos = match_obj.span()
+
+            match match_obj.lastgroup:
+                case "WHITESPACE" | "LINE_COMMENT":
+                    pass
+                case "BLOCK_COMMENT":
+                    pos = self._skip_block_comment(start)
+                case "NUMBER":
+                    lexeme = match_obj.group()
+                    literal = float(lexeme) if "." in lexeme else int(lexeme)
+                    yield (TokenType.NUMBER, start, pos, literal)
+                case "WORD":
+                    token_type = RESERVED.get(match_obj.group(), TokenType.IDENTIFIER)
+                    yield (token_type, start, pos, None)
+
+                    # All includes should be resolved before we reach the scanner.
+                    if token_type == TokenType.INCLUDE:
+                        self._report_error(
+                            LoxSyntaxError(*self._location(start), "Unresolved include statement.")
+                        )
+                case "STRING":
+                    yield (
+                        TokenType.STRING,
+                        start,
+                        pos,
+                        decode_string_literal(src[start + 1 : pos - 1]),
+                    )
+                case "UNTERMINATED_STRING":
+                    pos = src_len
+                    self._report_error(
+                        LoxSyntaxError(self.line_index.lineno(pos), 0, "Unterminated string.")
+                    )
+                case "OPERATOR":
+                    yield (OPERATORS[match_obj.group()], start, pos, None)
+                case _:
+                    self._report_error(
+                        LoxSyntaxError(
+                            *self._location(start),
+                            f"Unsupported character encountered: '{match_obj.group()}'",
+                        )
+                    )
+
+    def iter_tokens(self) -> abc.Iterator[Token]:
+        """
+        Lazily scan through the loaded source code, yielding each token as it is generated.
+
+        Unlike `scan_tokens`, tokens are not stored internal to the scanner, allowing a consumer
+        (e.g. the parser) to interleave scanning with its own work without holding the entire token
+        list in memory. Scanning errors are reported as they are encountered.
+
+        An `EOF` token is automatically generated when the end of the file is reached.
+        """
+        src, line_index = self.src, self.line_index
+        for raw_token in self._lex():
+            yield build_token(src, line_index, *raw_token)
+
+        yield self._eof_token()
+
+    def scan_token_stream(self) -> TokenStream:
+        """
+        Scan through the loaded source code & generate a compact, columnar stream of tokens.
+
+        `Token` instances are only built on demand when the stream is indexed or iterated over.
+
+        An `EOF` token is automatically added to the end of the file when it is reached.
+        """
+        stream = TokenStream(self.src, self.line_index)
+        append = stream.append
+        for raw_token in self._lex():
+            append(*raw_token)
+
+        stream.append(TokenType.EOF, len(self.src), len(self.src))
+        return stream
+
+    def scan_tokens(self) -> list[Token]:
+        """
+        Scan through the loaded source code & generate a list of tokens.
+
+        The list of tokens is stored internal to the scanner & also returned for external use.
+
+        An `EOF` token is automatically added to the end of the file when it is reached.
+        """
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens
+
+
+class ScannerEngine(str, Enum):
+    """Available scanner implementations."""
+
+    CLASSIC = "classic"
+    REGEX = "regex"
+    COLUMNAR = "columnar"
+    STREAMING = "streaming"
+
+
+def tokenize(
+    src: str,
+    interpreter: LoxInterpreterProtocol,
+    engine: ScannerEngine = ScannerEngine.CLASSIC,
+    filepath: t.Optional[Path] = None,
+) -> abc.Iterable[Token]:
+    """
+    Scan the provided source into tokens using the specified scanner engine.
+
+    If the source was loaded from a file other than the main script, its path may be provided to be
+    attached to the scanned tokens.
+
+    NOTE: The `STREAMING` engine returns a lazy token iterator, scanning is deferred until the
+    tokens are consumed.
+    """
+    match engine:
+        case ScannerEngine.CLASSIC:
+            return Scanner(src, interpreter, filepath).scan_tokens()
+        case ScannerEngine.REGEX:
+            return RegexScanner(src, interpreter, filepath).scan_tokens()
+        case ScannerEngine.COLUMNAR:
+            return RegexScanner(src, interpreter, filepath).scan_token_stream()
+        case ScannerEngine.STREAMING:
+            return RegexScanner(src, interpreter, filepath).iter_tokens()
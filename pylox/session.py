@@ -0,0 +1,164 @@
+import typing as t
+from collections import abc
+
+from pylox.cache import CompiledSource
+from pylox.modules import _ErrorTracker, compile_tokens
+from pylox.protocols.interpreter import LoxInterpreterProtocol
+from pylox.scanner import RegexScanner
+from pylox.tokens import TokenStream, TokenType
+
+# Token types that open & close a nested region of tokens, where a declaration can't end
+OPENING_TOKENS = frozenset((TokenType.LEFT_PAREN, TokenType.LEFT_BRACE))
+CLOSING_TOKENS = frozenset((TokenType.RIGHT_PAREN, TokenType.RIGHT_BRACE))
+
+# Token types that end a top-level declaration, unless it's continued by an `else` branch
+DECLARATION_END_TOKENS = frozenset((TokenType.SEMICOLON, TokenType.RIGHT_BRACE))
+
+# Source of a top-level declaration, along with the zero-indexed (lineno, col_offset) of its start
+_DeclarationKey = tuple[str, int, int]
+
+
+def split_declarations(stream: TokenStream) -> abc.Iterator[tuple[int, int]]:
+    """
+    Split the provided token stream into the token index spans of its top-level declarations.
+
+    A top-level declaration ends with a `;` or a `}` outside of any parentheses or braces, unless
+    it's followed by an `else`. The trailing `EOF` token isn't included in any span, & any trailing
+    tokens of an unterminated declaration are yielded as a final span.
+
+    Only the token types are inspected, so no `Token` instances are built.
+    """
+    token_types = [stream.token_type(idx) for idx in range(len(stream) - 1)]
+
+    start = 0
+    depth = 0
+    for idx, token_type in enumerate(token_types):
+        if token_type in OPENING_TOKENS:
+            depth += 1
+        elif token_type in CLOSING_TOKENS:
+            depth = max(depth - 1, 0)
+
+        if depth or token_type not in DECLARATION_END_TOKENS:
+            continue
+
+        if idx + 1 < len(token_types) and token_types[idx + 1] == TokenType.ELSE:
+            continue
+
+        yield start, idx + 1
+        start = idx + 1
+
+    if start < len(token_types):
+        yield start, len(token_types)
+
+
+class Session:
+    """
+    The pylox incremental compilation session!
+
+    REPLs & notebook-style embedding hosts feed source to the interpreter an input (cell) at a time,
+    often re-running a cell that redefines the same large declarations with only a small change.
+    Rather than running every input through the full front-end, a session splits each input into
+    its top-level declarations & only compiles the declarations it hasn't already compiled.
+
+    Globals aren't tracked by the `Resolver`'s scopes, so the resolver's scope state between
+    top-level declarations is always empty & each top-level declaration resolves the same way no
+    matter what surrounds it. This means a compiled declaration can be reused by any later input,
+    as long as its source is unchanged. Declarations are keyed on their source & their starting
+    location in the input, so errors raised by a reused declaration are located correctly. Each
+    declaration is compiled in isolation by `pylox.modules.compile_tokens`, whose resolved locals
+    are collected by a lightweight `pylox.resolver.ResolveTable`, so compiling a declaration never
+    builds an interpreter of its own.
+
+    Up to `max_declarations` compiled declarations are kept, discarding the least recently used.
+
+    NOTE: Splitting an input into declarations requires its tokens, so every input is still
+    scanned, using the columnar `RegexScanner` token stream.
+    """
+
+    def __init__(
+        self,
+        interp: LoxInterpreterProtocol,
+        arena: bool = False,
+        optimize: bool = False,
+        intern: bool = False,
+        max_declarations: int = 4096,
+    ) -> None:
+        self._interp = interp
+        self.arena = arena
+        self.optimize = optimize
+        self.intern = intern
+        self.max_declarations = max_declarations
+
+        # Compiled declarations, in least to most recently used order
+        self._declarations: dict[_DeclarationKey, CompiledSource] = {}
+
+        # Number of declarations compiled & reused over the life of the session
+        self.n_compiled = 0
+        self.n_reused = 0
+
+    def __len__(self) -> int:
+        return len(self._declarations)
+
+    def clear(self) -> None:
+        """Discard all compiled declarations, forcing them to be recompiled."""
+        self._declarations.clear()
+
+    def compile(self, src: str) -> t.Optional[CompiledSource]:
+        """
+        Compile the provided input, reusing any of its previously compiled top-level declarations.
+
+        As with `pylox.modules.compile_source`, any errors encountered are reported to the
+        interpreter & `None` is returned. All of the input's declarations are compiled so that every
+        error is reported, even if an earlier declaration failed to compile.
+        """
+        reporter = _ErrorTracker(self._interp)
+        stream = RegexScanner(src, reporter).scan_token_stream()
+        if reporter.had_error:
+            return None
+
+        statements = []
+        scope_depths = {}
+        had_error = False
+        for start, end in split_declarations(stream):
+            compiled = self._compile_declaration(stream, start, end)
+            if compiled is None:
+                had_error = True
+                continue
+
+            statements.extend(compiled.statements)
+            scope_depths.update(compiled.locals)
+
+        if had_error:
+            return None
+
+        return CompiledSource(statements, scope_depths)
+
+    def _compile_declaration(
+        self, stream: TokenStream, start: int, end: int
+    ) -> t.Optional[CompiledSource]:
+        """Compile the top-level declaration spanning the specified token indices, if required."""
+        lineno, col_offset = stream.line_index.location(stream.starts[start])
+        key = (stream.src[stream.starts[start] : stream.ends[end - 1]], lineno, col_offset)
+
+        compiled = self._declarations.pop(key, None)
+        if compiled is not None:
+            self.n_reused += 1
+        else:
+            # The parser stops at the EOF token, so reuse the input's rather than building another
+            compiled = compile_tokens(
+                [*stream[start:end], stream[-1]],
+                self._interp,
+                self.arena,
+                self.optimize,
+                self.intern,
+            )
+            if compiled is None:
+                return None
+
+            self.n_compiled += 1
+            if len(self._declarations) >= self.max_declarations:
+                del self._declarations[next(iter(self._declarations))]
+
+        # Reinsert to mark the declaration as the most recently used
+        self._declarations[key] = compiled
+        return compiled
@@ -1,6 +1,11 @@
 import typing as t
-from dataclasses import dataclass
+from array import array
+from collections import abc
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from pathlib import Path
+
+from pylox.locations import LineIndex
 
 LITERAL_T = t.Union[str, float, bool, None]
 
@@ -62,14 +67,147 @@ class TokenType(Enum):  # noqa: D101
 
 
 @dataclass(slots=True, frozen=True)
-class Token:  # noqa: D101
+class Token:
+    """
+    A single lexeme scanned from the source.
+
+    Only the offset of the lexeme into its source is stored, along with a reference to the source's
+    `LineIndex`; the line & column location of the token is resolved from these on demand, which
+    is only required when reporting an error.
+    """
+
     token_type: TokenType
     lexeme: str
     literal: LITERAL_T = None
-    lineno: int = -1  # Zero-indexed
-    end_lineno: int = -1  # Zero-indexed
-    col_offset: int = -1  # Zero-indexed, relative to the starting line
-    end_col_offset: int = -1  # Zero indexed, relative to the ending line
+    start: int = -1  # Index of the first character of the lexeme in the source
+    line_index: t.Optional[LineIndex] = field(default=None, repr=False, compare=False)
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.token_type} {self.lexeme} {self.literal}"
+
+    @property
+    def end(self) -> int:
+        """Index immediately following the last character of the lexeme in the source."""
+        return self.start + len(self.lexeme)
+
+    @property
+    def lineno(self) -> int:
+        """Zero-indexed line number of the start of the token, or `-1` if it has no location."""
+        if self.line_index is None:
+            return -1
+
+        return self.line_index.lineno(self.start)
+
+    @property
+    def end_lineno(self) -> int:
+        """Zero-indexed line number of the end of the token, or `-1` if it has no location."""
+        if self.line_index is None:
+            return -1
+
+        return self.line_index.lineno(self.end)
+
+    @property
+    def col_offset(self) -> int:
+        """Zero-indexed column of the start of the token, relative to its starting line."""
+        if self.line_index is None:
+            return -1
+
+        return self.line_index.location(self.start)[1]
+
+    @property
+    def end_col_offset(self) -> int:
+        """Zero-indexed column of the end of the token, relative to its ending line."""
+        if self.line_index is None:
+            return -1
+
+        return self.line_index.location(self.end)[1]
+
+    @property
+    def filepath(self) -> t.Optional[Path]:
+        """Source file of the token, only set for source compiled separately from the script."""
+        if self.line_index is None:
+            return None
+
+        return self.line_index.filepath
+
+
+# Token type, source start index, source end index, literal
+RawToken = tuple[TokenType, int, int, LITERAL_T]
+
+TOKEN_TYPES = tuple(TokenType)
+_TOKEN_TYPE_CODES = {token_type: idx for idx, token_type in enumerate(TOKEN_TYPES)}
+
+
+def build_token(
+    src: str,
+    line_index: LineIndex,
+    token_type: TokenType,
+    start: int,
+    end: int,
+    literal: LITERAL_T = None,
+) -> Token:
+    """Build a `Token` for the lexeme spanning `src[start:end]`."""
+    return Token(token_type, src[start:end], literal, start, line_index)
+
+
+class TokenStream(abc.Sequence[Token]):
+    """
+    A compact, columnar representation of a scanned token sequence.
+
+    Rather than storing a `Token` instance per token, token types & source offsets are stored in
+    parallel `array.array` columns, with the lexeme sliced from the source & the line/column
+    location resolved only when required. Literal values are sparsely stored for the tokens that
+    carry one. `Token` instances are built on demand when the stream is indexed or iterated over.
+    """
+
+    def __init__(self, src: str, line_index: t.Optional[LineIndex] = None) -> None:
+        self.src = src
+        self.line_index = line_index if line_index is not None else LineIndex(src)
+
+        self.token_types = array("B")
+        self.starts = array("I")  # Index of the first character of the lexeme in the source
+        self.ends = array("I")  # Index immediately following the last character of the lexeme
+        self.literals: dict[int, LITERAL_T] = {}
+
+    def append(
+        self, token_type: TokenType, start: int, end: int, literal: LITERAL_T = None
+    ) -> None:
+        """Add a token to the end of the stream."""
+        if literal is not None:
+            self.literals[len(self.token_types)] = literal
+
+        self.token_types.append(_TOKEN_TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def token_type(self, idx: int) -> TokenType:
+        """Return the type of the token at the specified index without building the `Token`."""
+        return TOKEN_TYPES[self.token_types[idx]]
+
+    def __len__(self) -> int:
+        return len(self.token_types)
+
+    @t.overload
+    def __getitem__(self, idx: int) -> Token: ...
+
+    @t.overload
+    def __getitem__(self, idx: slice) -> list[Token]: ...
+
+    def __getitem__(self, idx: int | slice) -> Token | list[Token]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += len(self)
+
+        if not 0 <= idx < len(self):
+            raise IndexError("TokenStream index out of range")
+
+        return build_token(
+            self.src,
+            self.line_index,
+            TOKEN_TYPES[self.token_types[idx]],
+            self.starts[idx],
+            self.ends[idx],
+            self.literals.get(idx),
+        )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import typing as t
+from collections import abc
+
+from pylox import grammar
+
+if t.TYPE_CHECKING:
+    from pylox.modules import Module
+
+# Top-level statements that only bind a name, which can be dropped if that name is never referenced
+SHAKEABLE_DECLARATIONS = (grammar.Function, grammar.Class)
+
+
+class ReferenceCollector:
+    """
+    The pylox reference collector!
+
+    Walks a tree (using an explicit stack of pending nodes) & collects the names of every variable
+    that it references. Scoping is not taken into account, so a local variable that shadows a global
+    name is still counted as a reference to the global; this errs on the side of keeping a
+    declaration alive.
+    """
+
+    def __init__(self) -> None:
+        self.names: set[str] = set()
+        self._pending: list[grammar.Expr | grammar.Stmt] = []
+
+    def collect(self, nodes: abc.Iterable[grammar.Expr | grammar.Stmt]) -> set[str]:
+        """Collect the names referenced by the provided nodes."""
+        self._pending.extend(nodes)
+        while self._pending:
+            self._pending.pop().accept(self)
+
+        return self.names
+
+    def visit_Assign(self, expr: grammar.Assign) -> None:
+        self.names.add(expr.name.lexeme)
+        self._pending.append(expr.value)
+
+    def visit_Binary(self, expr: grammar.Binary) -> None:
+        self._pending.extend((expr.expr_left, expr.expr_right))
+
+    def visit_Call(self, expr: grammar.Call) -> None:
+        self._pending.append(expr.callee)
+        self._pending.extend(expr.arguments)
+
+    def visit_Get(self, expr: grammar.Get) -> None:
+        self._pending.append(expr.object_)
+
+    def visit_Grouping(self, expr: grammar.Grouping) -> None:
+        self._pending.append(expr.expr_expression)
+
+    def visit_Literal(self, expr: grammar.Literal) -> None:
+        pass
+
+    def visit_Logical(self, expr: grammar.Logical) -> None:
+        self._pending.extend((expr.expr_left, expr.expr_right))
+
+    def visit_Set(self, expr: grammar.Set) -> None:
+        self._pending.extend((expr.object_, expr.value))
+
+    def visit_Super(self, expr: grammar.Super) -> None:
+        pass
+
+    def visit_This(self, expr: grammar.This) -> None:
+        pass
+
+    def visit_Unary(self, expr: grammar.Unary) -> None:
+        self._pending.append(expr.expr_right)
+
+    def visit_Variable(self, expr: grammar.Variable) -> None:
+        self.names.add(expr.name.lexeme)
+
+    def visit_Block(self, stmt: grammar.Block) -> None:
+        self._pending.extend(stmt.statements)
+
+    def visit_Class(self, stmt: grammar.Class) -> None:
+        if stmt.superclass is not None:
+            self._pending.append(stmt.superclass)
+
+        self._pending.extend(stmt.methods)
+
+    def visit_Expression(self, stmt: grammar.Expression) -> None:
+        self._pending.append(stmt.expr_expression)
+
+    def visit_Function(self, stmt: grammar.Function) -> None:
+        self._pending.extend(stmt.body)
+
+    def visit_If(self, stmt: grammar.If) -> None:
+        self._pending.extend((stmt.condition, stmt.then_branch))
+        if stmt.else_branch is not None:
+            self._pending.append(stmt.else_branch)
+
+    def visit_Var(self, stmt: grammar.Var) -> None:
+        if stmt.initializer is not None:
+            self._pending.append(stmt.initializer)
+
+    def visit_Return(self, stmt: grammar.Return) -> None:
+        if stmt.value is not None:
+            self._pending.append(stmt.value)
+
+    def visit_Print(self, stmt: grammar.Print) -> None:
+        self._pending.append(stmt.expr_expression)
+
+    def visit_While(self, stmt: grammar.While) -> None:
+        self._pending.extend((stmt.condition, stmt.body))
+
+    def visit_Break(self, stmt: grammar.Break) -> None:
+        pass
+
+    def visit_Continue(self, stmt: grammar.Continue) -> None:
+        pass
+
+
+def find_references(nodes: abc.Iterable[grammar.Expr | grammar.Stmt]) -> frozenset[str]:
+    """Return the names of every variable referenced by the provided nodes."""
+    return frozenset(ReferenceCollector().collect(nodes))
+
+
+def tree_shake(modules: abc.Sequence[Module], roots: abc.Iterable[str]) -> list[list[grammar.Stmt]]:
+    """
+    Drop any top-level function & class declarations of the modules that are never referenced.
+
+    Starting from the provided root names (e.g. the names referenced by the including script), a
+    declaration is kept if its name is referenced by a root, by any other top-level statement of
+    the modules, or by another kept declaration. All other top-level statements are always kept.
+
+    The kept statements of each module are returned, in the same order as the provided modules.
+    """
+    # Name -> (module index, statement index) of each of its declarations
+    declarations: dict[str, list[tuple[int, int]]] = {}
+    pending = list(roots)
+    for module_idx, module in enumerate(modules):
+        for stmt_idx, stmt in enumerate(module.compiled.statements):
+            if isinstance(stmt, SHAKEABLE_DECLARATIONS):
+                declarations.setdefault(stmt.name.lexeme, []).append((module_idx, stmt_idx))
+            else:
+                pending.extend(module.references[stmt_idx])
+
+    live_names: set[str] = set()
+    live_declarations: set[tuple[int, int]] = set()
+    while pending:
+        name = pending.pop()
+        if name in live_names:
+            continue
+
+        live_names.add(name)
+        for module_idx, stmt_idx in declarations.get(name, ()):
+            live_declarations.add((module_idx, stmt_idx))
+            pending.extend(modules[module_idx].references[stmt_idx])
+
+    return [
+        [
+            stmt
+            for stmt_idx, stmt in enumerate(module.compiled.statements)
+            if not isinstance(stmt, SHAKEABLE_DECLARATIONS)
+            or (module_idx, stmt_idx) in live_declarations
+        ]
+        for module_idx, module in enumerate(modules)
+    ]
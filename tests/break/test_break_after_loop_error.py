@@ -0,0 +1,33 @@
+from textwrap import dedent
+
+import pytest
+
+from pylox.lox import Lox
+
+TEST_SRC = dedent(
+    """\
+    fun f1(a) {
+        while (this) {}  // Expect resolver error: Can't use 'this' outside of a class.
+    }
+
+    fun f2(a) {
+        break;  // Expect resolver error: Can't use 'break' outside of a for or while loop.
+    }
+    """
+)
+
+EXPECTED_STDOUTS = [
+    "2:12: LoxResolverError: Can't use 'this' outside of a class.",
+    "6:5: LoxResolverError: Can't use 'break' outside of a for or while loop.",
+]
+
+
+def test_break_after_loop_error(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(TEST_SRC)
+
+    assert interpreter.had_error
+    assert not interpreter.had_runtime_error
+
+    all_out = capsys.readouterr().out.splitlines()
+    assert all_out == EXPECTED_STDOUTS
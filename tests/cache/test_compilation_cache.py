@@ -0,0 +1,131 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from pylox.cache import CACHE_DIRNAME, CompilationCache
+from pylox.lox import Lox
+from pylox.parser import Parser
+from pylox.preprocessor import PreProcessor
+
+HEADER_SRC = dedent(
+    """\
+    fun greet(name) {
+        print "Hello, " + name + "!";
+    }
+    """
+)
+
+SCRIPT_SRC = dedent(
+    """\
+    include "{header}"
+
+    fun make_counter() {{
+        var count = 0;
+        fun counter() {{
+            count = count + 1;
+            return count;
+        }}
+        return counter;
+    }}
+
+    var counter = make_counter();
+    counter();
+    print counter();
+    greet("world");
+    """
+)
+
+EXPECTED_STDOUTS = ["2", "Hello, world!"]
+
+
+@pytest.fixture
+def script(tmp_path: Path) -> Path:
+    header = tmp_path / "header.lox"
+    header.write_text(HEADER_SRC)
+
+    script = tmp_path / "script.lox"
+    script.write_text(SCRIPT_SRC.format(header=header.as_posix()))
+
+    return script
+
+
+def test_cache_round_trip(
+    script: Path, capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    Lox().run_file(script, use_cache=True)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+
+    cache_file = CompilationCache(script).cache_file
+    assert cache_file.parent == script.parent / CACHE_DIRNAME
+    assert cache_file.exists()
+
+    # On a cache hit the front-end shouldn't run at all
+    def _fail(*args, **kwargs) -> None:
+        raise AssertionError("Cache was not used")
+
+    monkeypatch.setattr(Parser, "parse", _fail)
+    Lox().run_file(script, use_cache=True)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+
+
+def test_cache_invalidated_by_include_change(script: Path, capsys: pytest.CaptureFixture) -> None:
+    Lox().run_file(script, use_cache=True)
+    capsys.readouterr()
+
+    header = script.parent / "header.lox"
+    header.write_text(HEADER_SRC.replace("Hello", "Goodbye"))
+
+    Lox().run_file(script, use_cache=True)
+    assert capsys.readouterr().out.splitlines() == ["2", "Goodbye, world!"]
+
+
+@pytest.mark.parametrize("option", ("arena", "optimize", "intern"))
+def test_cache_invalidated_by_option_change(
+    script: Path, option: str, capsys: pytest.CaptureFixture
+) -> None:
+    cache = CompilationCache(script)
+    resolved_src = PreProcessor(script.read_text(), splice_includes=False).resolved_src
+    options = {"arena": False, "optimize": False, "intern": False}
+    flipped = {**options, option: True}
+
+    Lox(**options).run_file(script, use_cache=True)
+    capsys.readouterr()
+    assert cache.load(resolved_src, **options) is not None
+    assert cache.load(resolved_src, **flipped) is None
+
+    # Source compiled with the previous options is a cache miss, so it's recompiled & re-cached
+    Lox(**flipped).run_file(script, use_cache=True)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+    assert cache.load(resolved_src, **flipped) is not None
+    assert cache.load(resolved_src, **options) is None
+
+
+def test_corrupt_cache_is_miss(script: Path, capsys: pytest.CaptureFixture) -> None:
+    cache = CompilationCache(script)
+    Lox().run_file(script, use_cache=True)
+    capsys.readouterr()
+
+    cached = cache.cache_file.read_bytes()
+    cache.cache_file.write_bytes(cached[:-10])
+    resolved_src = PreProcessor(script.read_text()).resolved_src
+    assert cache.load(resolved_src) is None
+
+    Lox().run_file(script, use_cache=True)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+
+
+def test_no_cache_on_error(tmp_path: Path) -> None:
+    script = tmp_path / "bad.lox"
+    script.write_text("print ;")
+
+    with pytest.raises(SystemExit):
+        Lox().run_file(script, use_cache=True)
+
+    assert not CompilationCache(script).cache_file.exists()
+
+
+def test_no_cache_by_default(script: Path, capsys: pytest.CaptureFixture) -> None:
+    Lox().run_file(script)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+    assert not (script.parent / CACHE_DIRNAME).exists()
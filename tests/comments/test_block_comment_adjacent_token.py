@@ -0,0 +1,26 @@
+from textwrap import dedent
+
+import pytest
+
+from pylox.lox import Lox
+
+TEST_SRC = dedent(
+    """\
+    /* Block comment directly followed by code */print "ok";
+    /* Block comment directly followed by a newline */
+    print "ok";
+    """
+)
+
+EXPECTED_STDOUTS = ["ok", "ok"]
+
+
+def test_block_comment_adjacent_token(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(TEST_SRC)
+
+    assert not interpreter.had_error
+    assert not interpreter.had_runtime_error
+
+    all_out = capsys.readouterr().out.splitlines()
+    assert all_out == EXPECTED_STDOUTS
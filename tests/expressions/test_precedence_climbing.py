@@ -0,0 +1,78 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pylox import grammar
+from pylox.parser import Parser
+from pylox.scanner import tokenize
+
+
+def _sexpr(expr: grammar.Expr) -> str:
+    """Dump the provided expression as a fully parenthesized s-expression."""
+    match expr:
+        case grammar.Binary() | grammar.Logical():
+            left, right = _sexpr(expr.expr_left), _sexpr(expr.expr_right)
+            return f"({expr.token_operator.lexeme} {left} {right})"
+        case grammar.Unary():
+            return f"({expr.token_operator.lexeme} {_sexpr(expr.expr_right)})"
+        case grammar.Grouping():
+            return f"(group {_sexpr(expr.expr_expression)})"
+        case grammar.Assign():
+            return f"(= {expr.name.lexeme} {_sexpr(expr.value)})"
+        case grammar.Set():
+            return f"(= {_sexpr(expr.object_)}.{expr.name.lexeme} {_sexpr(expr.value)})"
+        case grammar.Get():
+            return f"{_sexpr(expr.object_)}.{expr.name.lexeme}"
+        case grammar.Call():
+            args = " ".join(_sexpr(arg) for arg in expr.arguments)
+            return f"(call {_sexpr(expr.callee)} {args})"
+        case grammar.Variable():
+            return expr.name.lexeme
+        case grammar.Literal():
+            return str(expr.object_value)
+        case _:  # pragma: no cover
+            raise ValueError(f"Unsupported expression: {expr}")
+
+
+PRECEDENCE_CASES = (
+    ("a - b - c", "(- (- a b) c)"),
+    ("a ^ b ^ c", "(^ (^ a b) c)"),
+    ("a + b * c - d", "(- (+ a (* b c)) d)"),
+    ("a * b ^ c % d", "(% (* a (^ b c)) d)"),
+    ("-a ^ 2", "(^ (- a) 2)"),
+    ("!-a.b(c)", "(! (- (call a.b c)))"),
+    ("a or b and c == d < e", "(or a (and b (== c (< d e))))"),
+    ("a and b or c and d", "(or (and a b) (and c d))"),
+    ("a = b = c or d", "(= a (= b (or c d)))"),
+    ("a.b = (c + d) \\ e", "(= a.b (\\ (group (+ c d)) e))"),
+    ("f(a, b + c)(d).e", "(call (call f a (+ b c)) d).e"),
+    ("1 < 2 != true", "(!= (< 1 2) True)"),
+)
+
+
+@pytest.mark.parametrize(("src", "truth_sexpr"), PRECEDENCE_CASES)
+def test_precedence(src: str, truth_sexpr: str) -> None:
+    interpreter = Mock()
+    statements = Parser(tokenize(f"{src};", interpreter), interpreter).parse()
+    interpreter.report_error.assert_not_called()
+
+    assert statements is not None
+    assert _sexpr(statements[0].expr_expression) == truth_sexpr
+
+
+ERROR_CASES = (
+    ("a + b = c;", "Invalid assignment target."),
+    ("1 + ;", "Expected expression."),
+    ("(1 + 2;", "Expected ')' after expression."),
+    ("super;", "Expected '.' after 'super'."),
+    ("a.;", "Expected property name after '.'."),
+)
+
+
+@pytest.mark.parametrize(("src", "truth_message"), ERROR_CASES)
+def test_parse_error(src: str, truth_message: str) -> None:
+    interpreter = Mock()
+    Parser(tokenize(src, interpreter), interpreter).parse()
+
+    (err,) = (call.args[0] for call in interpreter.report_error.call_args_list)
+    assert err.message == truth_message
@@ -0,0 +1,30 @@
+from textwrap import dedent
+
+import pytest
+
+from pylox.lox import Lox
+
+TEST_SRC = dedent(
+    """\
+    fun f(n) {
+        return f(n + 1);
+    }
+
+    print "before";
+    f(0);  // Expect runtime error: Maximum recursion depth exceeded.
+    print "after";
+    """
+)
+
+EXPECTED_STDOUTS = ["before", "6:1: LoxRuntimeError: Maximum recursion depth exceeded."]
+
+
+def test_unbounded_recursion(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(TEST_SRC)
+
+    assert interpreter.had_error
+    assert interpreter.had_runtime_error
+
+    all_out = capsys.readouterr().out.splitlines()
+    assert all_out == EXPECTED_STDOUTS
@@ -0,0 +1,211 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.lox import Lox
+
+# Diamond include graph: script -> left & right -> base
+BASE_SRC = dedent(
+    """\
+    print "Loading base";
+
+    fun base() {
+        return "base";
+    }
+    """
+)
+
+LEFT_SRC = dedent(
+    """\
+    include "{base}"
+
+    fun left() {{
+        return "left of " + base();
+    }}
+    """
+)
+
+RIGHT_SRC = dedent(
+    """\
+    include "{base}"
+
+    fun right() {{
+        return "right of " + base();
+    }}
+    """
+)
+
+SCRIPT_SRC = dedent(
+    """\
+    include "{left}"
+    include "{right}"
+
+    print left();
+    print right();
+    """
+)
+
+EXPECTED_STDOUTS = ["Loading base", "left of base", "right of base"]
+
+
+@pytest.fixture
+def script(tmp_path: Path) -> Path:
+    base = tmp_path / "base.lox"
+    base.write_text(BASE_SRC)
+
+    for name, src in (("left", LEFT_SRC), ("right", RIGHT_SRC)):
+        (tmp_path / f"{name}.lox").write_text(src.format(base=base.as_posix()))
+
+    script = tmp_path / "script.lox"
+    script.write_text(
+        SCRIPT_SRC.format(
+            left=(tmp_path / "left.lox").as_posix(), right=(tmp_path / "right.lox").as_posix()
+        )
+    )
+
+    return script
+
+
+def test_diamond_include(script: Path, capsys: pytest.CaptureFixture) -> None:
+    Lox().run_file(script)
+    assert capsys.readouterr().out.splitlines() == EXPECTED_STDOUTS
+
+
+def test_dependency_order(script: Path) -> None:
+    lox = Lox()
+    modules = lox.modules.load([script.parent / "left.lox", script.parent / "right.lox"])
+
+    assert modules is not None
+    assert [module.filepath.stem for module in modules] == ["base", "left", "right"]
+
+
+def test_module_source_map(script: Path) -> None:
+    left = script.parent / "left.lox"
+    base = script.parent / "base.lox"
+    lox = Lox()
+    lox.modules.load([left])
+
+    offset = base.read_text().index("base()")
+    check.equal(lox.modules.location(base, offset), (base, 2, 4))
+    check.equal(lox.modules.line_index(base).location(offset), (2, 4))
+
+    # Locations of a module's tokens are resolved from the same source
+    function = lox.modules.modules[left].compiled.statements[-1]
+    assert isinstance(function, grammar.Function)
+    check.equal(lox.modules.location(left, function.name.start), (left, 2, 4))
+
+    with pytest.raises(KeyError):
+        lox.modules.location(script, 0)
+
+
+def test_module_compiled_once(script: Path) -> None:
+    left = script.parent / "left.lox"
+    first = Lox().modules.load([left])
+    second = Lox().modules.load([left])
+
+    assert first is not None and second is not None
+    for first_module, second_module in zip(first, second, strict=True):
+        check.is_(first_module, second_module)
+
+
+def test_changed_module_recompiled(script: Path, capsys: pytest.CaptureFixture) -> None:
+    Lox().run_file(script)
+    capsys.readouterr()
+
+    base = script.parent / "base.lox"
+    base.write_text(BASE_SRC.replace('"base"', '"new base"'))
+    Lox().run_file(script)
+    assert capsys.readouterr().out.splitlines() == [
+        "Loading base",
+        "left of new base",
+        "right of new base",
+    ]
+
+
+def test_module_run_once_per_interpreter(script: Path, capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run_file(script)
+    lox.run_file(script)
+    assert capsys.readouterr().out.splitlines() == [*EXPECTED_STDOUTS, *EXPECTED_STDOUTS[1:]]
+
+
+def test_circular_include(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    first = tmp_path / "first.lox"
+    second = tmp_path / "second.lox"
+    first.write_text(f'include "{second.as_posix()}"\nprint "first";\n')
+    second.write_text(f'include "{first.as_posix()}"\nprint "second";\n')
+
+    lox = Lox()
+    lox.run(f'include "{first.as_posix()}"\n')
+
+    check.is_true(lox.had_error)
+    assert capsys.readouterr().out.startswith("1:1: (Error in second.lox) LoxPreProcessorError")
+
+
+NESTED_RUNTIME_ERROR = dedent(
+    """\
+    print "Loading base";
+
+    fun base() {
+        return -"base";
+    }
+    """
+)
+
+
+def test_nested_module_error_location(script: Path, capsys: pytest.CaptureFixture) -> None:
+    (script.parent / "base.lox").write_text(NESTED_RUNTIME_ERROR)
+
+    with pytest.raises(SystemExit):
+        Lox().run_file(script)
+
+    stdout = capsys.readouterr().out.splitlines()
+    assert stdout[1].startswith("4:12: (Error in base.lox) LoxRuntimeError")
+
+
+def test_direct_module_error_location(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    module = tmp_path / "module.lox"
+    module.write_text("\nvar a = ;\n")
+
+    lox = Lox()
+    lox.run(f'\ninclude "{module.as_posix()}"\nprint "unreachable";\n')
+
+    check.is_true(lox.had_error)
+    assert capsys.readouterr().out.startswith("2:1: (Error in included source) 2:9: LoxParseError")
+
+
+def test_nested_relative_include(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    # Includes of a module are resolved relative to the module rather than the current directory
+    lib = tmp_path / "lib"
+    lib.mkdir()
+    (lib / "base.lox").write_text(BASE_SRC)
+    (lib / "left.lox").write_text(LEFT_SRC.format(base="base.lox"))
+    monkeypatch.chdir(tmp_path)
+
+    lox = Lox()
+    lox.run('include "lib/left.lox"\nprint left();\n')
+
+    check.is_false(lox.had_error)
+    assert capsys.readouterr().out.splitlines() == ["Loading base", "left of base"]
+
+
+def test_module_compiled_with_options(tmp_path: Path) -> None:
+    module = tmp_path / "module.lox"
+    module.write_text("var a = 1 + 2;\n")
+
+    default = Lox().modules.load([module])
+    optimized = Lox(optimize=True).modules.load([module])
+
+    assert default is not None and optimized is not None
+    check.is_instance(default[0].compiled.statements[0].initializer, grammar.Binary)
+    folded = optimized[0].compiled.statements[0].initializer
+    check.is_instance(folded, grammar.Literal)
+    check.equal(folded.object_value, 3)
+
+    # Modules compiled with different options are cached separately
+    check.is_(Lox().modules.load([module])[0], default[0])
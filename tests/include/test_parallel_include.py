@@ -0,0 +1,85 @@
+import threading
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from pylox import modules, preprocessor
+from pylox.lox import Lox
+from pylox.modules import ModuleLoader, clear_module_cache
+from pylox.preprocessor import PreProcessor
+
+
+@pytest.fixture
+def headers(tmp_path: Path) -> list[Path]:
+    filepaths = []
+    for idx in range(6):
+        filepath = tmp_path / f"header_{idx}.lox"
+        filepath.write_text(f"fun header_{idx}() {{\n    return {idx};\n}}\n")
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def test_concurrent_matches_serial(headers: list[Path]) -> None:
+    clear_module_cache()
+    serial = ModuleLoader(Lox(), max_workers=1).load(headers)
+    clear_module_cache()
+    concurrent = ModuleLoader(Lox(), max_workers=16).load(headers)
+
+    assert serial is not None and concurrent is not None
+    assert [module.filepath for module in concurrent] == [module.filepath for module in serial]
+    assert [module.filepath for module in concurrent] == headers
+
+
+def test_modules_fetched_concurrently(
+    headers: list[Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Each fetch blocks until the other starts, so a serial fetch would break the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    read_module_source = modules._read_module_source
+
+    def read_together(*args: object) -> modules._ModuleSource:
+        barrier.wait()
+        return read_module_source(*args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(modules, "_read_module_source", read_together)
+    clear_module_cache()
+    loaded = ModuleLoader(Lox(), max_workers=2).load(headers[:2])
+
+    assert loaded is not None
+    assert [module.filepath for module in loaded] == headers[:2]
+
+
+MISSING_INCLUDES = dedent(
+    """\
+    include <hello_world>
+    include <butts>
+    include <map>
+    include <more_butts>
+    """
+)
+
+
+def test_first_missing_include_raises() -> None:
+    with pytest.raises(ValueError, match=r"butts\.lox"):
+        PreProcessor(MISSING_INCLUDES)
+
+
+def test_module_includes_not_fetched(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Includes compiled as modules are left for the module loader to read, so the preprocessor
+    # doesn't access the files
+    monkeypatch.setattr(preprocessor, "load_if_exists", None)
+    pre = PreProcessor(MISSING_INCLUDES, splice_includes=False)
+
+    assert [filepath.name for filepath in pre.includes] == [
+        "hello_world.lox",
+        "butts.lox",
+        "map.lox",
+        "more_butts.lox",
+    ]
+
+
+def test_missing_module_include_raises() -> None:
+    with pytest.raises(ValueError, match=r"butts\.lox"):
+        Lox().run(MISSING_INCLUDES)
@@ -0,0 +1,82 @@
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox.lox import Lox
+from pylox.modules import load_header
+from pylox.preprocessor import BUILTINS_PATH, PreProcessor
+
+MAP_HEADER = (BUILTINS_PATH / "map.lox").resolve()
+
+STDLIB_SRC = dedent(
+    """\
+    include <map>
+
+    fun double(x) {
+        return 2 * x;
+    }
+
+    var arr = array(0);
+    arr.append(21);
+    print map(arr, double).get(0);
+    """
+)
+
+
+def test_stdlib_include_not_spliced() -> None:
+    pre = PreProcessor(STDLIB_SRC, splice_includes=False)
+
+    check.equal(pre.resolved_src.splitlines()[0], "")
+    check.equal(pre.resolved_src.count("\n"), STDLIB_SRC.count("\n"))
+    check.equal(pre.includes, {MAP_HEADER: 0})
+    check.is_false(pre.has_includes)
+
+
+def test_header_compiled_once() -> None:
+    check.is_(load_header(MAP_HEADER), load_header(MAP_HEADER))
+
+
+def test_header_shared_between_interpreters(capsys: pytest.CaptureFixture) -> None:
+    first, second = Lox(), Lox()
+    first.run(STDLIB_SRC)
+    second.run(STDLIB_SRC)
+    assert capsys.readouterr().out.splitlines() == ["42", "42"]
+
+    map_decl = first.interpreter.globals.get_at(0, "map").declaration
+    check.is_(map_decl, second.interpreter.globals.get_at(0, "map").declaration)
+    check.is_(map_decl, load_header(MAP_HEADER).statements[0])
+
+
+def test_header_available_to_later_runs(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run("include <hello_world>")
+    lox.run("hello_world();")
+    assert capsys.readouterr().out.splitlines() == ["Hello, world!"]
+
+
+HEADER_RUNTIME_ERROR = dedent(
+    """\
+
+    include <map>
+    map(nil, nil);
+    """
+)
+
+SCRIPT_RUNTIME_ERROR = dedent(
+    """\
+    include <map>
+    print foo;
+    """
+)
+
+ERROR_CASES = (
+    (HEADER_RUNTIME_ERROR, "2:1: (Error in included source) 4:35: LoxRuntimeError"),
+    (SCRIPT_RUNTIME_ERROR, "2:7: LoxRuntimeError"),
+)
+
+
+@pytest.mark.parametrize(("src", "truth_error_prefix"), ERROR_CASES)
+def test_error_location(src: str, truth_error_prefix: str, capsys: pytest.CaptureFixture) -> None:
+    Lox().run(src)
+    assert capsys.readouterr().out.startswith(truth_error_prefix)
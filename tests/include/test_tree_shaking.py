@@ -0,0 +1,132 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox.lox import Lox
+from pylox.tree_shaker import find_references, tree_shake
+
+LIBRARY_SRC = dedent(
+    """\
+    fun used() {
+        return helper();
+    }
+
+    fun helper() {
+        return "helped";
+    }
+
+    fun unused() {
+        return other_unused();
+    }
+
+    fun other_unused() {
+        return "nope";
+    }
+
+    class Base {
+        greet() {
+            return helper();
+        }
+    }
+
+    class Derived < Base {}
+
+    fun side_effect() {
+        return "side effect";
+    }
+
+    var loaded = side_effect();
+    """
+)
+
+SHAKE_CASES = (
+    ({"used"}, {"used", "helper", "side_effect"}),
+    ({"Derived"}, {"Derived", "Base", "helper", "side_effect"}),
+    (set(), {"side_effect"}),
+)
+
+
+@pytest.fixture
+def library(tmp_path: Path) -> Path:
+    library = tmp_path / "library.lox"
+    library.write_text(LIBRARY_SRC)
+    return library
+
+
+@pytest.mark.parametrize(("roots", "truth_declarations"), SHAKE_CASES)
+def test_tree_shake(library: Path, roots: set[str], truth_declarations: set[str]) -> None:
+    modules = Lox().modules.load([library])
+    assert modules is not None
+
+    (kept,) = tree_shake(modules, roots)
+    declarations = {stmt.name.lexeme for stmt in kept[:-1]}  # type: ignore[attr-defined]
+    assert declarations == truth_declarations
+
+    # Non-declaration statements are always kept
+    assert kept[-1] is modules[0].compiled.statements[-1]
+
+
+def test_find_references(library: Path) -> None:
+    modules = Lox().modules.load([library])
+    assert modules is not None
+
+    check.equal(find_references(modules[0].compiled.statements[:1]), {"helper"})
+    check.equal(find_references(modules[0].compiled.statements[5:6]), {"Base"})
+
+
+SCRIPT_SRC = dedent(
+    """\
+    include <map>
+    include <hello_world>
+    include <split_on>
+    include "{library}"
+
+    hello_world();
+    print used();
+    """
+)
+
+
+def _is_defined(lox: Lox, name: str) -> bool:
+    return name in lox.interpreter.globals.slots
+
+
+def test_unused_declarations_not_defined(
+    library: Path, tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    script = tmp_path / "script.lox"
+    script.write_text(SCRIPT_SRC.format(library=library.as_posix()))
+
+    lox = Lox(tree_shake=True)
+    lox.run_file(script)
+    assert capsys.readouterr().out.splitlines() == ["Hello, world!", "helped"]
+
+    for name in ("hello_world", "used", "helper", "loaded"):
+        check.is_true(_is_defined(lox, name), name)
+
+    for name in ("map", "split_on", "unused", "Base"):
+        check.is_false(_is_defined(lox, name), name)
+
+
+def test_later_run_defines_newly_used(
+    library: Path, tmp_path: Path, capsys: pytest.CaptureFixture
+) -> None:
+    script = tmp_path / "script.lox"
+    script.write_text(SCRIPT_SRC.format(library=library.as_posix()))
+
+    lox = Lox()
+    lox.run(script.read_text(), tree_shake=True)
+    lox.run(f'include "{library.as_posix()}"\nprint unused();', tree_shake=True)
+
+    # The library's top-level side effects should only have run once
+    assert capsys.readouterr().out.splitlines() == ["Hello, world!", "helped", "nope"]
+
+
+def test_no_tree_shake_defines_all(library: Path) -> None:
+    lox = Lox()
+    lox.run(f'include <map>\ninclude "{library.as_posix()}"\n')
+
+    for name in ("map", "used", "unused", "Base", "Derived"):
+        check.is_true(_is_defined(lox, name), name)
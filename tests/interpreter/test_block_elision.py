@@ -0,0 +1,116 @@
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.lox import Lox
+from pylox.modules import compile_source
+
+ELISION_SRC = dedent(
+    """\
+    {
+        print "no variables";
+    }
+    {
+        var top = "no enclosing frame";
+    }
+    fun f(a) {
+        for (var i = 0; i < a; i = i + 1) {
+            var b = i;
+        }
+        {
+            var c = a;
+            fun g() {
+                return c;
+            }
+        }
+        {
+            var d = a;
+            if (d) {
+                class C {}
+            }
+        }
+        var e = a;
+        return e;
+    }
+    """
+)
+
+
+def test_elided() -> None:
+    compiled = compile_source(ELISION_SRC, Lox())
+    assert compiled is not None
+
+    no_variables, top_level, function = compiled.statements
+    check.is_true(no_variables.elided)  # type: ignore[attr-defined]
+    check.is_false(top_level.elided)  # type: ignore[attr-defined]
+
+    assert isinstance(function, grammar.Function)
+    for_loop, captured, nested_class, _, ret = function.body
+
+    # The initializer's block, the increment's block, & the body are all stored in `f`'s frame
+    assert isinstance(for_loop, grammar.Block)
+    check.is_true(for_loop.elided)
+    _, while_loop = for_loop.statements
+    assert isinstance(while_loop, grammar.While)
+    assert isinstance(while_loop.body, grammar.Block)
+    check.is_true(while_loop.body.elided)
+    body, _ = while_loop.body.statements
+    check.is_true(body.elided)  # type: ignore[attr-defined]
+
+    # Blocks declaring a function or class, however deeply nested, keep their own scope
+    check.is_false(captured.elided)  # type: ignore[attr-defined]
+    check.is_false(nested_class.elided)  # type: ignore[attr-defined]
+
+    # The slots of elided blocks are reused once the block ends
+    assert isinstance(ret, grammar.Return)
+    assert isinstance(ret.value, grammar.Variable)
+    check.equal((ret.value.depth, ret.value.slot), (0, 1))
+
+
+RUN_SRC = dedent(
+    """\
+    fun f() {
+        while (true) {
+            var a = "a";
+            break;
+        }
+        var b = "b";
+        print b;
+        var s = 1;
+        {
+            var s = 2;
+            {
+                var s = 3;
+                print s;
+            }
+            print s;
+        }
+        print s;
+        fun early(n) {
+            while (true) {
+                var z = n;
+                {
+                    var w = z + 1;
+                    return w;
+                }
+            }
+        }
+        print early(1);
+        var c = "c";
+        print b + c;
+    }
+    f();
+    """
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+def test_run_elided(arena: bool, capsys: pytest.CaptureFixture) -> None:
+    lox = Lox(arena=arena)
+    lox.run(RUN_SRC)
+
+    assert not lox.had_error
+    assert not lox.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == ["b", "3", "2", "1", "2", "bc"]
@@ -0,0 +1,65 @@
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.lox import Lox
+from pylox.modules import compile_source
+
+
+@pytest.mark.parametrize("arena", (False, True))
+def test_slot_cached(arena: bool) -> None:
+    lox = Lox()
+    compiled = compile_source('var a = 1; a = a + len("ab");', lox, arena=arena)
+    assert compiled is not None
+
+    _, assignment = compiled.statements
+    assert isinstance(assignment, grammar.Expression)
+    assign = assignment.expr_expression
+    assert isinstance(assign, grammar.Assign)
+    assert isinstance(assign.value, grammar.Binary)
+    variable = assign.value.expr_left
+    assert isinstance(variable, grammar.Variable)
+    check.equal(variable.global_slot, grammar.UNCACHED)
+
+    lox.interpreter.interpret(compiled.statements)
+    globals_ = lox.interpreter.globals
+    for expr in (assign, variable):
+        check.equal(expr.global_slot, (globals_.version, globals_.slots["a"]))
+
+    check.equal(globals_.get_at(0, "a"), globals_.cells[globals_.slots["a"]])
+
+
+def test_shared_between_interpreters(capsys: pytest.CaptureFixture) -> None:
+    # Slots cached by one interpreter's globals aren't used by another's
+    first, second = Lox(), Lox()
+    compiled = compile_source("print a + b;", first)
+    assert compiled is not None
+
+    first.run("var a = 1; var b = 2;")
+    second.run('var b = "b"; var a = "a";')
+    first.interpreter.interpret(compiled.statements)
+    second.interpreter.interpret(compiled.statements)
+    first.interpreter.interpret(compiled.statements)
+
+    assert capsys.readouterr().out.splitlines() == ["3", "ab", "3"]
+
+
+def test_redefinition(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run_cell('var a = 1; fun f() { return a + len("ab"); }')
+    lox.run_cell("print f();")
+    lox.run_cell("var a = 2; fun len(x) { return 10; }")
+    lox.run_cell("print f();")
+
+    assert capsys.readouterr().out.splitlines() == ["3", "12"]
+
+
+def test_undefined_then_defined(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run_cell("fun f() { return b; } f();")
+    lox.run_cell("var b = 1; print f();")
+
+    assert capsys.readouterr().out.splitlines() == [
+        "1:18: LoxRuntimeError: Undefined variable 'b'.",
+        "1",
+    ]
@@ -0,0 +1,159 @@
+import dataclasses
+import typing as t
+from textwrap import dedent
+
+import pytest
+
+from pylox import grammar
+from pylox.interpreter import Interpreter
+from pylox.lox import Lox
+from pylox.modules import compile_source
+from pylox.parser import Parser
+from pylox.resolver import Resolver, ResolveTable
+from pylox.scanner import Scanner
+
+SLOT_SRC = dedent(
+    """\
+    var g = 0;
+    fun f(a, b) {
+        var c = a;
+        {
+            var d = b;
+            print a + b + c + d + g;
+        }
+    }
+    class A < B {
+        m() {
+            return this.x + super.m();
+        }
+    }
+    """
+)
+
+
+def test_slots() -> None:
+    compiled = compile_source(SLOT_SRC, Lox())
+    assert compiled is not None
+
+    resolved = sorted(
+        (getattr(expr, "name", getattr(expr, "keyword", None)).lexeme, scope)  # type: ignore[union-attr]
+        for expr, scope in compiled.locals.items()
+    )
+    # The block can't be captured by a closure, so its variables are stored in the function's frame
+    assert resolved == [
+        ("a", (0, 0)),
+        ("a", (0, 0)),
+        ("b", (0, 1)),
+        ("b", (0, 1)),
+        ("c", (0, 2)),
+        ("d", (0, 3)),
+        ("super", (2, 0)),
+        ("this", (1, 0)),
+    ]
+
+
+def test_resolve_table() -> None:
+    lox = Lox()
+    statements = Parser(Scanner(SLOT_SRC, lox).scan_tokens(), lox).parse()
+    assert statements is not None
+
+    resolved = ResolveTable(lox)
+    Resolver(resolved).resolve(statements)
+    assert sorted(resolved.locals.values()) == [
+        (0, 0),
+        (0, 0),
+        (0, 1),
+        (0, 1),
+        (0, 2),
+        (0, 3),
+        (1, 0),
+        (2, 0),
+    ]
+
+
+def test_compile_without_interpreter(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Source is compiled in isolation, so no throwaway interpreter should be built to resolve it
+    lox = Lox()
+    monkeypatch.setattr(Interpreter, "__init__", None)
+
+    compiled = compile_source(SLOT_SRC, lox, optimize=True)
+    assert compiled is not None
+    assert len(compiled.locals) == 8
+
+
+class _ResolvedCollector:
+    """Collect the resolved expressions in a statement tree, along with their annotations."""
+
+    def __init__(self) -> None:
+        self.resolved: list[tuple[str, int, int]] = []
+
+    def collect(self, node: t.Any) -> None:
+        match node:
+            case grammar.Variable(name=name) | grammar.Assign(name=name):
+                self.resolved.append((name.lexeme, node.depth, node.slot))
+            case grammar.This(keyword=keyword) | grammar.Super(keyword=keyword):
+                self.resolved.append((keyword.lexeme, node.depth, node.slot))
+
+        if dataclasses.is_dataclass(node):
+            for field in dataclasses.fields(node):
+                self.collect(getattr(node, field.name))
+        elif isinstance(node, list):
+            for child in node:
+                self.collect(child)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+def test_annotated(arena: bool) -> None:
+    compiled = compile_source(SLOT_SRC, Lox(), arena=arena)
+    assert compiled is not None
+
+    collector = _ResolvedCollector()
+    collector.collect(compiled.statements)
+    assert sorted(collector.resolved) == [
+        ("B", grammar.UNRESOLVED, grammar.UNRESOLVED),
+        ("a", 0, 0),
+        ("a", 0, 0),
+        ("b", 0, 1),
+        ("b", 0, 1),
+        ("c", 0, 2),
+        ("d", 0, 3),
+        ("g", grammar.UNRESOLVED, grammar.UNRESOLVED),
+        ("super", 2, 0),
+        ("this", 1, 0),
+    ]
+
+
+CLOSURE_SRC = dedent(
+    """\
+    fun outer() {
+        var a = "a";
+        var b = "b";
+        fun inner() {
+            b = b + a;
+            return b;
+        }
+        return inner;
+    }
+    var f = outer();
+    f();
+    print f();
+    {
+        var x = 1;
+        class C {
+            init(y) {
+                this.y = y + x;
+            }
+        }
+        var y = 2;
+        print C(y).y;
+    }
+    """
+)
+
+
+def test_run_slots(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run(CLOSURE_SRC)
+
+    assert not lox.had_error
+    assert capsys.readouterr().out.splitlines() == ["baa", "3"]
@@ -0,0 +1,164 @@
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.callable import LoxFunction
+from pylox.environment import Upvalue
+from pylox.lox import Lox
+from pylox.modules import compile_source
+
+CAPTURE_SRC = dedent(
+    """\
+    {
+        var a = 1;
+        var b = 2;
+        fun outer(c) {
+            var unused = 3;
+            fun inner() {
+                return a + c;
+            }
+            fun innermost() {
+                fun f() {
+                    return b;
+                }
+                return f;
+            }
+            return inner;
+        }
+    }
+    """
+)
+
+
+def test_captures() -> None:
+    compiled = compile_source(CAPTURE_SRC, Lox())
+    assert compiled is not None
+
+    (block,) = compiled.statements
+    assert isinstance(block, grammar.Block)
+    outer = block.statements[2]
+    assert isinstance(outer, grammar.Function)
+    _, inner, innermost, _ = outer.body
+    assert isinstance(inner, grammar.Function)
+    assert isinstance(innermost, grammar.Function)
+    f = innermost.body[0]
+    assert isinstance(f, grammar.Function)
+
+    # `a` is local to the enclosing block, `c` to the enclosing function, as seen from where each
+    # function is defined
+    check.equal(outer.upvalues, (1, 0, 0, 1, 0, 1))
+    check.equal(inner.upvalues, (0, 1, 0, 1, 0, 0))
+    # `b` is passed down through the closure of each function in between
+    check.equal(innermost.upvalues, (0, 1, 1))
+    check.equal(f.upvalues, (0, 1, 0))
+
+    (ret,) = inner.body
+    assert isinstance(ret, grammar.Return)
+    assert isinstance(ret.value, grammar.Binary)
+    a, c = ret.value.expr_left, ret.value.expr_right
+    assert isinstance(a, grammar.Variable)
+    assert isinstance(c, grammar.Variable)
+    check.equal((a.depth, a.slot, a.upvalue), (1, 0, True))
+    check.equal((c.depth, c.slot, c.upvalue), (1, 1, True))
+
+
+CLOSURE_SRC = dedent(
+    """\
+    fun make() {
+        var big = "big";
+        var n = 0;
+        {
+            var unused = "unused";
+            fun counter() {
+                n = n + 1;
+                return n;
+            }
+            return counter;
+        }
+    }
+    var counter = make();
+    counter();
+    print counter();
+    """
+)
+
+
+def test_flat_closure(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run(CLOSURE_SRC)
+    assert capsys.readouterr().out.splitlines() == ["2"]
+
+    counter = lox.interpreter.globals.get_at(0, "counter")
+    assert isinstance(counter, LoxFunction)
+
+    # Only the frame declaring `n` is kept alive, rather than the chain of scopes enclosing it
+    (upvalue,) = counter.closure.values
+    assert isinstance(upvalue, Upvalue)
+    check.is_none(counter.closure.enclosing)
+    check.equal(upvalue.values, ["big", 2])
+
+
+RUN_SRC = dedent(
+    """\
+    fun outer() {
+        var a = "a";
+        {
+            var b = "b";
+            fun mid() {
+                fun inner() {
+                    a = a + b;
+                    return a;
+                }
+                return inner;
+            }
+            return mid();
+        }
+    }
+    var f = outer();
+    f();
+    print f();
+    class A {
+        greet() {
+            return "A";
+        }
+    }
+    class B < A {
+        init(x) {
+            this.x = x;
+        }
+        greet() {
+            fun f() {
+                fun g() {
+                    return super.greet() + this.x;
+                }
+                return g;
+            }
+            return f()();
+        }
+    }
+    print B("b").greet();
+    {
+        var k = 1;
+        class C {
+            get() {
+                return k;
+            }
+        }
+        k = 2;
+        print C().get();
+    }
+    """
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+@pytest.mark.parametrize("intern", (False, True))
+def test_run_upvalues(arena: bool, intern: bool, capsys: pytest.CaptureFixture) -> None:
+    lox = Lox(arena=arena, intern=intern)
+    lox.run(RUN_SRC)
+
+    assert not lox.had_error
+    assert not lox.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == ["abb", "Ab", "2"]
@@ -0,0 +1,123 @@
+import pickle
+from textwrap import dedent
+from unittest.mock import Mock
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.arena import Arena, ArenaNode, NO_NODE
+from pylox.ast_printer import AstPrinter
+from pylox.lox import Lox
+from pylox.modules import compile_source
+from pylox.parser import Parser
+from pylox.scanner import tokenize
+
+SAMPLE_SRC = dedent(
+    """\
+    class A < B {
+        init(a, b) {
+            this.a = a;
+            super.init(b);
+        }
+    }
+
+    fun f(x) {
+        if (x > 1) return x * f(x - 1); else return 1;
+    }
+
+    var a = -(1 + 2) * 3;
+    for (var i = 0; i < 3; i = i + 1) {
+        print f(i) or nil;
+    }
+    """
+)
+
+
+def _parse(src: str) -> list[grammar.Stmt]:
+    interpreter = Mock()
+    statements = Parser(tokenize(src, interpreter), interpreter).parse()
+    interpreter.report_error.assert_not_called()
+    return statements or []
+
+
+def _parse_arena(src: str) -> Arena:
+    interpreter = Mock()
+    arena = Parser(tokenize(src, interpreter), interpreter).parse_arena()
+    interpreter.report_error.assert_not_called()
+    return arena
+
+
+def test_round_trip() -> None:
+    statements = _parse(SAMPLE_SRC)
+    arena = Arena.from_grammar(statements)
+
+    # Grammar nodes compare by identity, so compare their reprs instead
+    assert repr(arena.to_grammar()) == repr(statements)
+    assert repr(_parse_arena(SAMPLE_SRC).to_grammar()) == repr(statements)
+
+
+def test_views() -> None:
+    arena = _parse_arena("var a = -(1 + 2) * 3;")
+    (stmt,) = arena.statements
+
+    check.is_instance(stmt, grammar.Var)
+    check.is_instance(stmt, ArenaNode)
+    check.equal(stmt.name.lexeme, "a")
+    check.equal(AstPrinter().dump(stmt.initializer), "(* (- (group (+ 1 2))) 3)")
+
+    # Views of the same node are interchangeable, e.g. as resolver keys
+    check.equal(stmt.initializer, arena.statements[0].initializer)
+    check.equal(hash(stmt.initializer), hash(arena.statements[0].initializer))
+    check.not_equal(stmt.initializer, stmt.initializer.expr_left)
+
+
+def test_missing_child() -> None:
+    arena = _parse_arena("var a;")
+    (stmt,) = arena.statements
+
+    assert stmt.initializer is None
+    assert arena.columns[1][arena.roots[0]] == NO_NODE
+
+
+def test_pickle() -> None:
+    arena = _parse_arena(SAMPLE_SRC)
+    statements = arena.statements
+    unpickled = pickle.loads(pickle.dumps(statements))
+
+    # The views should all share a single copy of the arena
+    assert unpickled[0]._arena is unpickled[-1]._arena
+    assert repr(unpickled[0]._arena.to_grammar()) == repr(arena.to_grammar())
+
+
+def test_deep_tree() -> None:
+    depth = 10_000
+    arena = _parse_arena("print " + "(" * depth + "1" + ")" * depth + ";")
+
+    (stmt,) = arena.to_grammar()
+    for _ in range(depth):
+        stmt = stmt.expr_expression  # type: ignore[attr-defined]
+
+    assert isinstance(stmt.expr_expression, grammar.Literal)  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("arena", (False, True))
+def test_run_arena(arena: bool, capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(arena=arena)
+    interpreter.run(
+        SAMPLE_SRC.replace("class A < B", "class B { init(b) { print b; } }\nclass A < B")
+    )
+
+    assert not interpreter.had_error
+    assert not interpreter.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == ["1", "1", "2"]
+
+
+def test_compiled_arena_copied_out() -> None:
+    # Compiled source is walked by the resolver & interpreter, so it's copied out of the arena
+    compiled = compile_source(SAMPLE_SRC, Lox(), arena=True)
+    plain = compile_source(SAMPLE_SRC, Lox())
+    assert compiled is not None and plain is not None
+
+    check.is_false(any(isinstance(stmt, ArenaNode) for stmt in compiled.statements))
+    check.equal(repr(compiled.statements), repr(plain.statements))
@@ -0,0 +1,134 @@
+import sys
+
+import pytest
+
+from pylox.lox import Lox
+
+# Well beyond what could be handled by recursion without raising the recursion limit
+DEPTH = 20 * sys.getrecursionlimit()
+
+# Each nested statement would take several frames to recurse through
+STATEMENT_DEPTH = 2 * sys.getrecursionlimit()
+
+DEEP_SOURCES = (
+    ("print " + "(" * DEPTH + "1" + ")" * DEPTH + ";", "1"),
+    ("print " + " + ".join(["1"] * DEPTH) + ";", str(DEPTH)),
+    ("print " + " and ".join(["true"] * 50) + ";", "True"),
+    ("var a = true; print " + " and ".join(["a"] * DEPTH) + ";", "True"),
+    ("var a = false; print " + " or ".join(["a"] * DEPTH) + " or 1;", "1"),
+    ("var a = false; print " + " or ".join(["a and 1"] * DEPTH) + " or 2 and 3;", "3"),
+    (
+        "var a = 0;\n"
+        + " else ".join(f"if (a == {idx}) print {idx};" for idx in range(1, DEPTH))
+        + " else print a;",
+        "0",
+    ),
+)
+
+
+@pytest.mark.parametrize(("src", "truth_out"), DEEP_SOURCES)
+def test_deep_nesting(src: str, truth_out: str, capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(src, tree_shake=True)  # Tree shaking also walks the entire tree
+
+    assert not interpreter.had_error
+    assert not interpreter.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == [truth_out]
+
+
+DEEP_COMPILE_SOURCES = (
+    "-" * DEPTH + "1;",
+    "f" + "(f" * DEPTH + ")" * DEPTH + ";",
+    "var a; " + "a = " * DEPTH + "1;",
+    "var a; a" + ".b" * DEPTH + " = 1;",
+    "fun f() { return " + "(" * DEPTH + "this" + ")" * DEPTH + "; }",
+)
+
+
+@pytest.mark.parametrize("src", DEEP_COMPILE_SOURCES)
+def test_deep_expression_compiles(src: str, capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(f"if (false) {{ {src} }}")
+
+    # The only error is for the use of "this" outside of a class, which requires resolving the
+    # entire expression to find
+    if "this" in src:
+        assert interpreter.had_error
+        assert "Can't use 'this' outside of a class." in capsys.readouterr().out
+    else:
+        assert not interpreter.had_error
+        assert not capsys.readouterr().out
+
+
+DEEP_STATEMENT_SOURCES = (
+    "for (var i = 0; i < 1; i = i + 1) {" * STATEMENT_DEPTH + "print i;" + "}" * STATEMENT_DEPTH,
+    "while (true) " * STATEMENT_DEPTH + "break;",
+    "{" * STATEMENT_DEPTH + "var a = 1;" + "}" * STATEMENT_DEPTH,
+    "if (true) {" * STATEMENT_DEPTH + "print 1;" + "}" * STATEMENT_DEPTH,
+    "fun f() {" * STATEMENT_DEPTH + "return 1;" + "}" * STATEMENT_DEPTH,
+    "class A { m() {" * STATEMENT_DEPTH + "}}" * STATEMENT_DEPTH,
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+@pytest.mark.parametrize("src", DEEP_STATEMENT_SOURCES)
+def test_deep_statements_compile(src: str, arena: bool, capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(arena=arena, optimize=True, intern=True)
+    interpreter.run(f"if (false) {{ {src} }}")
+
+    assert not interpreter.had_error
+    assert not capsys.readouterr().out
+
+
+def _nested_loops(depth: int, body: str) -> str:
+    return "for (var i = 0; i < 1; i = i + 1) {" * depth + body + "}" * depth
+
+
+def test_nested_loops(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox()
+    interpreter.run(_nested_loops(60, "print i;"))
+
+    assert not interpreter.had_error
+    assert not interpreter.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == ["0"]
+
+
+def test_deep_statement_error(capsys: pytest.CaptureFixture) -> None:
+    # The error is reported once, & the blocks enclosing it are parsed as usual
+    interpreter = Lox()
+    interpreter.run("if (false) {" + _nested_loops(200, "print ;") + "}")
+
+    assert interpreter.had_error
+    col = len("if (false) {") + 200 * len("for (var i = 0; i < 1; i = i + 1) {") + len("print ;")
+    assert capsys.readouterr().out.splitlines() == [f"1:{col}: LoxParseError: Expected expression."]
+
+
+# Expressions are parsed iteratively, but evaluated recursively
+DEEP_RUNTIME_SOURCES = (
+    ("print " + "-(" * STATEMENT_DEPTH + "1" + ")" * STATEMENT_DEPTH + ";", "1:7"),
+    (
+        "fun f(a) { return a; }\nprint "
+        + "f(" * STATEMENT_DEPTH
+        + "1"
+        + ")" * STATEMENT_DEPTH
+        + ";",
+        "2:7",
+    ),
+    ("var a = " + "(1 + " * STATEMENT_DEPTH + "1" + ")" * STATEMENT_DEPTH + ";", "1:5"),
+    ("print 1;\n" + _nested_loops(STATEMENT_DEPTH, "print i;"), "2:10"),
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+@pytest.mark.parametrize(("src", "location"), DEEP_RUNTIME_SOURCES)
+def test_deep_runtime_error(
+    src: str, location: str, arena: bool, capsys: pytest.CaptureFixture
+) -> None:
+    # Constant folding would evaluate some of these expressions at compile time instead
+    interpreter = Lox(arena=arena, optimize=False)
+    interpreter.run(src)
+
+    assert interpreter.had_error
+    assert interpreter.had_runtime_error
+    all_out = capsys.readouterr().out.splitlines()
+    assert all_out[-1] == f"{location}: LoxRuntimeError: Maximum recursion depth exceeded."
@@ -0,0 +1,135 @@
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.lox import Lox
+from pylox.modules import compile_source
+
+INTERN_SRC = dedent(
+    """\
+    var g = 1;
+    fun f(a, b) {
+        print a == nil or b == nil;
+        print a == nil or b == nil;
+        print 1;
+        print 1.0;
+        print -0.0;
+        print 0.0;
+        print g;
+        print g;
+        print a.b;
+        print a.b;
+        {
+            var b = 2;
+            print b == nil;
+            print a == nil;
+        }
+    }
+    """
+)
+
+
+def _prints(src: str) -> list[grammar.Expr]:
+    lox = Lox()
+    compiled = compile_source(src, lox, intern=True)
+    assert compiled is not None
+
+    _, function = compiled.statements
+    assert isinstance(function, grammar.Function)
+
+    *prints, block = function.body
+    assert isinstance(block, grammar.Block)
+
+    _, *block_prints = block.statements
+    return [stmt.expr_expression for stmt in [*prints, *block_prints]]  # type: ignore[attr-defined]
+
+
+def test_intern() -> None:
+    (
+        logical,
+        logical_copy,
+        integer,
+        float_,
+        negative_zero,
+        zero,
+        global_,
+        global_copy,
+        get,
+        get_copy,
+        shadowed,
+        enclosed,
+    ) = _prints(INTERN_SRC)
+
+    check.is_(logical, logical_copy)
+
+    # Literals are only shared if they would print the same
+    check.is_not(integer, float_)
+    check.is_not(negative_zero, zero)
+
+    # Expressions that may raise are never shared, so errors are located correctly
+    check.is_not(global_, global_copy)
+    check.is_not(get, get_copy)
+
+    # Locals are looked up by their resolved depth & slot, so the shadowing `b` isn't the same
+    # expression as the parameter; the block's variables are stored in the function's frame, so the
+    # parameter `a` is accessed the same way inside the block
+    check.is_not(logical.expr_right, shadowed)  # type: ignore[attr-defined]
+    check.is_(logical.expr_left, enclosed)  # type: ignore[attr-defined]
+    check.is_(logical.expr_right.expr_right, shadowed.expr_right)  # type: ignore[attr-defined]
+    check.is_(logical.expr_left.expr_left, get.object_)  # type: ignore[attr-defined]
+
+
+def test_intern_drops_duplicate_locals() -> None:
+    lox = Lox()
+    plain = compile_source(INTERN_SRC, lox)
+    interned = compile_source(INTERN_SRC, lox, intern=True)
+    assert plain is not None
+    assert interned is not None
+
+    # One `a` & one of each `b` are left, out of 5 uses of `a` & 3 of `b`
+    assert len(plain.locals) == 8
+    assert len(interned.locals) == 3
+
+
+RUN_SRC = dedent(
+    """\
+    class Point {
+        init(x, y) {
+            this.x = x;
+            this.y = y;
+        }
+
+        same(other) {
+            return this.x == other.x and this.y == other.y;
+        }
+    }
+
+    fun check(a, b) {
+        print a.same(b) == true;
+        print a.same(b) == true;
+        print !(a == b);
+    }
+
+    check(Point(1, 2), Point(1, 2));
+    check(Point(1, 2), Point(2, 1));
+    check(nil, nil);
+    """
+)
+
+
+@pytest.mark.parametrize("intern", (False, True))
+def test_run_interned(intern: bool, capsys: pytest.CaptureFixture) -> None:
+    lox = Lox(intern=intern)
+    lox.run(RUN_SRC)
+
+    assert capsys.readouterr().out.splitlines() == [
+        "True",
+        "True",
+        "False",
+        "False",
+        "False",
+        "True",
+        "13:13: LoxRuntimeError: Only instances have properties.",
+    ]
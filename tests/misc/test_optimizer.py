@@ -0,0 +1,225 @@
+import math
+from textwrap import dedent
+
+import pytest
+import pytest_check as check
+
+from pylox import grammar
+from pylox.ast_printer import AstPrinter
+from pylox.lox import Lox
+from pylox.modules import compile_source
+
+
+def _compile(src: str, arena: bool = False) -> list[grammar.Stmt]:
+    lox = Lox()
+    compiled = compile_source(src, lox, arena=arena, optimize=True)
+    assert not lox.had_error
+    assert compiled is not None
+    return compiled.statements
+
+
+FOLD_CASES = (
+    ("60 * 60 * 24", "86400"),
+    ("-1", "-1"),
+    ("--(1)", "1"),
+    ('"a" + "b" + "c"', "abc"),
+    ("!true", "False"),
+    ("!nil", "True"),
+    ("1 / 2", "0.5"),
+    ("7 \\ 2", "3"),
+    ("7 % 4", "3"),
+    ("2 ^ 10", "1024"),
+    ("1 < 2 == true", "True"),
+    ('"1" == 1', "False"),
+    ("(((a)))", "a"),
+    ("(a + (1 + 2)) * (3)", "(* (+ a 3) 3)"),
+    ("true and a", "a"),
+    ("false and a", "False"),
+    ("nil or a", "a"),
+    ("1 or a", "1"),
+    ("a or 1 + 2", "(or a 3)"),
+    ("f(1 + 2, (a)).b", "f(3, a).b"),
+    # Operations that raise a runtime error aren't folded
+    ('1 + "a"', "(+ 1 a)"),
+    ("1 + true", "(+ 1 True)"),
+    ('-"a"', "(- a)"),
+    ("1 < nil", "(< 1 None)"),
+)
+
+
+class _CallPrinter(AstPrinter):
+    """AstPrinter with (minimal) support for the expressions it doesn't print."""
+
+    def visit_Call(self, expr: grammar.Call) -> str:
+        args = ", ".join(arg.accept(self) for arg in expr.arguments)
+        return f"{expr.callee.accept(self)}({args})"
+
+    def visit_Get(self, expr: grammar.Get) -> str:
+        return f"{expr.object_.accept(self)}.{expr.name.lexeme}"
+
+    def visit_Logical(self, expr: grammar.Logical) -> str:
+        return self._parenthesize(expr.token_operator.lexeme, expr.expr_left, expr.expr_right)
+
+    def visit_Variable(self, expr: grammar.Variable) -> str:
+        return expr.name.lexeme
+
+
+@pytest.mark.parametrize("arena", (False, True))
+@pytest.mark.parametrize(("src", "truth_dump"), FOLD_CASES)
+def test_fold(src: str, truth_dump: str, arena: bool) -> None:
+    (stmt,) = _compile(f"var a; fun f(a, b) {{}} {src};", arena=arena)[2:]
+    assert isinstance(stmt, grammar.Expression)
+    assert _CallPrinter().dump(stmt.expr_expression) == truth_dump
+
+
+@pytest.mark.parametrize("src", ("0 / 0", "1 \\ 0", "-1 / 0 * 0"))
+def test_fold_divide_by_zero(src: str) -> None:
+    (stmt,) = _compile(f"{src};")
+    assert isinstance(stmt, grammar.Expression)
+    assert isinstance(stmt.expr_expression, grammar.Literal)
+    assert math.isnan(stmt.expr_expression.object_value)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("src", ("2 ^ 1000000000", "((2 ^ 256) ^ 256) ^ 256", "1 ^ 1000000000"))
+def test_huge_power_not_folded(src: str) -> None:
+    (stmt,) = _compile(f"{src};")
+    assert isinstance(stmt, grammar.Expression)
+    assert isinstance(stmt.expr_expression, grammar.Binary)
+
+
+def test_large_power_folded() -> None:
+    (stmt,) = _compile("(2 ^ 16) ^ 256;")
+    assert isinstance(stmt, grammar.Expression)
+    assert isinstance(stmt.expr_expression, grammar.Literal)
+    assert stmt.expr_expression.object_value == 2**4096
+
+
+PRUNE_SRC = dedent(
+    """\
+    var a = 1;
+    if (false) print "no";
+    if (1 > 2) print "no"; else print "else";
+    if (a) print "maybe"; else if (true) print "elif"; else print "no";
+    if (a) print "maybe"; else if (false) print "no";
+    while (false) print "no";
+    for (var i = 0; nil; i = i + 1) print "no";
+    while (a) if (false) a = 0; else a = nil;
+    """
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+def test_prune(arena: bool) -> None:
+    statements = _compile(PRUNE_SRC, arena=arena)
+    var, else_branch, elif_chain, if_stmt, for_loop, while_loop = statements
+
+    check.is_instance(var, grammar.Var)
+    check.is_instance(else_branch, grammar.Print)
+
+    assert isinstance(elif_chain, grammar.If)
+    check.is_instance(elif_chain.else_branch, grammar.Print)
+
+    assert isinstance(if_stmt, grammar.If)
+    check.is_none(if_stmt.else_branch)
+
+    assert isinstance(for_loop, grammar.Block)
+    (initializer,) = for_loop.statements
+    check.is_instance(initializer, grammar.Var)
+
+    assert isinstance(while_loop, grammar.While)
+    check.is_instance(while_loop.body, grammar.Expression)
+
+
+def test_dead_code_errors_reported(capsys: pytest.CaptureFixture) -> None:
+    # Static errors are still reported for branches that are pruned
+    lox = Lox(optimize=True)
+    lox.run("if (false) return 1;")
+
+    assert lox.had_error
+    assert "Can't return from top-level code." in capsys.readouterr().out
+
+
+RUN_SRC = dedent(
+    """\
+    var seconds = 60 * 60 * 24;
+    var total = 0;
+    for (var i = 0; i < 3; i = i + 1) {
+        total = total + seconds * (1 + 1);
+        if (false or i == 1) print "one";
+    }
+    print total;
+    print "a" + "b";
+    print 0 / 0;
+    fun f(x) {
+        if (!true) return -1;
+        return x ^ 2;
+    }
+    print f(3);
+    print 1 + "a";
+    """
+)
+
+
+@pytest.mark.parametrize("optimize", (False, True))
+def test_run_optimized(optimize: bool, capsys: pytest.CaptureFixture) -> None:
+    lox = Lox(optimize=optimize)
+    lox.run(RUN_SRC)
+
+    assert lox.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == [
+        "one",
+        "518400",
+        "ab",
+        "nan",
+        "9",
+        "15:9: LoxRuntimeError: Operands must either be both numbers or both strings.",
+    ]
+
+
+STRENGTH_CASES = (
+    ("a ^ 2", True),
+    ("a ^ -1", True),
+    ("a ^ 0.5", False),
+    ("a \\ 3", True),
+    ("a \\ 0", False),
+    ("a % 2.5", True),
+    ("a % (1 - 1)", False),
+    ("a % true", False),
+    ("a % b", False),
+    ("a * 2", False),
+)
+
+
+@pytest.mark.parametrize("arena", (False, True))
+@pytest.mark.parametrize(("src", "truth_specialized"), STRENGTH_CASES)
+def test_reduce_strength(src: str, truth_specialized: bool, arena: bool) -> None:
+    (stmt,) = _compile(f"var a; var b; {src};", arena=arena)[2:]
+    assert isinstance(stmt, grammar.Expression)
+    assert isinstance(stmt.expr_expression, grammar.Binary)
+    assert stmt.expr_expression.specialized == truth_specialized
+
+
+STRENGTH_RUN_CASES = (
+    ("3 ^ 2", "9"),
+    ("1.5 ^ 2", "2.25"),
+    ("2 ^ -1", "0.5"),
+    ("7 \\ 2", "3"),
+    ("-7.5 \\ 2", "-4.0"),
+    ("7 % 3", "1"),
+    ("-7 % 3", "2"),
+    ('"a" ^ 2', "1:22: LoxRuntimeError: Operands must be numbers."),
+    ('"a" \\ 2', "1:22: LoxRuntimeError: Operands must be numbers."),
+    ("true % 2", "1:23: LoxRuntimeError: Operands must be numbers."),
+)
+
+
+@pytest.mark.parametrize("optimize", (False, True))
+@pytest.mark.parametrize(("src", "truth_out"), STRENGTH_RUN_CASES)
+def test_run_reduced_strength(
+    src: str, truth_out: str, optimize: bool, capsys: pytest.CaptureFixture
+) -> None:
+    left, operator, right = src.split()
+    lox = Lox(optimize=optimize)
+    lox.run(f"var a = {left}; print a {operator} {right};")
+
+    assert capsys.readouterr().out.splitlines() == [truth_out]
@@ -0,0 +1,102 @@
+import pytest
+
+from pylox.interpreter import Interpreter
+from pylox.lox import Lox
+from pylox.scanner import RegexScanner
+from pylox.session import Session, split_declarations
+
+SPLIT_SRC = (
+    "var a = 1; fun f(x) { return x; } if (a) { print a; } else print 1; for (;;) {} print a"
+)
+
+
+def test_split_declarations() -> None:
+    stream = RegexScanner(SPLIT_SRC, Lox()).scan_token_stream()
+    declarations = [
+        stream.src[stream.starts[start] : stream.ends[end - 1]]
+        for start, end in split_declarations(stream)
+    ]
+
+    assert declarations == [
+        "var a = 1;",
+        "fun f(x) { return x; }",
+        "if (a) { print a; } else print 1;",
+        "for (;;) {}",
+        "print a",  # Unterminated, left for the parser to report
+    ]
+
+
+def test_reuse_declarations(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    cell = "fun f(x) { return x * 2; }\nprint f(2);"
+    lox.run_cell(cell)
+    lox.run_cell(cell)
+    lox.run_cell(cell.replace("2;", "3;"))
+
+    assert lox.session.n_compiled == 3
+    assert lox.session.n_reused == 3
+    assert capsys.readouterr().out.splitlines() == ["4", "4", "6"]
+
+
+def test_cells_compiled_without_interpreter(
+    capsys: pytest.CaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Only the session's own interpreter is needed, declarations resolve into a `ResolveTable`
+    lox = Lox()
+    monkeypatch.setattr(Interpreter, "__init__", None)
+    lox.run_cell("fun f(x) { var y = x; return y * 2; }\nprint f(2);")
+
+    assert lox.session.n_compiled == 2
+    assert capsys.readouterr().out.splitlines() == ["4"]
+
+
+def test_declaration_location() -> None:
+    # Reused declarations must also start at the same location
+    lox = Lox()
+    lox.run_cell("var a = 1;")
+    lox.run_cell(" var a = 1;")
+    lox.run_cell("var a = 1;\nvar a = 1;")
+
+    assert lox.session.n_compiled == 3
+    assert lox.session.n_reused == 1
+
+
+def test_globals_persist(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run_cell("var total = 0; fun add(x) { total = total + x; }")
+    lox.run_cell("add(1); add(2);")
+    lox.run_cell("print total;")
+
+    assert capsys.readouterr().out.splitlines() == ["3"]
+
+
+def test_cell_errors(capsys: pytest.CaptureFixture) -> None:
+    lox = Lox()
+    lox.run_cell("var a = 1; print a +; { return 1; } print a;")
+
+    # Every declaration is compiled so all errors are reported, but nothing is run
+    assert lox.had_error
+    assert capsys.readouterr().out.splitlines() == [
+        "1:21: LoxParseError: Expected expression.",
+        "1:25: LoxResolverError: Can't return from top-level code.",
+    ]
+
+    lox.run_cell('fun f() {\n  return nil + 1;\n}\nprint "ok";')
+    assert not lox.had_error
+    assert capsys.readouterr().out.splitlines() == ["ok"]
+
+    lox.run_cell("fun f() {\n  return nil + 1;\n}\nf();")
+    assert lox.had_runtime_error
+    assert capsys.readouterr().out.splitlines() == [
+        "2:14: LoxRuntimeError: Operands must either be both numbers or both strings."
+    ]
+
+
+def test_max_declarations() -> None:
+    session = Session(Lox(), max_declarations=2)
+    session.compile("var a; var b;")
+    session.compile("var a; var c;")
+
+    assert len(session) == 2
+    session.compile("var a; var b;")
+    assert (session.n_compiled, session.n_reused) == (4, 2)
@@ -0,0 +1,53 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pylox import grammar
+from pylox.parser import DECLARATION_PARSELETS, Parser, STATEMENT_PARSELETS
+from pylox.scanner import tokenize
+from pylox.tokens import TokenType
+
+
+def _parse(src: str) -> tuple[list, list[str]]:
+    interpreter = Mock()
+    statements = Parser(tokenize(src, interpreter), interpreter).parse()
+    messages = [call.args[0].message for call in interpreter.report_error.call_args_list]
+    return statements or [], messages
+
+
+DISPATCH_CASES = (
+    ("class A {}", grammar.Class),
+    ("fun f() {}", grammar.Function),
+    ("var a = 1;", grammar.Var),
+    ("for (;;) {}", grammar.While),
+    ("if (a) b;", grammar.If),
+    ("print a;", grammar.Print),
+    ("while (a) b;", grammar.While),
+    ("{ a; }", grammar.Block),
+    ("a;", grammar.Expression),
+    ("(a);", grammar.Expression),
+)
+
+
+@pytest.mark.parametrize(("src", "truth_node"), DISPATCH_CASES)
+def test_dispatch(src: str, truth_node: type) -> None:
+    (statement,), messages = _parse(src)
+    assert not messages
+    assert type(statement) is truth_node
+
+
+def test_declarations_include_statements() -> None:
+    assert STATEMENT_PARSELETS.items() <= DECLARATION_PARSELETS.items()
+    assert TokenType.VAR not in STATEMENT_PARSELETS
+
+
+def test_synchronize_after_error() -> None:
+    # Each bad statement is reported & parsing resumes at the next statement keyword
+    statements, messages = _parse("var = 1 print a; fun (){} class A {} 1 + ; print b;")
+    assert messages == [
+        "Expected variable name.",
+        "Expected function name.",
+        "Expected expression.",
+    ]
+    parsed = [type(statement) for statement in statements if statement is not None]
+    assert parsed == [grammar.Print, grammar.Class, grammar.Print]
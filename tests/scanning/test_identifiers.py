@@ -5,7 +5,7 @@ import pytest_check as check
 
 from pylox.lox import Lox
 from pylox.scanner import Scanner
-from pylox.tokens import Token, TokenType
+from pylox.tokens import TokenType
 
 # Base test cases from https://github.com/munificent/craftinginterpreters/blob/master/test/scanning/identifiers.lox
 TEST_SRC = dedent(
@@ -15,7 +15,7 @@ TEST_SRC = dedent(
     """
 )
 
-PARTIAL_TOKEN = partial(Token, lineno=0, end_lineno=0)
+PARTIAL_TOKEN = partial(dict, literal=None, lineno=0, end_lineno=0)
 
 TRUTH_TOKENS = [
     PARTIAL_TOKEN(token_type=TokenType.IDENTIFIER, lexeme="andy", col_offset=0, end_col_offset=4),
@@ -54,4 +54,6 @@ def test_identifier_scanning() -> None:
     tokens = scanner.scan_tokens()
 
     for idx, token in enumerate(tokens):
-        check.equal(token, TRUTH_TOKENS[idx])
+        # Only the attributes listed for each truth token are compared
+        truth = TRUTH_TOKENS[idx]
+        check.equal({attr: getattr(token, attr) for attr in truth}, truth)
@@ -0,0 +1,44 @@
+import pytest
+
+from pylox.locations import LineIndex
+from pylox.lox import Lox
+from pylox.scanner import RegexScanner, Scanner
+
+SRC = "ab\ncd\n\nefg"
+
+LOCATION_TEST_CASES = (
+    (0, (0, 0)),
+    (1, (0, 1)),
+    (2, (0, 2)),  # The newline character belongs to the line it terminates
+    (3, (1, 0)),
+    (6, (2, 0)),
+    (7, (3, 0)),
+    (10, (3, 3)),  # EOF
+)
+
+
+@pytest.mark.parametrize(("offset", "truth_location"), LOCATION_TEST_CASES)
+def test_line_index_location(offset: int, truth_location: tuple[int, int]) -> None:
+    line_index = LineIndex(SRC)
+    assert len(line_index) == 4
+    assert line_index.location(offset) == truth_location
+    assert line_index.lineno(offset) == truth_location[0]
+
+
+AFTER_MULTILINE_SRC = '"multi\nline" after /* block\ncomment */ end'
+
+
+@pytest.mark.parametrize("scanner_cls", (Scanner, RegexScanner))
+def test_columns_after_multiline_lexemes(scanner_cls: type[Scanner]) -> None:
+    tokens = scanner_cls(AFTER_MULTILINE_SRC, Lox()).scan_tokens()
+
+    string, after, end, eof = tokens
+    assert (string.lineno, string.col_offset, string.end_lineno, string.end_col_offset) == (
+        0,
+        0,
+        1,
+        5,
+    )
+    assert (after.lineno, after.col_offset, after.end_col_offset) == (1, 6, 11)
+    assert (end.lineno, end.col_offset, end.end_col_offset) == (2, 11, 14)
+    assert (eof.lineno, eof.col_offset) == (2, 14)
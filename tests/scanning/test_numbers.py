@@ -4,7 +4,7 @@ import pytest_check as check
 
 from pylox.lox import Lox
 from pylox.scanner import Scanner
-from pylox.tokens import Token, TokenType
+from pylox.tokens import TokenType
 
 # Base test cases from https://github.com/munificent/craftinginterpreters/blob/master/test/scanning/numbers.lox
 TEST_SRC = dedent(
@@ -17,13 +17,13 @@ TEST_SRC = dedent(
 )
 
 TRUTH_TOKENS = [
-    Token(token_type=TokenType.NUMBER, lexeme="123", literal=123, lineno=0, col_offset=0),
-    Token(token_type=TokenType.NUMBER, lexeme="123.456", literal=123.456, lineno=1, col_offset=0),
-    Token(token_type=TokenType.DOT, lexeme=".", literal=None, lineno=2, col_offset=0),
-    Token(token_type=TokenType.NUMBER, lexeme="456", literal=456, lineno=2, col_offset=1),
-    Token(token_type=TokenType.NUMBER, lexeme="123", literal=123, lineno=3, col_offset=0),
-    Token(token_type=TokenType.DOT, lexeme=".", literal=None, lineno=3, col_offset=3),
-    Token(token_type=TokenType.EOF, lexeme="", literal=None, lineno=4, col_offset=0),
+    dict(token_type=TokenType.NUMBER, lexeme="123", literal=123, lineno=0, col_offset=0),
+    dict(token_type=TokenType.NUMBER, lexeme="123.456", literal=123.456, lineno=1, col_offset=0),
+    dict(token_type=TokenType.DOT, lexeme=".", literal=None, lineno=2, col_offset=0),
+    dict(token_type=TokenType.NUMBER, lexeme="456", literal=456, lineno=2, col_offset=1),
+    dict(token_type=TokenType.NUMBER, lexeme="123", literal=123, lineno=3, col_offset=0),
+    dict(token_type=TokenType.DOT, lexeme=".", literal=None, lineno=3, col_offset=3),
+    dict(token_type=TokenType.EOF, lexeme="", literal=None, lineno=4, col_offset=0),
 ]
 
 
@@ -36,6 +36,6 @@ def test_number_scanning() -> None:
         truth = TRUTH_TOKENS[idx]
         check.equal(
             (token.token_type, token.lexeme, token.lineno, token.col_offset),
-            (truth.token_type, truth.lexeme, truth.lineno, truth.col_offset),
+            (truth["token_type"], truth["lexeme"], truth["lineno"], truth["col_offset"]),
         )
-        check.almost_equal(token.literal, truth.literal)
+        check.almost_equal(token.literal, truth["literal"])
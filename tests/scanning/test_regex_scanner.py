@@ -0,0 +1,74 @@
+from textwrap import dedent
+from unittest.mock import Mock
+
+import pytest
+
+from pylox.lox import Lox
+from pylox.scanner import RegexScanner, Scanner, ScannerEngine
+from pylox.tokens import Token
+
+
+def _scan(scanner_cls: type[Scanner], src: str) -> tuple[list[Token], list]:
+    interpreter = Mock()
+    tokens = scanner_cls(src, interpreter).scan_tokens()
+    return tokens, interpreter.report_error.call_args_list
+
+
+PARITY_CASES = (
+    "",
+    "andy formless fo _ _123 _abc ab123",
+    "and class else false for fun if nil or print return super this true var while break continue",
+    "123\n123.456\n.456\n123.",
+    "(){};,+-*!===<=>=!=<>/.^%\\",
+    "space    tabs\t\t\t\tnewline\r\n\n\n\nend",
+    '""\n"string"\n\'string\'\n"multi-\nline-\nstring" after',
+    "print 'a\\tb\\n';",
+    "a // line comment\nb",
+    "a /* block */ b",
+    "/* nested /* block */ comment */ c",
+    "/* multi\nline */ d\ne",
+    "/**/x",
+    "x/*/y*/z",
+    "include <hello_world>",
+    "& @ #",
+    '"unterminated\nstring',
+    "/* unterminated\nblock comment",
+    'print "A~¶Þॐஃ";',
+    "x² ² ١٢",
+)
+
+
+@pytest.mark.parametrize("src", PARITY_CASES)
+def test_regex_scanner_parity(src: str) -> None:
+    assert _scan(RegexScanner, src) == _scan(Scanner, src)
+
+
+TEST_SRC = dedent(
+    """\
+    class Foo < Bar {
+      init(a, b) {
+        this.a = a ^ 2;
+        this.b = b \\ 3;
+      }
+    }
+
+    /* A block comment
+       spanning /* nested */ lines */
+    fun baz(x) { return x % 2 == 0 and x >= 10 or !x; } // trailing
+    var s = "multi
+    line";
+    print baz(12.5) + s;
+    """
+)
+
+
+def test_regex_scanner_program_parity() -> None:
+    assert _scan(RegexScanner, TEST_SRC) == _scan(Scanner, TEST_SRC)
+
+
+def test_regex_scanner_engine_selection(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(scanner_engine=ScannerEngine.REGEX)
+    interpreter.run('print "ok"; /* comment */ print 1 + 2;')
+
+    assert not interpreter.had_error
+    assert capsys.readouterr().out.splitlines() == ["ok", "3"]
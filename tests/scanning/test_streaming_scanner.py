@@ -0,0 +1,66 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pylox import grammar
+from pylox.lox import Lox
+from pylox.parser import Parser
+from pylox.scanner import RegexScanner, ScannerEngine
+
+TEST_SRC = 'var a = 1;\nvar b = "two";\nprint a;\n'
+
+
+LAZY_SRC = "var a = 1;\n&"
+
+
+def test_iter_tokens_is_lazy() -> None:
+    interpreter = Mock()
+    scanner = RegexScanner(LAZY_SRC, interpreter)
+    token_iter = scanner.iter_tokens()
+
+    assert next(token_iter).lexeme == "var"
+    # Nothing is stored internal to the scanner & the remaining source hasn't been scanned yet
+    assert scanner.tokens == []
+    interpreter.report_error.assert_not_called()
+
+    assert [token.lexeme for token in token_iter][-2:] == [";", ""]
+    interpreter.report_error.assert_called_once()
+
+
+def test_iter_tokens_parity() -> None:
+    assert (
+        list(RegexScanner(TEST_SRC, Mock()).iter_tokens())
+        == RegexScanner(TEST_SRC, Mock()).scan_tokens()
+    )
+
+
+def test_parser_pulls_tokens_on_demand() -> None:
+    interpreter = Mock()
+    parser = Parser(RegexScanner(LAZY_SRC, interpreter).iter_tokens(), interpreter)
+
+    # Only the first token has been pulled into the parser's lookahead buffer
+    interpreter.report_error.assert_not_called()
+
+    statements = parser.parse()
+    assert statements is not None
+    assert [type(stmt) for stmt in statements] == [grammar.Var]
+    interpreter.report_error.assert_called_once()
+
+
+SYNC_SRC = "var = 1;\nprint 2;\n"
+
+
+def test_streaming_synchronize(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(scanner_engine=ScannerEngine.STREAMING)
+    interpreter.run(SYNC_SRC)
+
+    assert interpreter.had_error
+    assert capsys.readouterr().out.splitlines() == ["1:5: LoxParseError: Expected variable name."]
+
+
+def test_streaming_engine(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(scanner_engine=ScannerEngine.STREAMING)
+    interpreter.run(TEST_SRC)
+
+    assert not interpreter.had_error
+    assert capsys.readouterr().out.splitlines() == ["1"]
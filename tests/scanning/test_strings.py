@@ -4,7 +4,7 @@ import pytest_check as check
 
 from pylox.lox import Lox
 from pylox.scanner import Scanner
-from pylox.tokens import Token, TokenType
+from pylox.tokens import TokenType
 
 # Base test cases from https://github.com/munificent/craftinginterpreters/blob/master/test/scanning/strings.lox
 TEST_SRC = dedent(
@@ -19,7 +19,7 @@ TEST_SRC = dedent(
 )
 
 TRUTH_TOKENS = [
-    Token(
+    dict(
         token_type=TokenType.STRING,
         lexeme='""',
         literal="",
@@ -28,7 +28,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=2,
     ),
-    Token(
+    dict(
         token_type=TokenType.STRING,
         lexeme='"string"',
         literal="string",
@@ -37,7 +37,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=8,
     ),
-    Token(
+    dict(
         token_type=TokenType.STRING,
         lexeme="'string'",
         literal="string",
@@ -46,7 +46,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=8,
     ),
-    Token(
+    dict(
         token_type=TokenType.STRING,
         lexeme='"multi-\nline-\nstring"',
         literal="multi-\nline-\nstring",
@@ -55,7 +55,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=7,
     ),
-    Token(
+    dict(
         token_type=TokenType.EOF,
         lexeme="",
         literal=None,
@@ -72,4 +72,6 @@ def test_string_scanning() -> None:
     tokens = scanner.scan_tokens()
 
     for idx, token in enumerate(tokens):
-        check.equal(token, TRUTH_TOKENS[idx])
+        # Only the attributes listed for each truth token are compared
+        truth = TRUTH_TOKENS[idx]
+        check.equal({attr: getattr(token, attr) for attr in truth}, truth)
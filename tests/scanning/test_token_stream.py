@@ -0,0 +1,68 @@
+from textwrap import dedent
+from unittest.mock import Mock
+
+import pytest
+
+from pylox import grammar
+from pylox.ast_printer import AstPrinter
+from pylox.lox import Lox
+from pylox.parser import Parser
+from pylox.scanner import RegexScanner, ScannerEngine
+from pylox.tokens import TokenStream, TokenType
+
+TEST_SRC = dedent(
+    """\
+    var a = 1.5 * (2 + 3);
+    var b = "multi
+    line" + 'string';
+    /* comment */ print a >= 2 and !b;
+    """
+)
+
+
+def test_token_stream_views() -> None:
+    stream = RegexScanner(TEST_SRC, Mock()).scan_token_stream()
+    tokens = RegexScanner(TEST_SRC, Mock()).scan_tokens()
+
+    assert isinstance(stream, TokenStream)
+    assert len(stream) == len(tokens)
+    assert list(stream) == tokens
+    assert stream[-1] == tokens[-1]
+    assert stream[2:5] == tokens[2:5]
+    assert stream.token_type(0) == TokenType.VAR
+
+
+@pytest.mark.parametrize("offset", (0, 1))
+def test_token_stream_index_out_of_range(offset: int) -> None:
+    stream = RegexScanner(TEST_SRC, Mock()).scan_token_stream()
+
+    with pytest.raises(IndexError):
+        stream[len(stream) + offset]
+
+    with pytest.raises(IndexError):
+        stream[-len(stream) - 1 - offset]
+
+
+def test_token_stream_sparse_literals() -> None:
+    stream = RegexScanner(TEST_SRC, Mock()).scan_token_stream()
+
+    literal_types = {TokenType.NUMBER, TokenType.STRING}
+    n_literals = sum(token.token_type in literal_types for token in stream)
+    assert len(stream.literals) == n_literals
+
+
+def test_parser_consumes_token_stream() -> None:
+    stream = RegexScanner("print (1 + 2) * -3;", Mock()).scan_token_stream()
+    statements = Parser(stream, Mock()).parse()
+
+    assert statements is not None
+    assert isinstance(statements[0], grammar.Print)
+    assert AstPrinter().dump(statements[0].expr_expression) == "(* (group (+ 1 2)) (- 3))"
+
+
+def test_columnar_engine(capsys: pytest.CaptureFixture) -> None:
+    interpreter = Lox(scanner_engine=ScannerEngine.COLUMNAR)
+    interpreter.run(TEST_SRC)
+
+    assert not interpreter.had_error
+    assert capsys.readouterr().out.splitlines() == ["False"]
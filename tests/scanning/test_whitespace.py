@@ -4,7 +4,7 @@ import pytest_check as check
 
 from pylox.lox import Lox
 from pylox.scanner import Scanner
-from pylox.tokens import Token, TokenType
+from pylox.tokens import TokenType
 
 # Base test cases from https://github.com/munificent/craftinginterpreters/blob/master/test/scanning/whitespace.lox
 TEST_SRC = dedent(
@@ -19,7 +19,7 @@ TEST_SRC = dedent(
 )
 
 TRUTH_TOKENS = [
-    Token(
+    dict(
         token_type=TokenType.IDENTIFIER,
         lexeme="space",
         lineno=0,
@@ -27,7 +27,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=5,
     ),
-    Token(
+    dict(
         token_type=TokenType.IDENTIFIER,
         lexeme="tabs",
         lineno=0,
@@ -35,7 +35,7 @@ TRUTH_TOKENS = [
         col_offset=9,
         end_col_offset=13,
     ),
-    Token(
+    dict(
         token_type=TokenType.IDENTIFIER,
         lexeme="newline",
         lineno=0,
@@ -43,7 +43,7 @@ TRUTH_TOKENS = [
         col_offset=17,
         end_col_offset=24,
     ),
-    Token(
+    dict(
         token_type=TokenType.IDENTIFIER,
         lexeme="end",
         lineno=5,
@@ -51,7 +51,7 @@ TRUTH_TOKENS = [
         col_offset=0,
         end_col_offset=3,
     ),
-    Token(
+    dict(
         token_type=TokenType.EOF,
         lexeme="",
         lineno=6,
@@ -67,4 +67,6 @@ def test_whitespace_scanning() -> None:
     tokens = scanner.scan_tokens()
 
     for idx, token in enumerate(tokens):
-        check.equal(token, TRUTH_TOKENS[idx])
+        # Only the attributes listed for each truth token are compared
+        truth = TRUTH_TOKENS[idx]
+        check.equal({attr: getattr(token, attr) for attr in truth}, truth)
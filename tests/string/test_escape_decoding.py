@@ -0,0 +1,43 @@
+import ast
+
+import pytest
+
+from pylox.scanner import decode_string_literal
+
+ESCAPE_TEST_CASES = (
+    "",
+    "no escapes",
+    "multi\nline",
+    "windows\r\nnewlines\rand old mac newlines",
+    "\\n\\t\\r\\a\\b\\f\\v",
+    "\\\\ \\' \\\"",
+    "line \\\ncontinuation",
+    "\\x41\\101\\0\\7",
+    "\\u00e9\\U0001F600\\N{BULLET}",
+    "unknown \\q escape",
+    "Non-ASCII A~¶Þॐஃ",
+)
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning", "ignore::SyntaxWarning")
+@pytest.mark.parametrize("body", ESCAPE_TEST_CASES)
+def test_decode_string_literal(body: str) -> None:
+    assert decode_string_literal(body) == ast.literal_eval(f'"""{body}"""')
+
+
+def test_decode_string_literal_no_escape_passthrough() -> None:
+    body = "no escapes here"
+    assert decode_string_literal(body) is body
+
+
+MALFORMED_ESCAPES = ("\\x4", "\\u12", "\\N{NOT A REAL NAME}", "\\U00110000", "trailing\\")
+
+
+@pytest.mark.parametrize("body", MALFORMED_ESCAPES)
+def test_decode_string_literal_malformed(body: str) -> None:
+    with pytest.raises(SyntaxError):
+        decode_string_literal(body)
+
+
+def test_decode_string_literal_trailing_quote() -> None:
+    assert decode_string_literal('say "hi"') == 'say "hi"'
@@ -0,0 +1,591 @@
+import dataclasses
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+import typing as t
+from collections import abc, deque
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from textwrap import dedent
+from unittest import mock
+
+import typer
+from rich import print
+
+from pylox.arena import Arena, NODE_CLASSES
+from pylox.lox import Lox
+from pylox.modules import ModuleLoader, clear_module_cache, compile_source
+from pylox.parser import Parser
+from pylox.preprocessor import BUILTINS_PATH, PreProcessor
+from pylox.resolver import Resolver, ResolveTable
+from pylox.scanner import ScannerEngine, tokenize
+from pylox.tokens import Token
+from tool.generate_programs import DEFAULT_SPEC, write_program
+
+bench_cli = typer.Typer()
+
+
+def _load_src(lox_script: t.Optional[Path], repeat: int) -> str:
+    """
+    Load the source to benchmark against, repeated `repeat` times.
+
+    If no script is provided, the pure-lox stdlib headers are used.
+    """
+    if lox_script is not None:
+        src = lox_script.read_text()
+    else:
+        src = "\n".join(header.read_text() for header in sorted(BUILTINS_PATH.glob("*.lox")))
+
+    return "\n".join([src] * repeat)
+
+
+def _best_of(func: t.Callable[[], t.Any], n_runs: int) -> float:
+    """Return the best wall time, in seconds, of `n_runs` calls of `func`."""
+    return min(timeit.repeat(func, number=1, repeat=n_runs))
+
+
+def _peak_memory(func: t.Callable[[], t.Any]) -> int:
+    """Return the peak memory allocated, in bytes, while calling `func` & holding its output."""
+    tracemalloc.start()
+    try:
+        _ = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def _scan(src: str, engine: ScannerEngine) -> abc.Iterable[Token]:
+    """Scan the provided source using the specified engine, exhausting any lazy token iterators."""
+    tokens = tokenize(src, Lox(), engine)
+    if isinstance(tokens, abc.Iterator):
+        deque(tokens, maxlen=0)
+
+    return tokens
+
+
+def _parse(src: str, engine: ScannerEngine) -> t.Optional[list]:
+    """Scan & parse the provided source using the specified scanner engine."""
+    interpreter = Lox()
+    return Parser(tokenize(src, interpreter, engine), interpreter).parse()
+
+
+def _parse_tokens(tokens: list[Token]) -> t.Optional[list]:
+    """Parse the provided pre-scanned tokens."""
+    return Parser(tokens, Lox()).parse()
+
+
+@bench_cli.command()
+def scanner(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    repeat: int = typer.Option(200, help="Number of times to repeat the source."),
+    n_runs: int = typer.Option(5, help="Number of timed runs per engine."),
+) -> None:
+    """Compare the throughput & peak memory of the available scanner engines."""
+    src = _load_src(lox_script, repeat)
+    print(f"Scanning {len(src):,} characters, best of {n_runs} runs")
+
+    n_tokens = sum(1 for _ in tokenize(src, Lox(), ScannerEngine.STREAMING))
+    for engine in ScannerEngine:
+        scan = partial(_scan, src, engine)
+        elapsed = _best_of(scan, n_runs)
+        peak_mb = _peak_memory(scan) / 1e6
+        print(
+            f"{engine.value:>10}: {elapsed:.4f}s ({n_tokens / elapsed:,.0f} tokens/s), "
+            f"peak {peak_mb:,.1f} MB"
+        )
+
+
+@bench_cli.command()
+def parser(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    repeat: int = typer.Option(200, help="Number of times to repeat the source."),
+    n_runs: int = typer.Option(5, help="Number of timed runs per engine."),
+) -> None:
+    """Compare the combined scan & parse throughput & peak memory for each scanner engine."""
+    src = _load_src(lox_script, repeat)
+    print(f"Parsing {len(src):,} characters, best of {n_runs} runs")
+
+    for engine in ScannerEngine:
+        parse = partial(_parse, src, engine)
+        n_statements = len(parse() or [])
+        elapsed = _best_of(parse, n_runs)
+        peak_mb = _peak_memory(parse) / 1e6
+        print(
+            f"{engine.value:>10}: {elapsed:.4f}s ({n_statements / elapsed:,.0f} statements/s), "
+            f"peak {peak_mb:,.1f} MB"
+        )
+
+
+EXPRESSION_ATOMS = (
+    "a",
+    "1",
+    "2.5",
+    '"str"',
+    "true",
+    "nil",
+    "f(a, b)",
+    "a.b",
+    "(c - 1)",
+    "-d",
+    "!e",
+)
+EXPRESSION_OPERATORS = ("+", "-", "*", "/", "\\", "%", "^", "==", "!=", "<", ">=", "and", "or")
+
+
+def _expression_src(n_statements: int, n_operands: int, seed: int = 42) -> str:
+    """Generate an expression-heavy source of `print` statements of random binary expressions."""
+    rng = random.Random(seed)
+    statements = []
+    for _ in range(n_statements):
+        components = [rng.choice(EXPRESSION_ATOMS)]
+        for _ in range(n_operands - 1):
+            components.extend((rng.choice(EXPRESSION_OPERATORS), rng.choice(EXPRESSION_ATOMS)))
+
+        statements.append(f"print {' '.join(components)};")
+
+    return "\n".join(statements)
+
+
+@bench_cli.command()
+def expressions(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    n_statements: int = typer.Option(20_000, help="Number of generated statements."),
+    n_operands: int = typer.Option(8, help="Number of operands per generated expression."),
+    n_runs: int = typer.Option(5, help="Number of timed runs."),
+) -> None:
+    """
+    Measure the parser throughput on an expression-heavy source.
+
+    If no script is provided, a source of random binary expressions is generated.
+    """
+    if lox_script is not None:
+        src = lox_script.read_text()
+    else:
+        src = _expression_src(n_statements, n_operands)
+
+    tokens = list(tokenize(src, Lox(), ScannerEngine.REGEX))
+    parse = partial(_parse_tokens, tokens)
+    n_parsed = len(parse() or [])
+    elapsed = _best_of(parse, n_runs)
+    print(
+        f"Parsed {n_parsed:,} statements ({len(tokens):,} tokens), best of {n_runs} runs: "
+        f"{elapsed:.4f}s ({len(tokens) / elapsed:,.0f} tokens/s)"
+    )
+
+
+STATEMENT_TEMPLATES = (
+    "var v{idx} = {idx};",
+    "print v;",
+    "v = v + 1;",
+    "if (v < {idx}) print v; else v = 0;",
+    "while (v > {idx}) v = v - 1;",
+    "for (var i = 0; i < {idx}; i = i + 1) {{ continue; }}",
+    "{{ var w = v; w.b = f(w); }}",
+    "fun f{idx}(a, b) {{ return a + b; }}",
+    "class C{idx} < B {{ m() {{ return this.v; }} }}",
+)
+
+
+def _statement_src(n_statements: int, seed: int = 42) -> str:
+    """Generate a statement-heavy source of random declarations & statements of every kind."""
+    rng = random.Random(seed)
+    return "\n".join(rng.choice(STATEMENT_TEMPLATES).format(idx=idx) for idx in range(n_statements))
+
+
+@bench_cli.command()
+def statements(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    n_statements: int = typer.Option(1_000_000, help="Number of generated statements."),
+    n_runs: int = typer.Option(3, help="Number of timed runs."),
+) -> None:
+    """
+    Measure the parser throughput on a statement-heavy source.
+
+    If no script is provided, a source of random declarations & statements is generated.
+    """
+    if lox_script is not None:
+        src = lox_script.read_text()
+    else:
+        src = _statement_src(n_statements)
+
+    tokens = list(tokenize(src, Lox(), ScannerEngine.REGEX))
+    parse = partial(_parse_tokens, tokens)
+    n_parsed = len(parse() or [])
+    elapsed = _best_of(parse, n_runs)
+    print(
+        f"Parsed {n_parsed:,} statements ({len(tokens):,} tokens), best of {n_runs} runs: "
+        f"{elapsed:.4f}s ({n_parsed / elapsed:,.0f} statements/s)"
+    )
+
+
+def _parse_arena(tokens: list[Token]) -> Arena:
+    """Parse the provided pre-scanned tokens into an arena AST."""
+    return Parser(tokens, Lox()).parse_arena()
+
+
+@bench_cli.command()
+def arena(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    n_statements: int = typer.Option(100_000, help="Number of generated statements."),
+    n_runs: int = typer.Option(3, help="Number of timed runs per AST representation."),
+) -> None:
+    """
+    Compare the parse time & retained memory of the object & arena AST representations.
+
+    If no script is provided, a source of random declarations & statements is generated.
+    """
+    if lox_script is not None:
+        src = lox_script.read_text()
+    else:
+        src = _statement_src(n_statements)
+
+    tokens = list(tokenize(src, Lox(), ScannerEngine.REGEX))
+    print(f"Parsing {len(tokens):,} tokens, best of {n_runs} runs")
+
+    for label, parse in (
+        ("objects", partial(_parse_tokens, tokens)),
+        ("arena", partial(_parse_arena, tokens)),
+    ):
+        elapsed = _best_of(parse, n_runs)
+        peak_mb = _peak_memory(parse) / 1e6
+        print(f"{label:>10}: {elapsed:.4f}s, peak {peak_mb:,.1f} MB")
+
+
+GENERATED_FUNCTION_TEMPLATE = """\
+fun handler_{idx}(request, response) {{
+    if (request.method == nil or request.path == nil) return "Bad request";
+    if (request.method == "GET" and !(request.path == "")) {{
+        response.headers.set("Content-Type", "text/plain; charset=utf-8");
+        response.write(request.path == "/" or request.path == "/index");
+    }}
+    var limits = list(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144);
+    var retry = request.attempt == nil or request.attempt == 0;
+    return response.status == 200 and retry == !(request.method == "GET");
+}}
+"""
+
+
+def _generated_src(n_functions: int) -> str:
+    """Generate a source of machine generated functions, with the same expressions repeated."""
+    return "\n".join(GENERATED_FUNCTION_TEMPLATE.format(idx=idx) for idx in range(n_functions))
+
+
+def _count_nodes(statements: abc.Iterable[t.Any]) -> int:
+    """Count the distinct node instances reachable from the provided statements."""
+    seen = set()
+    pending = list(statements)
+    while pending:
+        node = pending.pop()
+        if id(node) in seen:
+            continue
+
+        seen.add(id(node))
+        for field in dataclasses.fields(node):
+            value = getattr(node, field.name)
+            children = value if isinstance(value, list) else [value]
+            pending.extend(child for child in children if isinstance(child, NODE_CLASSES))
+
+    return len(seen)
+
+
+def _retained_memory(func: t.Callable[[], t.Any]) -> int:
+    """Return the memory still allocated, in bytes, by the output of `func`."""
+    tracemalloc.start()
+    try:
+        _ = func()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return retained
+
+
+@bench_cli.command()
+def interning(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    n_functions: int = typer.Option(2_000, help="Number of generated functions."),
+) -> None:
+    """
+    Compare the node count & retained memory of compiled source, with & without interning.
+
+    If no script is provided, a source of machine generated functions is generated.
+    """
+    if lox_script is not None:
+        src = lox_script.read_text()
+    else:
+        src = _generated_src(n_functions)
+
+    print(f"Compiling {len(src):,} characters")
+    for label, intern in (("plain", False), ("interned", True)):
+        compile_ = partial(compile_source, src, Lox(), ScannerEngine.REGEX, intern=intern)
+        compiled = compile_()
+        assert compiled is not None
+        retained_mb = _retained_memory(compile_) / 1e6
+        print(
+            f"{label:>10}: {_count_nodes(compiled.statements):,} nodes, "
+            f"{len(compiled.locals):,} resolved locals, retained {retained_mb:,.1f} MB"
+        )
+
+
+def _resolve(statements: list) -> ResolveTable:
+    """Resolve the provided statements, returning the table holding their scope depths."""
+    resolved = ResolveTable(Lox())
+    Resolver(resolved).resolve(statements)
+    return resolved
+
+
+def _report_phase(
+    label: str, elapsed: float, peak: t.Optional[int], throughput: abc.Iterable[tuple[int, str]]
+) -> None:
+    """Print the elapsed time, throughput(s), & (if measured) peak memory of a front-end phase."""
+    rates = ", ".join(f"{count / elapsed:,.0f} {unit}/s" for count, unit in throughput)
+    peak_str = f", peak {peak / 1e6:,.1f} MB" if peak is not None else ""
+    print(f"{label:>12}: {elapsed:.4f}s ({rates}){peak_str}")
+
+
+@bench_cli.command()
+def frontend(
+    lox_script: t.Optional[Path] = typer.Argument(default=None),
+    n_lines: int = typer.Option(10_000, help="Approximate number of generated lines."),
+    nesting_depth: int = typer.Option(
+        DEFAULT_SPEC.nesting_depth, help="Nesting depth of each generated function body."
+    ),
+    n_includes: int = typer.Option(DEFAULT_SPEC.n_includes, help="Number of generated includes."),
+    engine: ScannerEngine = typer.Option(ScannerEngine.REGEX, help="Scanner implementation."),
+    memory: bool = typer.Option(True, help="Also measure the peak memory of each phase."),
+    n_runs: int = typer.Option(1, help="Number of timed runs per phase."),
+) -> None:
+    """
+    Measure the throughput & peak memory of each phase of the front-end.
+
+    The `PreProcessor`, `Scanner`, `Parser`, & `Resolver` are each timed separately, using the
+    output of the previous phase as their input. Peak memory is measured for each phase in a
+    separate, untimed, run, since tracing allocations slows the phase down considerably.
+
+    If no script is provided, a synthetic program of roughly `n_lines` lines is generated (see
+    `tool.generate_programs`) into a temporary directory, with its declarations spread across
+    `n_includes` included files.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if lox_script is None:
+            spec = DEFAULT_SPEC._replace(nesting_depth=nesting_depth, n_includes=n_includes)
+            lox_script = write_program(spec.scaled(n_lines), Path(tmp_dir))
+
+        src = lox_script.read_text()
+        phases: list[tuple[str, t.Callable[[], t.Any]]] = [
+            ("PreProcessor", partial(PreProcessor, src)),
+        ]
+        resolved_src = phases[0][1]().resolved_src
+        n_src_lines = resolved_src.count("\n") + 1
+
+        tokens = list(_scan(resolved_src, engine))
+        statements = _parse_tokens(tokens) or []
+        n_nodes = _count_nodes(statements)
+        phases.extend(
+            (
+                ("Scanner", partial(_scan, resolved_src, engine)),
+                ("Parser", partial(_parse_tokens, tokens)),
+                ("Resolver", partial(_resolve, statements)),
+            )
+        )
+        throughputs: list[list[tuple[int, str]]] = [
+            [(n_src_lines, "lines")],
+            [(len(tokens), "tokens")],
+            [(len(tokens), "tokens"), (n_nodes, "nodes")],
+            [(n_nodes, "nodes")],
+        ]
+
+        print(
+            f"Compiling {n_src_lines:,} lines ({len(resolved_src):,} characters, "
+            f"{len(tokens):,} tokens, {n_nodes:,} nodes), best of {n_runs} runs"
+        )
+        for (label, phase), throughput in zip(phases, throughputs, strict=True):
+            elapsed = _best_of(phase, n_runs)
+            peak = _peak_memory(phase) if memory else None
+            _report_phase(label, elapsed, peak, throughput)
+
+
+RUNTIME_PROGRAMS = {
+    "closures": """\
+        fun make_counter() {{
+            var count = 0;
+            fun increment(step) {{
+                count = count + step;
+                return count;
+            }}
+            return increment;
+        }}
+
+        fun run(n) {{
+            var counter = make_counter();
+            var total = 0;
+            for (var i = 0; i < n; i = i + 1) {{
+                total = total + counter(i % 3);
+            }}
+            return total;
+        }}
+        print run({n});
+        """,
+    "callbacks": """\
+        fun make_callback(scale) {{
+            var label = "callback";
+            {{
+                var offset = 1;
+                {{
+                    var unused = label + "s";
+                    {{
+                        fun callback(x) {{
+                            return x * scale + offset;
+                        }}
+                        return callback;
+                    }}
+                }}
+            }}
+        }}
+
+        fun run(n) {{
+            var callback = make_callback(2);
+            var total = 0;
+            for (var i = 0; i < n; i = i + 1) {{
+                total = total + callback(i);
+            }}
+            return total;
+        }}
+        print run({n});
+        """,
+    "recursion": """\
+        fun fib(n) {{
+            if (n < 2) return n;
+            return fib(n - 1) + fib(n - 2);
+        }}
+        print fib({n});
+        """,
+    "loops": """\
+        fun run(n) {{
+            var total = 0;
+            for (var i = 0; i < n; i = i + 1) {{
+                for (var j = 0; j < 10; j = j + 1) {{
+                    var k = i * j;
+                    total = total + k % 7;
+                }}
+            }}
+            return total;
+        }}
+        print run({n});
+        """,
+    "counting": """\
+        fun run(n) {{
+            var total = 0;
+            var i = 0;
+            while (i < n) {{
+                total = total + i % 7;
+                i = i + 1;
+            }}
+            return total;
+        }}
+        print run({n});
+        """,
+    "globals": """\
+        var total = 0;
+        var text = "lorem ipsum";
+        fun step(i) {{
+            return i % 7;
+        }}
+        for (var i = 0; i < {n}; i = i + 1) {{
+            total = total + step(i) + len(text);
+        }}
+        print total;
+        """,
+}
+RUNTIME_SIZES = {
+    "closures": 100_000,
+    "callbacks": 100_000,
+    "recursion": 22,
+    "loops": 20_000,
+    "counting": 200_000,
+    "globals": 100_000,
+}
+
+
+def _run_quietly(src: str, arena: bool = False) -> None:
+    """Run the provided source, discarding anything it prints."""
+    with mock.patch("pylox.interpreter.print"):
+        Lox(arena=arena).run(src)
+
+
+@bench_cli.command()
+def runtime(
+    n_runs: int = typer.Option(3, help="Number of timed runs per program."),
+) -> None:
+    """
+    Measure the interpreter's run time on programs dominated by variable access & loops.
+
+    Each program is compiled & run end to end using both the object & arena AST representations.
+    """
+    print(f"Best of {n_runs} runs")
+    for name, template in RUNTIME_PROGRAMS.items():
+        src = dedent(template).format(n=RUNTIME_SIZES[name])
+        objects = _best_of(partial(_run_quietly, src), n_runs)
+        arena = _best_of(partial(_run_quietly, src, arena=True), n_runs)
+        print(f"{name:>10}: objects {objects:.4f}s, arena {arena:.4f}s")
+
+
+@contextmanager
+def _slow_filesystem(latency: float) -> abc.Iterator[None]:
+    """Simulate a slow (e.g. network) filesystem by delaying every file stat & read."""
+    stat = Path.stat
+    read_text = Path.read_text
+
+    def slow_stat(self: Path, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        time.sleep(latency)
+        return stat(self, *args, **kwargs)
+
+    def slow_read_text(self: Path, *args: t.Any, **kwargs: t.Any) -> str:
+        time.sleep(latency)
+        return read_text(self, *args, **kwargs)
+
+    with (
+        mock.patch.object(Path, "stat", slow_stat),
+        mock.patch.object(Path, "read_text", slow_read_text),
+    ):
+        yield
+
+
+def _load_modules(filepaths: list[Path], max_workers: int) -> None:
+    """Load the provided modules from scratch, discarding any previously compiled modules."""
+    clear_module_cache()
+    ModuleLoader(Lox(), max_workers=max_workers).load(filepaths)
+
+
+@bench_cli.command()
+def includes(
+    n_includes: int = typer.Option(30, help="Number of included files."),
+    latency_ms: float = typer.Option(20, help="Simulated latency of each file access, in ms."),
+    n_runs: int = typer.Option(3, help="Number of timed runs per configuration."),
+) -> None:
+    """Compare serial & concurrent loading of included modules on a simulated slow filesystem."""
+    print(
+        f"Loading {n_includes} includes with {latency_ms}ms of simulated latency, "
+        f"best of {n_runs} runs"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepaths = []
+        for idx in range(n_includes):
+            filepath = Path(tmp_dir) / f"header_{idx}.lox"
+            filepath.write_text(f"fun header_{idx}() {{\n    return {idx};\n}}\n")
+            filepaths.append(filepath.resolve())
+
+        with _slow_filesystem(latency_ms / 1000):
+            for label, max_workers in (("serial", 1), ("concurrent", 16)):
+                elapsed = _best_of(partial(_load_modules, filepaths, max_workers), n_runs)
+                print(f"{label:>10}: {elapsed:.4f}s")
+
+
+if __name__ == "__main__":
+    bench_cli()
@@ -19,7 +19,13 @@ GRAMMAR_IMPORT_BLOCK = dedent(
     from dataclasses import dataclass
 
     from pylox.protocols.visitor import VisitorProtocol
-    from pylox.tokens import LITERAL_T, Token"""
+    from pylox.tokens import LITERAL_T, Token
+
+    # Resolved scope depth of a variable that isn't resolved to a local scope, i.e. a global
+    UNRESOLVED = -1
+
+    # Cached (version, slot) of a global variable access that hasn't been cached yet
+    UNCACHED = (UNRESOLVED, UNRESOLVED)"""
 )
 
 PROTOCOL_IMPORT_BLOCK = dedent(
@@ -38,28 +44,57 @@ VISIT_PATTERN = (
 )
 
 # Top level keys are classes that will subclass Expr
-# Values are a dictionary of attribute, attribute type (as str) k,v pairs
+# Values are a dictionary of attribute, attribute type (as str) k,v pairs; a type may be followed by
+# a default value, e.g. "int = 0"
 SUBCLASS_T = dict[str, dict[str, str]]
+
+# Variable accesses are annotated with their scope depth & slot by the `Resolver`, & whether the
+# slot is an upvalue of the enclosing function's closure
+RESOLVED_ATTRIBUTES = {
+    "depth": "int = UNRESOLVED",
+    "slot": "int = UNRESOLVED",
+    "upvalue": "bool = False",
+}
+
+# Accesses of a global variable cache the variable's slot in the interpreter's globals, along with
+# the version of the globals it was found in, as a single `(version, slot)` pair. Compiled source
+# may be shared by interpreters on different threads, so the pair is only ever replaced as a whole
+CACHED_ATTRIBUTES = {"global_slot": "tuple[int, int] = UNCACHED"}
+
 EXPR_STRUCT = {
-    "Assign": {"name": "Token", "value": "Expr"},
-    "Binary": {"expr_left": "Expr", "token_operator": "Token", "expr_right": "Expr"},
+    "Assign": {"name": "Token", "value": "Expr", **RESOLVED_ATTRIBUTES, **CACHED_ATTRIBUTES},
+    # Binary expressions whose operator only needs to check its left operand, since the right
+    # operand is a known number, are marked as specialized by the `Optimizer`
+    "Binary": {
+        "expr_left": "Expr",
+        "token_operator": "Token",
+        "expr_right": "Expr",
+        "specialized": "bool = False",
+    },
     "Call": {"callee": "Expr", "closing_paren": "Token", "arguments": "list[Expr]"},
     "Get": {"object_": "Expr", "name": "Token"},
     "Grouping": {"expr_expression": "Expr"},
     "Literal": {"object_value": "LITERAL_T"},
     "Logical": {"expr_left": "Expr", "token_operator": "Token", "expr_right": "Expr"},
     "Set": {"object_": "Expr", "name": "Token", "value": "Expr"},
-    "Super": {"keyword": "Token", "method": "Token"},
-    "This": {"keyword": "Token"},
+    "Super": {"keyword": "Token", "method": "Token", **RESOLVED_ATTRIBUTES},
+    "This": {"keyword": "Token", **RESOLVED_ATTRIBUTES},
     "Unary": {"token_operator": "Token", "expr_right": "Expr"},
-    "Variable": {"name": "Token"},
+    "Variable": {"name": "Token", **RESOLVED_ATTRIBUTES, **CACHED_ATTRIBUTES},
 }
 
 STMT_STRUCT = {
-    "Block": {"statements": "list[Stmt]"},
+    # Blocks that don't need a scope of their own at runtime are marked as elided by the `Resolver`
+    "Block": {"statements": "list[Stmt]", "elided": "bool = False"},
     "Class": {"name": "Token", "superclass": "t.Optional[Variable]", "methods": "list[Function]"},
     "Expression": {"expr_expression": "Expr"},
-    "Function": {"name": "Token", "params": "list[Token]", "body": "list[Stmt]"},
+    # Functions are annotated with the variables captured by their closure by the `Resolver`
+    "Function": {
+        "name": "Token",
+        "params": "list[Token]",
+        "body": "list[Stmt]",
+        "upvalues": "tuple[int, ...] = ()",
+    },
     "If": {"condition": "Expr", "then_branch": "Stmt", "else_branch": "t.Optional[Stmt]"},
     "Var": {"name": "Token", "initializer": "t.Optional[Expr]"},
     "Return": {"keyword": "Token", "value": "t.Optional[Expr]"},
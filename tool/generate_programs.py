@@ -0,0 +1,221 @@
+import random
+import typing as t
+from pathlib import Path
+
+import typer
+from rich import print
+
+progen_cli = typer.Typer()
+CURRENT_DIR = Path()
+
+WORDS = (
+    "lorem",
+    "ipsum",
+    "dolor",
+    "sit",
+    "amet",
+    "consectetur",
+    "adipiscing",
+    "elit",
+    "sed",
+    "do",
+    "eiusmod",
+    "tempor",
+)
+
+# Opening line of each kind of nested statement, cycled through as the nesting deepens
+NESTED_STATEMENTS = (
+    "if (x{outer} > {level}) {{",
+    "while (x{outer} < {level}) {{",
+    "for (var i{level} = 0; i{level} < {level}; i{level} = i{level} + 1) {{",
+    "{{",
+)
+
+
+class ProgramSpec(t.NamedTuple):
+    """Shape of a generated Lox program."""
+
+    n_functions: int = 100
+    nesting_depth: int = 8  # Depth of the nested statements in the body of each function
+    n_classes: int = 20
+    n_strings: int = 20
+    string_length: int = 1_000  # Approximate length of each long string literal, in characters
+    n_includes: int = 10  # Number of included files the declarations are spread across
+
+    def scaled(self, n_lines: int) -> "ProgramSpec":
+        """Scale the number of declarations so the generated program is roughly `n_lines` long."""
+        function_lines = generate_function(0, self.nesting_depth).count("\n") + 1
+        units_lines = (
+            self.n_functions * (function_lines + 1)
+            + self.n_classes * (CLASS_LINES + 1)
+            + self.n_strings * 2
+        )
+        scale = n_lines / max(units_lines, 1)
+        return self._replace(
+            n_functions=max(round(self.n_functions * scale), 1),
+            n_classes=round(self.n_classes * scale),
+            n_strings=round(self.n_strings * scale),
+        )
+
+
+DEFAULT_SPEC = ProgramSpec()
+
+
+def generate_function(idx: int, nesting_depth: int) -> str:
+    """
+    Generate a function whose body is a chain of statements nested `nesting_depth` levels deep.
+
+    Each level declares a local derived from the enclosing level's local, so every level resolves
+    variables from multiple scopes up.
+    """
+    lines = [f"fun fn_{idx}(x0, y, z) {{"]
+    indent = "    "
+    for level in range(1, nesting_depth + 1):
+        template = NESTED_STATEMENTS[(idx + level) % len(NESTED_STATEMENTS)]
+        lines.append(indent + template.format(outer=level - 1, level=level))
+        indent += "    "
+        lines.append(f"{indent}var x{level} = x{level - 1} * y + {level} - z;")
+
+    lines.append(f"{indent}return x{nesting_depth} + fn_{max(idx - 1, 0)}(y, z, x0);")
+    for level in range(nesting_depth, 0, -1):
+        lines.append(f"{indent}x{level - 1} = x{level - 1} + 1;")
+        indent = indent[:-4]
+        lines.append(indent + "}")
+
+    lines.append("    return nil;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+CLASS_TEMPLATE = """\
+class Shape_{idx}{superclass} {{
+    init(width, height) {{
+        this.width = width;
+        this.height = height;
+        this.label = "Shape_{idx}";
+    }}
+
+    area() {{
+        return this.width * this.height;
+    }}
+
+    scaled(factor) {{
+        var shape = Shape_{idx}(this.width * factor, this.height * factor);
+        shape.label = this.label + " (scaled)";
+        return shape;
+    }}
+
+    describe() {{
+        return this.label + ": " + {describe};
+    }}
+}}"""
+CLASS_LINES = CLASS_TEMPLATE.count("\n") + 1
+
+
+def generate_class(idx: int, superclass: t.Optional[int]) -> str:
+    """Generate a class, inheriting from the specified class index if provided."""
+    if superclass is None:
+        return CLASS_TEMPLATE.format(idx=idx, superclass="", describe='"area"')
+
+    return CLASS_TEMPLATE.format(
+        idx=idx, superclass=f" < Shape_{superclass}", describe="super.describe()"
+    )
+
+
+def generate_string(idx: int, string_length: int, rng: random.Random) -> str:
+    """Generate a variable declaration initialized to a long string literal."""
+    words: list[str] = []
+    length = 0
+    while length < string_length:
+        words.append(word := rng.choice(WORDS))
+        length += len(word) + 1
+
+    return f'var text_{idx} = "{" ".join(words)}";\nprint len(text_{idx});'
+
+
+def generate_program(
+    spec: ProgramSpec, include_dir: t.Optional[Path] = None, seed: int = 42
+) -> tuple[str, dict[Path, str]]:
+    """
+    Generate a Lox program of the specified shape.
+
+    Returns the source of the main script along with the source of each of its included files,
+    keyed by path. The generated declarations are dealt round robin to the main script & its
+    included files, each of which is included by the main script using its absolute path. Include
+    paths are located in `include_dir`, or the current directory if not specified; the included
+    files are not written to disk.
+
+    Classes inherit from the previous class declared in the same file, so inheritance chains (&
+    calls to `super`) are spread throughout the program.
+    """
+    rng = random.Random(seed)
+    include_dir = (include_dir or CURRENT_DIR).resolve()
+    include_paths = [include_dir / f"module_{idx}.lox" for idx in range(spec.n_includes)]
+
+    # The main script is the last chunk
+    chunks: list[list[str]] = [[] for _ in range(spec.n_includes + 1)]
+    last_class: list[t.Optional[int]] = [None] * len(chunks)
+    for idx in range(spec.n_functions):
+        chunks[idx % len(chunks)].append(generate_function(idx, spec.nesting_depth))
+
+    for idx in range(spec.n_classes):
+        chunk_idx = idx % len(chunks)
+        chunks[chunk_idx].append(generate_class(idx, last_class[chunk_idx]))
+        last_class[chunk_idx] = idx
+
+    for idx in range(spec.n_strings):
+        chunks[idx % len(chunks)].append(generate_string(idx, spec.string_length, rng))
+
+    *included, main = ("\n\n".join(chunk) + "\n" for chunk in chunks)
+    includes = "".join(f'include "{filepath.as_posix()}"\n' for filepath in include_paths)
+    return includes + main, dict(zip(include_paths, included, strict=True))
+
+
+def write_program(spec: ProgramSpec, out_dir: Path, name: str = "main", seed: int = 42) -> Path:
+    """Generate a Lox program into the specified directory, returning its main script's path."""
+    main_src, included = generate_program(spec, out_dir, seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for filepath, src in included.items():
+        filepath.write_text(src)
+
+    main_filepath = out_dir / f"{name}.lox"
+    main_filepath.write_text(main_src)
+    return main_filepath
+
+
+@progen_cli.command()
+def main(
+    out_dir: Path = typer.Argument(default=CURRENT_DIR),
+    n_lines: t.Optional[int] = typer.Option(
+        None, help="Scale the number of declarations to generate roughly this many lines."
+    ),
+    n_functions: int = typer.Option(DEFAULT_SPEC.n_functions, help="Number of functions."),
+    nesting_depth: int = typer.Option(
+        DEFAULT_SPEC.nesting_depth, help="Nesting depth of each function body."
+    ),
+    n_classes: int = typer.Option(DEFAULT_SPEC.n_classes, help="Number of classes."),
+    n_strings: int = typer.Option(DEFAULT_SPEC.n_strings, help="Number of long string literals."),
+    string_length: int = typer.Option(
+        DEFAULT_SPEC.string_length, help="Length of each long string literal."
+    ),
+    n_includes: int = typer.Option(DEFAULT_SPEC.n_includes, help="Number of included files."),
+    seed: int = typer.Option(42, help="Random seed."),
+) -> None:
+    """
+    Generate a synthetic Lox program, e.g. for benchmarking the front-end at scale.
+
+    The program's declarations are spread across a `main.lox` script & the files it includes, all
+    written to the output directory.
+    """
+    spec = ProgramSpec(n_functions, nesting_depth, n_classes, n_strings, string_length, n_includes)
+    if n_lines is not None:
+        spec = spec.scaled(n_lines)
+
+    main_filepath = write_program(spec, out_dir, seed=seed)
+    filepaths = [main_filepath, *(out_dir / f"module_{idx}.lox" for idx in range(n_includes))]
+    n_written = sum(filepath.read_text().count("\n") for filepath in filepaths)
+    print(f"Generated '{main_filepath}' ({n_written:,} lines across {len(filepaths)} files)")
+
+
+if __name__ == "__main__":
+    progen_cli()